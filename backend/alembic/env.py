@@ -12,8 +12,18 @@ sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..'
 # Import settings AFTER potential modification
 from app.core.config import settings
 from app.db.base import Base
+from app.models.thought import SEARCH_SCHEMA_OBJECTS, THOUGHT_PARTITION_PREFIX, THOUGHTS_DEFAULT_PARTITION
 target_metadata = Base.metadata
 
+def include_object(object, name, type_, reflected, compare_to):
+    """Keeps autogenerate from dropping the full-text search objects and thought partitions, which are not mapped."""
+    if reflected and compare_to is None and name is not None:
+        if name in SEARCH_SCHEMA_OBJECTS or name.startswith("thoughts_fts_"):
+            return False
+        if name == THOUGHTS_DEFAULT_PARTITION or name.startswith(THOUGHT_PARTITION_PREFIX):
+            return False
+    return True
+
 # this is the Alembic Config object...
 config = context.config
 
@@ -30,6 +40,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=settings.DATABASE_URL, # Use modified URL
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -37,7 +48,7 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 def do_run_migrations(connection):
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
     with context.begin_transaction():
         context.run_migrations()
 
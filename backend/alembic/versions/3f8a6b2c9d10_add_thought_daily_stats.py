@@ -0,0 +1,48 @@
+"""Add thought_daily_stats rollup table
+
+Revision ID: 3f8a6b2c9d10
+Revises: 7c1d4e9a2b3f
+Create Date: 2026-10-18 10:03:17.552871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8a6b2c9d10'
+down_revision: Union[str, None] = '7c1d4e9a2b3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('thought_daily_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    # Reuse the existing 'moodenum' type created with the thoughts table
+    sa.Column('mood', postgresql.ENUM('positive', 'neutral', 'negative', name='moodenum', create_type=False), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_thought_daily_stats_user_id_users'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'day', 'mood', name=op.f('pk_thought_daily_stats'))
+    )
+
+    # Backfill from existing thoughts (same as `python -m app.commands.backfill_thought_stats`)
+    if op.get_bind().dialect.name == 'postgresql':
+        day_expr = "(created_at AT TIME ZONE 'UTC')::date"
+    else:
+        day_expr = "date(created_at)"
+    op.execute(
+        "INSERT INTO thought_daily_stats (user_id, day, mood, count) "
+        f"SELECT user_id, {day_expr}, mood, count(*) FROM thoughts "
+        f"GROUP BY user_id, {day_expr}, mood"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('thought_daily_stats')
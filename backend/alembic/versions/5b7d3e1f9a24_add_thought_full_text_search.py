@@ -0,0 +1,61 @@
+"""Add full-text search over thought content
+
+Revision ID: 5b7d3e1f9a24
+Revises: c8e2f1a6d937
+Create Date: 2026-10-18 16:21:05.318442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7d3e1f9a24'
+down_revision: Union[str, None] = 'c8e2f1a6d937'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        # Generated column fills itself for existing rows; not mapped on the model
+        op.execute(
+            "ALTER TABLE thoughts ADD COLUMN search_vector tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('english', content)) STORED"
+        )
+        op.create_index('ix_thoughts_search_vector', 'thoughts', ['search_vector'], unique=False, postgresql_using='gin')
+    else:
+        # SQLite: external-content FTS5 table kept in step by triggers
+        op.execute(
+            "CREATE VIRTUAL TABLE thoughts_fts USING fts5("
+            "content, content='thoughts', content_rowid='id', tokenize='porter unicode61')"
+        )
+        op.execute(
+            "CREATE TRIGGER thoughts_fts_ai AFTER INSERT ON thoughts BEGIN "
+            "INSERT INTO thoughts_fts(rowid, content) VALUES (new.id, new.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER thoughts_fts_ad AFTER DELETE ON thoughts BEGIN "
+            "INSERT INTO thoughts_fts(thoughts_fts, rowid, content) VALUES ('delete', old.id, old.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER thoughts_fts_au AFTER UPDATE OF content ON thoughts BEGIN "
+            "INSERT INTO thoughts_fts(thoughts_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+            "INSERT INTO thoughts_fts(rowid, content) VALUES (new.id, new.content); END"
+        )
+        op.execute("INSERT INTO thoughts_fts(thoughts_fts) VALUES ('rebuild')") # Index existing thoughts
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_thoughts_search_vector', table_name='thoughts', postgresql_using='gin')
+        op.drop_column('thoughts', 'search_vector')
+    else:
+        op.execute("DROP TRIGGER IF EXISTS thoughts_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS thoughts_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS thoughts_fts_ai")
+        op.execute("DROP TABLE IF EXISTS thoughts_fts")
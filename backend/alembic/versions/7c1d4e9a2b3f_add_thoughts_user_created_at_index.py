@@ -0,0 +1,34 @@
+"""Add composite (user_id, created_at DESC, id DESC) index on thoughts
+
+Revision ID: 7c1d4e9a2b3f
+Revises: 25e42abbc7f1
+Create Date: 2026-10-18 09:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1d4e9a2b3f'
+down_revision: Union[str, None] = '25e42abbc7f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Serves both keyset pagination and the per-user date-range queries
+    op.create_index(
+        'ix_thoughts_user_id_created_at_id',
+        'thoughts',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_thoughts_user_id_created_at_id', table_name='thoughts')
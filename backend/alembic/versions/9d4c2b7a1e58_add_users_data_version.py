@@ -0,0 +1,28 @@
+"""Add users.data_version for conditional GETs
+
+Revision ID: 9d4c2b7a1e58
+Revises: 5b7d3e1f9a24
+Create Date: 2026-10-18 18:02:44.610937
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4c2b7a1e58'
+down_revision: Union[str, None] = '5b7d3e1f9a24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('data_version', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'data_version')
@@ -0,0 +1,40 @@
+"""Add journal_summaries cache table
+
+Revision ID: a51e0c7d4b22
+Revises: 3f8a6b2c9d10
+Create Date: 2026-10-18 11:26:05.918342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a51e0c7d4b22'
+down_revision: Union[str, None] = '3f8a6b2c9d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('journal_summaries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('response_json', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_journal_summaries_user_id_users'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_journal_summaries')),
+    sa.UniqueConstraint('user_id', 'period', 'content_hash', name='uq_journal_summaries_user_id_period_content_hash')
+    )
+    op.create_index(op.f('ix_journal_summaries_id'), 'journal_summaries', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_journal_summaries_id'), table_name='journal_summaries')
+    op.drop_table('journal_summaries')
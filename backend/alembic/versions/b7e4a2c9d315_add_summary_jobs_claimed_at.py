@@ -0,0 +1,29 @@
+"""Add summary_jobs.claimed_at for job leases
+
+Revision ID: b7e4a2c9d315
+Revises: e3b9c5d2f471
+Create Date: 2026-10-18 23:41:07.318254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4a2c9d315'
+down_revision: Union[str, None] = 'e3b9c5d2f471'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Jobs running at upgrade time have no claim yet and count as abandoned
+    op.add_column('summary_jobs', sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('summary_jobs', 'claimed_at')
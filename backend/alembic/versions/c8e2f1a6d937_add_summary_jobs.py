@@ -0,0 +1,43 @@
+"""Add summary_jobs table
+
+Revision ID: c8e2f1a6d937
+Revises: a51e0c7d4b22
+Create Date: 2026-10-18 13:47:52.120964
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e2f1a6d937'
+down_revision: Union[str, None] = 'a51e0c7d4b22'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('summary_jobs',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('result_json', sa.Text(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_summary_jobs_user_id_users'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_summary_jobs'))
+    )
+    op.create_index('ix_summary_jobs_user_id_status', 'summary_jobs', ['user_id', 'status'], unique=False)
+    op.create_index('ix_summary_jobs_status', 'summary_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_summary_jobs_status', table_name='summary_jobs')
+    op.drop_index('ix_summary_jobs_user_id_status', table_name='summary_jobs')
+    op.drop_table('summary_jobs')
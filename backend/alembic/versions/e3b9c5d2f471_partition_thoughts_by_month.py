@@ -0,0 +1,166 @@
+"""Partition thoughts by month and add thoughts_archive
+
+Revision ID: e3b9c5d2f471
+Revises: 9d4c2b7a1e58
+Create Date: 2026-10-18 22:14:52.906127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b9c5d2f471'
+down_revision: Union[str, None] = '9d4c2b7a1e58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Future months created by the migration; the app keeps THOUGHT_PARTITION_MONTHS_AHEAD from then on
+MONTHS_AHEAD = 3
+
+THOUGHT_COLUMNS = "id, content, mood, growth_stage, created_at, last_watered_at, user_id"
+
+# Creates the monthly partitions for [first_month, last_month] that do not exist yet.
+# Rows of such a month that went to the default partition are moved into the new one.
+ENSURE_PARTITIONS_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION ensure_thought_partitions(first_month date, last_month date) RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    month_start date;
+    lower_bound timestamptz;
+    upper_bound timestamptz;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    -- One caller at a time (several app workers run this at startup)
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_thought_partitions'));
+    FOR month_start IN
+        SELECT generate_series(
+            date_trunc('month', first_month::timestamp), date_trunc('month', last_month::timestamp), interval '1 month'
+        )::date
+    LOOP
+        partition_name := 'thoughts_p' || to_char(month_start, 'YYYYMM');
+        CONTINUE WHEN to_regclass(partition_name) IS NOT NULL;
+        lower_bound := month_start::timestamp AT TIME ZONE 'UTC';
+        upper_bound := (month_start + interval '1 month')::timestamp AT TIME ZONE 'UTC';
+        CREATE TEMP TABLE thoughts_moving AS
+            SELECT {THOUGHT_COLUMNS} FROM thoughts_default
+            WHERE created_at >= lower_bound AND created_at < upper_bound;
+        DELETE FROM thoughts_default WHERE created_at >= lower_bound AND created_at < upper_bound;
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF thoughts FOR VALUES FROM (%L) TO (%L)',
+            partition_name, lower_bound, upper_bound
+        );
+        INSERT INTO thoughts ({THOUGHT_COLUMNS}) SELECT {THOUGHT_COLUMNS} FROM thoughts_moving;
+        DROP TABLE thoughts_moving;
+        created := created + 1;
+    END LOOP;
+    RETURN created;
+END
+$$
+"""
+
+
+def _create_thought_indexes() -> None:
+    op.execute("ALTER TABLE thoughts ADD CONSTRAINT fk_thoughts_user_id_users FOREIGN KEY (user_id) REFERENCES users (id)")
+    op.create_index(op.f('ix_thoughts_id'), 'thoughts', ['id'], unique=False)
+    op.create_index(op.f('ix_thoughts_user_id'), 'thoughts', ['user_id'], unique=False)
+    op.create_index(
+        'ix_thoughts_user_id_created_at_id',
+        'thoughts',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+    op.create_index('ix_thoughts_search_vector', 'thoughts', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def _thoughts_table_sql(name: str, partitioned: bool) -> str:
+    return (
+        f"CREATE TABLE {name} ("
+        "id integer NOT NULL DEFAULT nextval('thoughts_id_seq'), "
+        "content text NOT NULL, "
+        "mood moodenum NOT NULL, "
+        "growth_stage integer NOT NULL, "
+        "created_at timestamp with time zone NOT NULL DEFAULT now(), "
+        "last_watered_at timestamp with time zone NOT NULL DEFAULT now(), "
+        "user_id integer NOT NULL, "
+        "search_vector tsvector GENERATED ALWAYS AS (to_tsvector('english', content)) STORED"
+        f"){' PARTITION BY RANGE (created_at)' if partitioned else ''}"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('thoughts_archive',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('thought_count', sa.Integer(), nullable=False),
+    sa.Column('thoughts', sa.JSON().with_variant(postgresql.JSONB(), 'postgresql'), nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_thoughts_archive_user_id_users'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'month', name=op.f('pk_thoughts_archive'))
+    )
+    if op.get_bind().dialect.name != 'postgresql':
+        return # SQLite keeps a plain table; archiving still works, by date range
+
+    # lz4 compresses the archived JSON faster than the default pglz (Postgres 14+, if built with lz4)
+    op.execute(
+        "DO $$ BEGIN "
+        "IF current_setting('server_version_num')::int >= 140000 THEN "
+        "BEGIN EXECUTE 'ALTER TABLE thoughts_archive ALTER COLUMN thoughts SET COMPRESSION lz4'; "
+        "EXCEPTION WHEN OTHERS THEN NULL; END; "
+        "END IF; END $$"
+    )
+
+    # Rebuild thoughts as a table partitioned by month on created_at (UTC). The primary
+    # key must include the partition key, so it becomes (id, created_at); ids still come
+    # from the same sequence. Runs in one transaction and rewrites every row.
+    op.execute("ALTER SEQUENCE thoughts_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE thoughts RENAME TO thoughts_unpartitioned")
+    op.execute(_thoughts_table_sql("thoughts", partitioned=True))
+    op.execute("CREATE TABLE thoughts_default PARTITION OF thoughts DEFAULT")
+    op.execute(ENSURE_PARTITIONS_FUNCTION)
+    op.execute(
+        "SELECT ensure_thought_partitions("
+        "coalesce((SELECT min(created_at AT TIME ZONE 'UTC')::date FROM thoughts_unpartitioned), "
+        "(now() AT TIME ZONE 'UTC')::date), "
+        f"((now() AT TIME ZONE 'UTC') + interval '{MONTHS_AHEAD} months')::date)"
+    )
+    op.execute(f"INSERT INTO thoughts ({THOUGHT_COLUMNS}) SELECT {THOUGHT_COLUMNS} FROM thoughts_unpartitioned")
+    op.execute("DROP TABLE thoughts_unpartitioned")
+    op.execute("ALTER SEQUENCE thoughts_id_seq OWNED BY thoughts.id")
+    op.execute("ALTER TABLE thoughts ADD CONSTRAINT pk_thoughts PRIMARY KEY (id, created_at)")
+    _create_thought_indexes()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Archived thoughts go back into thoughts; run `python -m app.commands.backfill_thought_stats` afterwards
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER SEQUENCE thoughts_id_seq OWNED BY NONE")
+        op.execute("ALTER TABLE thoughts RENAME TO thoughts_partitioned")
+        op.execute(_thoughts_table_sql("thoughts", partitioned=False))
+        op.execute(f"INSERT INTO thoughts ({THOUGHT_COLUMNS}) SELECT {THOUGHT_COLUMNS} FROM thoughts_partitioned")
+        op.execute(
+            f"INSERT INTO thoughts ({THOUGHT_COLUMNS}) "
+            "SELECT (t->>'id')::int, t->>'content', (t->>'mood')::moodenum, (t->>'growth_stage')::int, "
+            "(t->>'created_at')::timestamptz, (t->>'last_watered_at')::timestamptz, a.user_id "
+            "FROM thoughts_archive a, jsonb_array_elements(a.thoughts) AS t"
+        )
+        op.execute("DROP TABLE thoughts_partitioned") # Drops the partitions with it
+        op.execute("DROP FUNCTION ensure_thought_partitions(date, date)")
+        op.execute("ALTER SEQUENCE thoughts_id_seq OWNED BY thoughts.id")
+        op.execute("ALTER TABLE thoughts ADD CONSTRAINT pk_thoughts PRIMARY KEY (id)")
+        _create_thought_indexes()
+    else:
+        op.execute(
+            f"INSERT INTO thoughts ({THOUGHT_COLUMNS}) "
+            "SELECT json_extract(t.value, '$.id'), json_extract(t.value, '$.content'), json_extract(t.value, '$.mood'), "
+            "json_extract(t.value, '$.growth_stage'), replace(json_extract(t.value, '$.created_at'), 'T', ' '), "
+            "replace(json_extract(t.value, '$.last_watered_at'), 'T', ' '), a.user_id "
+            "FROM thoughts_archive a, json_each(a.thoughts) AS t"
+        )
+    op.drop_table('thoughts_archive')
@@ -1,23 +1,26 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from sqlalchemy.exc import DBAPIError
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
 
 # Corrected Imports: Import specific model, schema, and CRUD object directly
-from ..models.user import User as UserModel
 from ..schemas.token import TokenData # Optional but good practice
 from ..crud.crud_user import user as crud_user # Import user CRUD directly
 from ..core import security
-from ..db.session import get_db_session
+from ..core.user_cache import AuthenticatedUser, user_cache
+from ..core.metrics import metrics
+from ..core.read_routing import current_user_id
+from ..core.admission import AdmissionRejected, ai_admission
+from ..db.session import async_session_maker, read_session_maker
 
 # OAuth2 scheme setup (ensure tokenUrl matches your auth endpoint)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
-async def get_current_user(
-    db: AsyncSession = Depends(get_db_session), token: str = Depends(oauth2_scheme)
-) -> UserModel:
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> AuthenticatedUser:
     """
     Dependency to get the current user from the JWT token.
+    Served from the per-process user cache; a DB session is opened only on a miss.
     Raises HTTPException if token is invalid or user not found.
     """
     credentials_exception = HTTPException(
@@ -26,18 +29,69 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+    with metrics.time_auth(): # Reported as "auth" in the Server-Timing header
+        current_user = await _resolve_user(token, credentials_exception)
+    # Lets read-only sessions honour read-your-writes and commits pin this user (see ReadRouter)
+    current_user_id.set(current_user.id)
+    return current_user
+
+async def _resolve_user(token: str, credentials_exception: HTTPException) -> AuthenticatedUser:
+    """Token -> cached identity, falling back to a user lookup on a cache miss."""
     # Decode the token to get the username (subject)
     username = security.decode_token(token)
     if username is None:
         raise credentials_exception
 
-    # Fetch the user from the database using the directly imported 'crud_user' object
-    user = await crud_user.get_by_username(db, username=username)
+    cached_user = user_cache.get(username)
+    if cached_user is not None:
+        return cached_user
+
+    if async_session_maker is None:
+        raise HTTPException(status_code=503, detail="Database service is not configured or unavailable.")
+
+    # Cache miss: fetch the user from the database with a short-lived session
+    user = None
+    if read_session_maker is not async_session_maker:
+        try:
+            # Replica unless it is down; a replica that fails to connect is swapped for the primary
+            async with read_session_maker() as db:
+                user = await crud_user.get_by_username(db, username=username)
+        except DBAPIError as error:
+            if not error.connection_invalidated:
+                raise
+            # Replica connection dropped mid-query (now marked down); ask the primary below
+    if user is None:
+        # Also covers a just-created account that has not reached the replica yet
+        async with async_session_maker() as db:
+            user = await crud_user.get_by_username(db, username=username)
     if user is None:
         raise credentials_exception
 
-    # Return the SQLAlchemy User model instance
-    return user
+    current_user = AuthenticatedUser(id=user.id, username=user.username, created_at=user.created_at)
+    user_cache.set(username, current_user)
+    return current_user
+
+def admission_http_error(rejection: AdmissionRejected) -> HTTPException:
+    """429/503 with Retry-After for a request turned away by admission control."""
+    return HTTPException(
+        status_code=rejection.status_code,
+        detail=rejection.detail,
+        headers={"Retry-After": str(rejection.retry_after)},
+    )
+
+@asynccontextmanager
+async def admitted_ai_call(user_id: int) -> AsyncIterator[None]:
+    """
+    Wraps a call that actually reaches Claude: applies the per-user and global
+    rate limits and holds an AI slot (waiting briefly in a bounded queue).
+    Rejections become 429/503 with Retry-After. Take it only on a cache miss,
+    so stored answers are never rate limited or queued.
+    """
+    try:
+        async with ai_admission.admit(user_id):
+            yield
+    except AdmissionRejected as rejection:
+        raise admission_http_error(rejection)
 
 # Optional: Dependency for superuser (if needed later)
-# def get_current_active_superuser(...)
\ No newline at end of file
+# def get_current_active_superuser(...)
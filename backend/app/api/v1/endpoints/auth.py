@@ -10,6 +10,7 @@ from ....crud.crud_user import user as crud_user # Import user CRUD directly
 from ....core import security
 from ....db.session import get_db_session
 from ....core.config import settings
+from ....core.metrics import metrics
 
 router = APIRouter()
 logger = logging.getLogger(__name__) # Added logger instance
@@ -24,22 +25,35 @@ async def login_for_access_token(
     OAuth2 compatible token login, get an access token for future requests.
     Takes username and password from form data.
     """
-    logger.info(f"Login attempt for username: {form_data.username}")
+    logger.info("Login attempt for username: %s", form_data.username)
     # Use the directly imported 'crud_user' object
     user = await crud_user.get_by_username(db, username=form_data.username)
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
-        logger.warning(f"Failed login attempt for username: {form_data.username}")
+    is_valid, new_hash = (False, None)
+    if user:
+        # bcrypt runs on the password thread pool so other requests keep being served
+        with metrics.time_auth():
+            is_valid, new_hash = await security.verify_and_update_password_async(
+                form_data.password, user.hashed_password
+            )
+    if not is_valid:
+        logger.warning("Failed login attempt for username: %s", form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"}, # Standard header for 401
         )
 
+    if new_hash:
+        # Stored hash used an outdated cost factor; upgrade it transparently
+        user.hashed_password = new_hash
+        await db.commit()
+        logger.info("Rehashed password for username: %s", form_data.username)
+
     # Create the access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
         subject=user.username, expires_delta=access_token_expires # Use username as subject
     )
-    logger.info(f"Successful login for username: {form_data.username}")
+    logger.info("Successful login for username: %s", form_data.username)
     # Return the token in the expected format
     return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
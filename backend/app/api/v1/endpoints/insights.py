@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any # Keep Any if needed, otherwise remove
 import logging
@@ -6,12 +6,14 @@ from collections import Counter
 from datetime import datetime, timedelta, timezone
 from pydantic import BaseModel
 
-# Import the 'thought' object directly from its source file
-from ....crud.crud_thought import thought as crud_thought
-from ....db.session import get_db_session
+# Import the daily stats rollup CRUD directly from its source file
+from ....crud.crud_thought_stats import thought_stats as crud_thought_stats
+from ....crud.crud_user import user as crud_user
+from ....core.etag import data_etag, etag_matches, CACHE_CONTROL
+from ....db.session import get_read_db_session
 from ....models.thought import MoodEnum
-# Import User model and dependency getter
-from ....models.user import User as UserModel
+# Import authenticated-user identity and dependency getter
+from ....core.user_cache import AuthenticatedUser
 from ....api import deps
 
 router = APIRouter()
@@ -27,29 +29,45 @@ class GrowthInsightsResponse(BaseModel):
 
 @router.get("", response_model=GrowthInsightsResponse)
 async def get_growth_insights(
-    db: AsyncSession = Depends(get_db_session), # DB session dependency
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db_session), # Read-only session (replica when configured)
     period_days: int = 30, # Default period
-    current_user: UserModel = Depends(deps.get_current_user) # Auth dependency
+    current_user: AuthenticatedUser = Depends(deps.get_current_user) # Auth dependency
 ):
     """
     Calculate and retrieve growth insights based on the current authenticated
     user's stored thoughts for the specified period (default 30 days).
+    Returns 304 if the client's ETag is still current.
     """
-    logger.info(f"User '{current_user.username}' (ID: {current_user.id}) generating growth insights for last {period_days} days.")
+    logger.info("User '%s' (ID: %s) generating growth insights for last %s days.", current_user.username, current_user.id, period_days)
 
     try:
-        # Calculate date range
-        end_date = datetime.now(timezone.utc)
-        start_date = end_date - timedelta(days=period_days)
+        # Calculate day range (UTC calendar days, today inclusive)
+        end_day = datetime.now(timezone.utc).date()
+        start_day = end_day - timedelta(days=max(period_days, 1) - 1)
 
-        # Fetch thoughts FOR THE CURRENT USER using CRUD operation
-        thoughts = await crud_thought.get_thoughts_for_period(
-            db=db, user_id=current_user.id, start_date=start_date, end_date=end_date, limit=1000 # Higher limit for stats
+        # The window slides daily, so the ETag covers today's date and the period as well as the data version
+        version = await crud_user.get_data_version(db, user_id=current_user.id)
+        if version is not None:
+            etag = data_etag(current_user.id, version, end_day.isoformat(), f"d{period_days}")
+            response.headers["ETag"] = etag
+            response.headers["Cache-Control"] = CACHE_CONTROL
+            if etag_matches(request, etag):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED,
+                    headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+                )
+
+        # Aggregate the daily rollup FOR THE CURRENT USER: at most period_days * moods rows
+        daily_counts = await crud_thought_stats.get_counts_by_day(
+            db=db, user_id=current_user.id, start_day=start_day, end_day=end_day
         )
 
         # --- Calculate Insights ---
-        if not thoughts:
-            logger.info(f"No thoughts found for insight calculation for user {current_user.id}.")
+        total_thoughts = sum(count for _, _, count in daily_counts)
+        if total_thoughts == 0:
+            logger.info("No thoughts found for insight calculation for user %s.", current_user.id)
             # No DB changes, no commit needed
             return GrowthInsightsResponse(
                 total_thoughts=0,
@@ -57,16 +75,16 @@ async def get_growth_insights(
                 recent_growth_trend="No data"
             )
 
-        total_thoughts = len(thoughts)
-
         # Calculate Mood Distribution
-        mood_counts = Counter(thought.mood.value for thought in thoughts)
+        mood_counts = Counter()
+        for _, mood, count in daily_counts:
+            mood_counts[mood.value] += count
         # Ensure all mood keys exist, even if count is 0
         mood_distribution = {mood.value: mood_counts.get(mood.value, 0) for mood in MoodEnum}
 
         # Calculate Recent Growth Trend (Simple Example)
-        mid_date = start_date + (end_date - start_date) / 2
-        first_half_count = sum(1 for t in thoughts if t.created_at < mid_date)
+        mid_day = start_day + (end_day - start_day + timedelta(days=1)) / 2
+        first_half_count = sum(count for day, _, count in daily_counts if day < mid_day)
         second_half_count = total_thoughts - first_half_count
 
         recent_growth_trend = "stable"
@@ -76,7 +94,7 @@ async def get_growth_insights(
         elif first_half_count > second_half_count * 1.2 and first_half_count > 0: # Avoid division by zero if 2nd half is 0
              recent_growth_trend = "decreasing"
 
-        logger.info(f"Insights calculated for user {current_user.id}: total={total_thoughts}, moods={mood_distribution}, trend={recent_growth_trend}")
+        logger.info("Insights calculated for user %s: total=%s, moods=%s, trend=%s", current_user.id, total_thoughts, mood_distribution, recent_growth_trend)
 
         # No DB changes, no commit needed
         return GrowthInsightsResponse(
@@ -86,8 +104,8 @@ async def get_growth_insights(
         )
 
     except Exception as e:
-        # Rollback happens in get_db_session exception handler
-        logger.error(f"Error generating growth insights for user {current_user.id}: {e}", exc_info=True)
+        # Rollback happens in get_read_db_session exception handler
+        logger.error("Error generating growth insights for user %s: %s", current_user.id, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Could not generate growth insights.",
@@ -1,86 +1,40 @@
 ﻿import logging
 import json
-from fastapi import APIRouter, Depends, HTTPException, status
+from contextlib import nullcontext
+from typing import AsyncIterator, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from anthropic import AsyncAnthropic, AnthropicError
 from datetime import datetime, timedelta, timezone
 
 from ....core.config import settings
-from ....schemas.journal import JournalSummaryResponse, JournalSummaryRequest
+from ....core.ai_client import ai_client, AIError # Shared, rate-limited Anthropic client
+from ....core.summary_jobs import summary_job_queue
+from ....core.admission import AdmissionRejected, ai_admission
+from ....schemas.journal import JournalSummaryResponse, JournalSummaryRequest, SummaryJobResponse
 # Import the 'thought' object directly from its source file
 from ....crud.crud_thought import thought as crud_thought
-from ....db.session import get_db_session
-# Import User model and dependency getter
-from ....models.user import User as UserModel
+from ....crud.crud_journal_summary import journal_summary as crud_journal_summary, compute_content_hash
+from ....crud.crud_summary_job import summary_job as crud_summary_job
+from ....models.summary_job import SummaryJob
+from ....db.session import get_db_session, async_session_maker
+# Import authenticated-user identity and dependency getter
+from ....core.user_cache import AuthenticatedUser
 from ....api import deps
 
 router = APIRouter()
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Configure Anthropic Client
-anthropic_client = None
-if settings.ANTHROPIC_API_KEY and settings.ANTHROPIC_API_KEY != "YOUR_DEFAULT_ANTHROPIC_KEY":
-    try:
-        anthropic_client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
-        logger.info("Anthropic client configured successfully.")
-    except Exception as e:
-        logger.error(f"Error initializing Anthropic client: {e}")
-else:
+if not ai_client.is_configured:
     logger.warning("ANTHROPIC_API_KEY not found or is default. Claude functionality will be disabled.")
 
 
-@router.post("/summary", response_model=JournalSummaryResponse)
-async def generate_journal_summary(
-    request: JournalSummaryRequest, # Request body (currently just period)
-    db: AsyncSession = Depends(get_db_session), # DB session dependency
-    current_user: UserModel = Depends(deps.get_current_user) # Auth dependency
-):
-    """
-    Generates an AI-powered summary for the current authenticated user's
-    journal entries (thoughts) for the past week using Anthropic Claude.
-    """
-    logger.info(f"User '{current_user.username}' (ID: {current_user.id}) generating journal summary for: {request.period}")
+SUMMARY_MODEL = "claude-3-5-sonnet-20240620"
+# Bump whenever the prompt or model changes so cached summaries are not reused
+SUMMARY_PROMPT_VERSION = "2024-06-v1"
 
-    if not anthropic_client:
-        logger.error("Cannot generate summary: Anthropic client is not configured.")
-        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="AI Service Unavailable: Client not configured.")
-
-    # --- Fetch relevant data for the CURRENT USER ---
-    try:
-        # Calculate date range (e.g., past 7 days)
-        end_date = datetime.now(timezone.utc)
-        start_date = end_date - timedelta(days=7)
-        logger.info(f"Fetching thoughts for user {current_user.id} from {start_date.isoformat()} to {end_date.isoformat()}")
-
-        # Fetch thoughts using CRUD operation, passing the user_id
-        thoughts_data = await crud_thought.get_thoughts_for_period(
-            db=db, user_id=current_user.id, start_date=start_date, end_date=end_date, limit=50 # Limit for prompt size
-        )
-
-        if not thoughts_data:
-            logger.info(f"No thoughts found for user {current_user.id} in the specified period for summary generation.")
-            # Return a default "no data" summary (no DB changes, no commit needed)
-            return JournalSummaryResponse(
-                summary="No journal entries found for the past week to generate a summary.",
-                insight="Try adding some thoughts in the Growth Space!",
-                recommendation="Start by planting a seed about how you're feeling today.",
-                highlights=[]
-            )
-
-        # Format thoughts data for the prompt
-        formatted_entries = "\n".join(
-            [f"- {t.created_at.strftime('%Y-%m-%d')}: [{t.mood.value}] {t.content}" for t in thoughts_data]
-        )
-        logger.info(f"Formatted {len(thoughts_data)} entries for AI prompt for user {current_user.id}.")
-
-    except Exception as e:
-        # Rollback happens in get_db_session exception handler
-        logger.error(f"Database error fetching thoughts for user {current_user.id} summary: {e}", exc_info=True)
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error fetching journal data.")
-
-    # --- Define the prompt structure for Claude ---
-    system_prompt = """You are an AI assistant for the NeuroNest mental wellness app. Your task is to analyze the user's provided journal entries (thoughts) from the past week and generate a supportive summary.
+# --- Prompt structure for Claude ---
+SUMMARY_SYSTEM_PROMPT = """You are an AI assistant for the NeuroNest mental wellness app. Your task is to analyze the user's provided journal entries (thoughts) from the past week and generate a supportive summary.
 
     The entries are provided in the format: "- YYYY-MM-DD: [mood] Content of the thought"
 
@@ -104,64 +58,380 @@ async def generate_journal_summary(
 
     Make the content encouraging, supportive, and focused on growth and self-compassion, directly reflecting the user's provided thoughts. If entries are sparse or lack detail, acknowledge that gently in the summary.
     """
+
+
+def _no_entries_summary() -> JournalSummaryResponse:
+    """Default summary when the user has no thoughts in the period."""
+    return JournalSummaryResponse(
+        summary="No journal entries found for the past week to generate a summary.",
+        insight="Try adding some thoughts in the Growth Space!",
+        recommendation="Start by planting a seed about how you're feeling today.",
+        highlights=[]
+    )
+
+
+async def _prepare_summary(
+    db: AsyncSession, *, user_id: int, period: str
+) -> Tuple[Optional[JournalSummaryResponse], Optional[str], Optional[str]]:
+    """
+    Loads the user's past-week thoughts and checks the summary cache.
+    Returns (ready_response, user_message_content, content_hash): ready_response
+    is set when no AI call is needed (no entries, or a stored summary exists).
+    """
+    # Calculate date range (e.g., past 7 days)
+    end_date = datetime.now(timezone.utc)
+    start_date = end_date - timedelta(days=7)
+    logger.info("Fetching thoughts for user %s from %s to %s", user_id, start_date.isoformat(), end_date.isoformat())
+
+    # Fetch thoughts using CRUD operation, passing the user_id
+    thoughts_data = await crud_thought.get_thoughts_for_period(
+        db=db, user_id=user_id, start_date=start_date, end_date=end_date, limit=50 # Limit for prompt size
+    )
+
+    if not thoughts_data:
+        logger.info("No thoughts found for user %s in the specified period for summary generation.", user_id)
+        # Return a default "no data" summary (no DB changes, no commit needed)
+        return _no_entries_summary(), None, None
+
+    # Format thoughts data for the prompt
+    formatted_entries = "\n".join(
+        [f"- {t.created_at.strftime('%Y-%m-%d')}: [{t.mood.value}] {t.content}" for t in thoughts_data]
+    )
+    logger.info("Formatted %s entries for AI prompt for user %s.", len(thoughts_data), user_id)
+
+    # --- Serve a stored summary if these exact entries were summarized before ---
+    content_hash = compute_content_hash(thoughts_data, SUMMARY_PROMPT_VERSION)
+    cached_summary = await crud_journal_summary.get_cached(
+        db, user_id=user_id, period=period, content_hash=content_hash
+    )
+    if cached_summary is not None:
+        logger.info("Serving cached journal summary for user %s (hash %s).", user_id, content_hash[:12])
+        return cached_summary, None, content_hash
+
     user_message_content = f"Here are my journal entries from the past week:\n{formatted_entries}\n\nPlease generate the journal summary based *only* on these entries."
+    return None, user_message_content, content_hash
 
 
-    # --- Call Anthropic API ---
+def _parse_summary_text(response_text: str) -> JournalSummaryResponse:
+    """Parses and validates Claude's JSON output. Raises ValueError on a bad format."""
+    parsed_response = json.loads(response_text)
+    if not isinstance(parsed_response, dict):
+        raise ValueError("AI response is not a JSON object")
+    # Basic validation
+    required_keys = ["summary", "insight", "recommendation", "highlights"]
+    if not all(k in parsed_response for k in required_keys):
+        raise ValueError("Missing required keys in AI response")
+    if not isinstance(parsed_response.get("highlights"), list):
+         raise ValueError("Highlights key is not a list")
+    return JournalSummaryResponse(**parsed_response)
+
+
+async def _store_summary(
+    db: AsyncSession, *, user_id: int, period: str, content_hash: str, summary: JournalSummaryResponse
+) -> None:
+    """Stores a generated summary for identical future requests; failures are only logged."""
     try:
-        logger.info(f"Sending request to Anthropic Claude API for user {current_user.id}...")
-        message = await anthropic_client.messages.create(
-            model="claude-3-5-sonnet-20240620",
-            max_tokens=2000, # Adjust as needed
-            temperature=0.7,
-            system=system_prompt,
-            messages=[{"role": "user", "content": user_message_content}]
+        await crud_journal_summary.store(
+            db, user_id=user_id, period=period, content_hash=content_hash, summary=summary,
         )
-        logger.info(f"Received response from Anthropic Claude API for user {current_user.id}.")
+        await db.commit()
+    except Exception as cache_error:
+        await db.rollback()
+        logger.warning("Could not store journal summary for user %s: %s", user_id, cache_error)
+
+
+def _anthropic_error_detail(e: AIError) -> Tuple[int, str]:
+    """Maps an Anthropic error to (HTTP status, client-facing detail)."""
+    error_status = getattr(e, "status_code", None)
+    error_message = getattr(e, "message", str(e))
+    status_code = error_status if isinstance(error_status, int) and 400 <= error_status < 600 else 500
+    detail_message = f"AI service error: {error_message}"
+    # Customize messages based on common Anthropic errors if desired
+    if error_status == 401: detail_message = "AI Service Error: Authentication failed (Check API Key)."
+    elif error_status == 429: detail_message = "AI Service Error: Rate limit exceeded."
+    elif error_status == 400: detail_message = f"AI Service Error: Invalid request ({error_message})."
+    return status_code, detail_message
+
+
+async def generate_summary(
+    db: AsyncSession, *, user_id: int, period: str, admit: bool = False
+) -> JournalSummaryResponse:
+    """
+    Produces the past-week summary for a user: stored summary if the entries
+    are unchanged, otherwise a fresh Claude call whose result is stored.
+    Shared by the interactive endpoint (`admit=True`: the Claude call, not a
+    stored summary, goes through AI admission control) and the job workers.
+    Raises HTTPException on failure.
+    """
+    # --- Fetch relevant data for the user ---
+    try:
+        ready_response, user_message_content, content_hash = await _prepare_summary(
+            db, user_id=user_id, period=period
+        )
+        # End the read transaction so no pooled connection is held during the AI call
+        await db.commit()
+    except Exception as e:
+        # Rollback happens in get_db_session exception handler
+        logger.error("Database error fetching thoughts for user %s summary: %s", user_id, e, exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error fetching journal data.")
+    if ready_response is not None:
+        return ready_response
+
+    if not ai_client.is_configured:
+        logger.error("Cannot generate summary: Anthropic client is not configured.")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="AI Service Unavailable: Client not configured.")
+
+    # --- Call Anthropic API ---
+    try:
+        async with deps.admitted_ai_call(user_id) if admit else nullcontext():
+            logger.info("Sending request to Anthropic Claude API for user %s...", user_id)
+            message = await ai_client.create_message(
+                model=SUMMARY_MODEL,
+                max_tokens=2000, # Adjust as needed
+                temperature=0.7,
+                system=SUMMARY_SYSTEM_PROMPT,
+                messages=[{"role": "user", "content": user_message_content}]
+            )
+        logger.info("Received response from Anthropic Claude API for user %s.", user_id)
 
         # --- Process the response ---
         if not message.content or not isinstance(message.content, list) or len(message.content) == 0:
-             logger.error(f"Anthropic response content missing/invalid for user {current_user.id}.")
+             logger.error("Anthropic response content missing/invalid for user %s.", user_id)
              raise HTTPException(status_code=500, detail="AI service returned an unexpected response structure.")
         if message.content[0].type != "text":
-              logger.error(f"Anthropic response content type not 'text' for user {current_user.id}, got '{message.content[0].type}'.")
+              logger.error("Anthropic response content type not 'text' for user %s, got '%s'.", user_id, message.content[0].type)
               raise HTTPException(status_code=500, detail="AI service returned non-text content.")
 
         response_text = message.content[0].text.strip()
 
         # Attempt to parse the JSON response
         try:
-            parsed_response = json.loads(response_text)
-            # Basic validation
-            required_keys = ["summary", "insight", "recommendation", "highlights"]
-            if not all(k in parsed_response for k in required_keys):
-                raise ValueError("Missing required keys in AI response")
-            if not isinstance(parsed_response.get("highlights"), list):
-                 raise ValueError("Highlights key is not a list")
-
-            logger.info(f"Successfully parsed JSON response from Claude for user {current_user.id}.")
-            # No DB changes made in this endpoint, so no commit needed
-            return JournalSummaryResponse(**parsed_response)
-
+            summary_response = _parse_summary_text(response_text)
+            logger.info("Successfully parsed JSON response from Claude for user %s.", user_id)
         except (json.JSONDecodeError, ValueError) as json_error:
-            logger.error(f"Failed to parse JSON response from AI for user {current_user.id}: {json_error}")
-            logger.error(f"Raw AI response text for user {current_user.id}: {response_text}")
+            logger.error("Failed to parse JSON response from AI for user %s: %s", user_id, json_error)
+            # Journal-derived text: only its size at ERROR, the (capped) text itself at DEBUG
+            logger.error("Raw AI response for user %s was %s chars; enable DEBUG to log it.", user_id, len(response_text))
+            logger.debug("Raw AI response text for user %s: %s", user_id, response_text)
             error_detail = f"AI service returned an invalid format. See logs. Raw start: '{response_text[:100]}...'"
             raise HTTPException(status_code=500, detail=error_detail)
 
-    except AnthropicError as e:
+        await _store_summary(
+            db, user_id=user_id, period=period,
+            content_hash=content_hash, summary=summary_response,
+        )
+        return summary_response
+
+    except HTTPException:
+        raise
+
+    except AIError as e:
         # Handle Anthropic-specific API errors
-        logger.error(f"Anthropic API error for user {current_user.id}: {e.status_code} - {e.message}", exc_info=True)
-        status_code = e.status_code if isinstance(e.status_code, int) and 400 <= e.status_code < 600 else 500
-        detail_message = f"AI service error: {e.message}"
-        # Customize messages based on common Anthropic errors if desired
-        if e.status_code == 401: detail_message = "AI Service Error: Authentication failed (Check API Key)."
-        elif e.status_code == 429: detail_message = "AI Service Error: Rate limit exceeded."
-        elif e.status_code == 400: detail_message = f"AI Service Error: Invalid request ({e.message})."
+        logger.error("Anthropic API error for user %s: %s", user_id, e, exc_info=True)
+        status_code, detail_message = _anthropic_error_detail(e)
         raise HTTPException(status_code=status_code, detail=detail_message)
 
     except Exception as e:
         # Handle other unexpected errors
-        logger.error(f"Unexpected error generating summary for user {current_user.id}: {e}", exc_info=True)
+        logger.error("Unexpected error generating summary for user %s: %s", user_id, e, exc_info=True)
         detail_message = f"An unexpected error occurred: {type(e).__name__}"
-        raise HTTPException(status_code=500, detail=detail_message)
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=detail_message)
+
+
+@router.post("/summary", response_model=JournalSummaryResponse)
+async def generate_journal_summary(
+    request: JournalSummaryRequest, # Request body (currently just period)
+    db: AsyncSession = Depends(get_db_session), # DB session dependency
+    current_user: AuthenticatedUser = Depends(deps.get_current_user) # Auth dependency
+):
+    """
+    Generates an AI-powered summary for the current authenticated user's
+    journal entries (thoughts) for the past week using Anthropic Claude.
+    Stored summaries are returned directly; a Claude call is subject to AI
+    admission control (429/503 with Retry-After when over limits).
+    """
+    logger.info("User '%s' (ID: %s) generating journal summary for: %s", current_user.username, current_user.id, request.period)
+    return await generate_summary(db, user_id=current_user.id, period=request.period, admit=True)
+
+
+def _job_response(job: SummaryJob) -> SummaryJobResponse:
+    return SummaryJobResponse(
+        job_id=job.id,
+        status=job.status,
+        result=JournalSummaryResponse.model_validate_json(job.result_json) if job.result_json else None,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+    )
+
+
+@router.post("/summary/jobs", response_model=SummaryJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_journal_summary_job(
+    request: JournalSummaryRequest,
+    db: AsyncSession = Depends(get_db_session), # DB session dependency
+    current_user: AuthenticatedUser = Depends(deps.get_current_user) # Auth dependency
+):
+    """
+    Queues summary generation and returns a job id immediately.
+    Poll GET /summary/jobs/{job_id} for the result. An open job for the same
+    period is returned instead of creating a duplicate. A new job is subject
+    to the per-user AI rate limits and to SUMMARY_JOB_MAX_OPEN_PER_USER open
+    jobs (429 with Retry-After beyond either).
+    """
+    logger.info("User '%s' (ID: %s) submitting journal summary job for: %s", current_user.username, current_user.id, request.period)
+    try:
+        job = await crud_summary_job.get_open(db, user_id=current_user.id, period=request.period)
+        if job is None:
+            open_jobs = await crud_summary_job.count_open(db, user_id=current_user.id)
+            if open_jobs >= settings.SUMMARY_JOB_MAX_OPEN_PER_USER:
+                logger.warning("User %s already has %s open summary jobs; rejecting another.", current_user.id, open_jobs)
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many summary jobs in progress; wait for one to finish.",
+                    headers={"Retry-After": "30"},
+                )
+            try:
+                # Rate limits only; the AI slot is taken by the worker that runs the job
+                ai_admission.check_rate(current_user.id)
+            except AdmissionRejected as rejection:
+                raise deps.admission_http_error(rejection)
+            job = await crud_summary_job.create(db, user_id=current_user.id, period=request.period)
+            await db.commit()
+            summary_job_queue.enqueue(job.id)
+        return _job_response(job)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error submitting summary job for user %s: %s", current_user.id, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Could not submit summary job.",
+        )
+
+
+@router.get("/summary/jobs/{job_id}", response_model=SummaryJobResponse)
+async def get_journal_summary_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db_session), # DB session dependency
+    current_user: AuthenticatedUser = Depends(deps.get_current_user) # Auth dependency
+):
+    """
+    Returns the status of a summary job owned by the current user, including
+    the summary once it has succeeded.
+    """
+    job = await crud_summary_job.get(db, job_id, user_id=current_user.id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Summary job not found")
+    return _job_response(job)
+
+
+def _sse(event: str, data: dict) -> str:
+    """Formats one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/summary/stream")
+async def stream_journal_summary(
+    request: JournalSummaryRequest,
+    http_request: Request,
+    db: AsyncSession = Depends(get_db_session), # DB session dependency (used before streaming starts)
+    current_user: AuthenticatedUser = Depends(deps.get_current_user) # Auth dependency
+):
+    """
+    Streaming variant of /summary as Server-Sent Events.
+
+    Emits `delta` events ({"text": ...}) as Claude generates, then a single
+    `summary` event with the validated JournalSummaryResponse, or an `error`
+    event ({"status": ..., "detail": ...}). Stored summaries are sent as an
+    immediate `summary` event. The upstream stream is closed as soon as the
+    client disconnects. When Claude is needed, rate limits are applied before
+    the stream opens (429/503 with Retry-After); a wait for an AI slot that
+    runs out is reported as an `error` event with status 503.
+    """
+    logger.info("User '%s' (ID: %s) streaming journal summary for: %s", current_user.username, current_user.id, request.period)
+    try:
+        ready_response, user_message_content, content_hash = await _prepare_summary(
+            db, user_id=current_user.id, period=request.period
+        )
+    except Exception as e:
+        logger.error("Database error fetching thoughts for user %s summary: %s", current_user.id, e, exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error fetching journal data.")
+
+    if ready_response is None and not ai_client.is_configured:
+        logger.error("Cannot generate summary: Anthropic client is not configured.")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="AI Service Unavailable: Client not configured.")
+    if ready_response is None:
+        # Rate limits here so rejections are plain 429/503; the AI slot is taken in the body, which outlives this handler
+        try:
+            ai_admission.check_rate(current_user.id)
+            ai_admission.check_queue()
+        except AdmissionRejected as rejection:
+            raise deps.admission_http_error(rejection)
+
+    user_id = current_user.id
+    period = request.period
+
+    async def event_stream() -> AsyncIterator[str]:
+        if ready_response is not None:
+            yield _sse("summary", ready_response.model_dump())
+            return
+
+        chunks = []
+        try:
+            async with ai_admission.slot(): # Waits in the bounded AI queue; held until Claude finishes
+                logger.info("Opening Anthropic Claude stream for user %s...", user_id)
+                async with ai_client.stream_message(
+                    model=SUMMARY_MODEL,
+                    max_tokens=2000,
+                    temperature=0.7,
+                    system=SUMMARY_SYSTEM_PROMPT,
+                    messages=[{"role": "user", "content": user_message_content}]
+                ) as stream:
+                    async for text in stream.text_stream:
+                        if await http_request.is_disconnected():
+                            # Leaving the context manager closes the upstream connection
+                            logger.info("Client disconnected; cancelling Claude stream for user %s.", user_id)
+                            return
+                        chunks.append(text)
+                        yield _sse("delta", {"text": text})
+        except AdmissionRejected as rejection:
+            logger.warning("AI queue wait ran out for user %s; rejecting streamed summary.", user_id)
+            yield _sse("error", {"status": rejection.status_code, "detail": rejection.detail, "retry_after": rejection.retry_after})
+            return
+        except AIError as e:
+            logger.error("Anthropic API error while streaming for user %s: %s", user_id, e, exc_info=True)
+            status_code, detail_message = _anthropic_error_detail(e)
+            yield _sse("error", {"status": status_code, "detail": detail_message})
+            return
+        except Exception as e:
+            logger.error("Unexpected error streaming summary for user %s: %s", user_id, e, exc_info=True)
+            yield _sse("error", {"status": 500, "detail": f"An unexpected error occurred: {type(e).__name__}"})
+            return
+
+        response_text = "".join(chunks).strip()
+        try:
+            summary_response = _parse_summary_text(response_text)
+        except (json.JSONDecodeError, ValueError) as json_error:
+            logger.error("Failed to parse streamed JSON response from AI for user %s: %s", user_id, json_error)
+            # Journal-derived text: only its size at ERROR, the (capped) text itself at DEBUG
+            logger.error("Raw AI response for user %s was %s chars; enable DEBUG to log it.", user_id, len(response_text))
+            logger.debug("Raw AI response text for user %s: %s", user_id, response_text)
+            yield _sse("error", {"status": 500, "detail": "AI service returned an invalid format. See logs."})
+            return
+
+        yield _sse("summary", summary_response.model_dump())
+        logger.info("Streamed journal summary for user %s.", user_id)
+
+        # The request's session may already be closed once streaming starts; use a fresh one
+        if async_session_maker is not None:
+            async with async_session_maker() as store_db:
+                await _store_summary(
+                    store_db, user_id=user_id, period=period,
+                    content_hash=content_hash, summary=summary_response,
+                )
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}, # Disable proxy buffering
+    )
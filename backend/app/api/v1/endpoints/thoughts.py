@@ -1,90 +1,429 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import AsyncIterator, List, Optional
+import json
 import logging
+import time
+import zlib
+from pydantic import ValidationError
 
-from ....schemas.thought import Thought, ThoughtCreate # Removed ThoughtUpdate for now
+from ....schemas.thought import Thought, ThoughtCreate, ThoughtBatchItem, ThoughtWaterRequest, ThoughtImportError, ThoughtImportReport # Removed ThoughtUpdate for now
 from ....crud.crud_thought import thought as crud_thought
-from ....db.session import get_db_session
-from ....models.user import User as UserModel # Import User model
+from ....crud.crud_thought_archive import thought_archive as crud_thought_archive, ARCHIVE_FIELDS
+from ....crud.crud_user import user as crud_user
+from ....db.session import get_db_session, get_read_db_session, read_session_maker
+from ....core.config import settings
+from ....core.serialization import render_thoughts, wants_msgpack
+from ....core.etag import data_etag, etag_matches, CACHE_CONTROL
+from ....core.thought_import import IMPORT_FORMATS, ImportTooLarge, iter_csv, iter_ndjson
+from ....core.pagination import encode_cursor, decode_cursor, encode_rank_cursor, decode_rank_cursor
+from ....core.user_cache import AuthenticatedUser
 from ....api import deps # Import dependency
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+EXPORT_CHUNK_BYTES = 64 * 1024 # Buffer lines into chunks of about this size before sending
+
 @router.post("", response_model=Thought, status_code=status.HTTP_201_CREATED)
 async def create_thought(
     *,
     db: AsyncSession = Depends(get_db_session),
     thought_in: ThoughtCreate,
-    current_user: UserModel = Depends(deps.get_current_user) # Add dependency
+    current_user: AuthenticatedUser = Depends(deps.get_current_user) # Add dependency
 ):
     """
     Create a new thought seed for the current user.
     """
-    logger.info(f"User {current_user.username} creating new thought: mood={thought_in.mood}")
+    logger.info("User %s creating new thought: mood=%s", current_user.username, thought_in.mood)
     try:
         # Pass user_id to CRUD create method
         new_thought = await crud_thought.create(db=db, obj_in=thought_in, user_id=current_user.id)
         await db.commit()
-        logger.info(f"Successfully created and committed thought ID: {new_thought.id} for user {current_user.id}")
+        logger.info("Successfully created and committed thought ID: %s for user %s", new_thought.id, current_user.id)
         return new_thought
     except Exception as e:
-        logger.error(f"Error creating thought for user {current_user.id}: {e}", exc_info=True)
+        logger.error("Error creating thought for user %s: %s", current_user.id, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Could not create thought.",
         )
 
+@router.get("/search", response_model=List[Thought])
+async def search_thoughts(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(20, ge=1, le=100),
+    after: Optional[str] = None, # Opaque cursor from a previous page's X-Next-Cursor header
+    db: AsyncSession = Depends(get_read_db_session), # Replica when configured
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
+):
+    """
+    Full-text search over the current user's thoughts, best match first.
+    Pages are chained with the `X-Next-Cursor` header, as for the list endpoint.
+    """
+    logger.info("User %s searching thoughts: limit=%s, after=%s", current_user.username, limit, after)
+    after_key = None
+    if after is not None:
+        after_key = decode_rank_cursor(after)
+        if after_key is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor.")
+    try:
+        results = await crud_thought.search(db, user_id=current_user.id, query=q, limit=limit, after=after_key)
+        headers = {}
+        if len(results) == limit:
+            last, last_rank = results[-1]
+            headers["X-Next-Cursor"] = encode_rank_cursor(last_rank, last.id)
+        return render_thoughts(request, (found for found, _ in results), headers=headers)
+    except Exception as e:
+        logger.error("Error searching thoughts for user %s: %s", current_user.id, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Could not search thoughts.",
+        )
+
+def _export_line(db_obj) -> str:
+    """One thought as an NDJSON line (same fields as the Thought schema)."""
+    return json.dumps({
+        "id": db_obj.id,
+        "user_id": db_obj.user_id,
+        "content": db_obj.content,
+        "mood": db_obj.mood.value,
+        "growth_stage": db_obj.growth_stage,
+        "created_at": db_obj.created_at.isoformat(),
+        "last_watered_at": db_obj.last_watered_at.isoformat(),
+    }, ensure_ascii=False) + "\n"
+
+def _archived_export_line(record: dict) -> str:
+    """An archived thought (already in export form) as an NDJSON line."""
+    return json.dumps({field: record[field] for field in ARCHIVE_FIELDS}, ensure_ascii=False) + "\n"
+
+async def _export_lines(db: AsyncSession, user_id: int) -> AsyncIterator[str]:
+    """Archived months first (they are the oldest), then the live thoughts."""
+    async for record in crud_thought_archive.stream_archived(db, user_id=user_id):
+        yield _archived_export_line(record)
+    async for db_obj in crud_thought.stream_all(db, user_id=user_id):
+        yield _export_line(db_obj)
+
+async def _export_chunks(user_id: int, compress: bool) -> AsyncIterator[bytes]:
+    """NDJSON export body; rows come from server-side cursors so memory stays flat."""
+    compressor = zlib.compressobj(wbits=31) if compress else None # wbits=31: gzip container
+    buffer: List[str] = []
+    size = 0
+    rows = 0
+    # Own session: the request's session is closed before a streamed body is sent
+    async with read_session_maker() as db:
+        async for line in _export_lines(db, user_id):
+            buffer.append(line)
+            size += len(line)
+            rows += 1
+            if size >= EXPORT_CHUNK_BYTES:
+                chunk = "".join(buffer).encode("utf-8")
+                buffer, size = [], 0
+                chunk = compressor.compress(chunk) if compressor else chunk
+                if chunk:
+                    yield chunk
+    chunk = "".join(buffer).encode("utf-8")
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+    logger.info("Exported %s thoughts for user %s", rows, user_id)
+
+@router.get("/export")
+async def export_thoughts(
+    compress: bool = False, # gzip the file on the fly
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
+):
+    """
+    Download the current user's whole thought history as NDJSON (one JSON object
+    per line, oldest first), optionally gzip-compressed. Includes archived months.
+    """
+    if read_session_maker is None:
+        raise HTTPException(status_code=503, detail="Database service is not configured or unavailable.")
+    logger.info("User %s exporting thoughts: compress=%s", current_user.username, compress)
+    filename = "thoughts.ndjson.gz" if compress else "thoughts.ndjson"
+    return StreamingResponse(
+        _export_chunks(current_user.id, compress),
+        media_type="application/gzip" if compress else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()
+    )
+
+@router.post("/import", response_model=ThoughtImportReport)
+async def import_thoughts(
+    request: Request,
+    format: Optional[str] = None, # ndjson | csv; defaults from Content-Type
+    db: AsyncSession = Depends(get_db_session),
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
+):
+    """
+    Bulk import thoughts from an NDJSON or CSV request body (fields: content,
+    mood, created_at). The body is parsed as it arrives and loaded in chunks of
+    THOUGHT_IMPORT_CHUNK_ROWS, each in its own transaction. Invalid rows are
+    reported and skipped; they don't stop the import. Uploads over
+    THOUGHT_IMPORT_MAX_BYTES stop there, like the row limit.
+    """
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    if format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported import format: {format}")
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > settings.THOUGHT_IMPORT_MAX_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Import uploads are limited to {settings.THOUGHT_IMPORT_MAX_BYTES} bytes.",
+        )
+    parse = iter_csv if format == "csv" else iter_ndjson
+    logger.info("User %s importing thoughts: format=%s", current_user.username, format)
+
+    started = time.perf_counter()
+    imported = 0
+    failed = 0
+    errors: List[ThoughtImportError] = []
+    chunk: List[ThoughtBatchItem] = []
+    chunk_rows: List[int] = []
+
+    def reject(row: int, message: str) -> None:
+        nonlocal failed
+        failed += 1
+        if len(errors) < settings.THOUGHT_IMPORT_MAX_ERRORS:
+            errors.append(ThoughtImportError(row=row, error=message))
+
+    async def load_chunk() -> None:
+        nonlocal imported
+        if not chunk:
+            return
+        try:
+            imported += await crud_thought.import_rows(db, objs_in=chunk, user_id=current_user.id)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error("Error importing rows %s-%s for user %s: %s", chunk_rows[0], chunk_rows[-1], current_user.id, e, exc_info=True)
+            for row in chunk_rows:
+                reject(row, "Could not be saved.")
+        chunk.clear()
+        chunk_rows.clear()
+
+    last_row = 0
+    rows = parse(
+        request.stream(),
+        max_record_bytes=settings.THOUGHT_IMPORT_MAX_RECORD_BYTES,
+        max_body_bytes=settings.THOUGHT_IMPORT_MAX_BYTES,
+    )
+    try:
+        async for row, record in rows:
+            last_row = row
+            if row > settings.THOUGHT_IMPORT_MAX_ROWS:
+                reject(row, f"Import limit of {settings.THOUGHT_IMPORT_MAX_ROWS} rows reached; remaining rows ignored.")
+                break
+            if isinstance(record, str):
+                reject(row, record)
+                continue
+            try:
+                chunk.append(ThoughtBatchItem.model_validate(record))
+                chunk_rows.append(row)
+            except ValidationError as e:
+                reject(row, _validation_message(e))
+                continue
+            if len(chunk) >= settings.THOUGHT_IMPORT_CHUNK_ROWS:
+                await load_chunk()
+    except ImportTooLarge as e:
+        reject(last_row + 1, str(e)) # No Content-Length (chunked upload); keep what was read
+    except ValueError as e:
+        # Unusable upload (e.g. CSV without a content column)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    await load_chunk()
+
+    seconds = time.perf_counter() - started
+    rows_per_second = (imported + failed) / seconds if seconds > 0 else 0.0
+    logger.info(
+        "Imported %s thoughts (%s failed) for user %s in %.2fs (%.0f rows/s)",
+        imported, failed, current_user.id, seconds, rows_per_second,
+    )
+    return ThoughtImportReport(
+        format=format,
+        imported=imported,
+        failed=failed,
+        errors=errors,
+        seconds=round(seconds, 3),
+        rows_per_second=round(rows_per_second, 1),
+    )
+
+@router.post("/batch", response_model=List[Thought], status_code=status.HTTP_201_CREATED)
+async def create_thoughts_batch(
+    *,
+    db: AsyncSession = Depends(get_db_session),
+    thoughts_in: List[ThoughtBatchItem],
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
+):
+    """
+    Create many thoughts at once (e.g. replaying a mobile client's offline queue).
+    All items are inserted in one statement and one transaction: either every
+    thought is created or none is. Optional `created_at` keeps the client's time.
+    """
+    if not thoughts_in:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Batch is empty.")
+    if len(thoughts_in) > settings.THOUGHT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch too large: at most {settings.THOUGHT_BATCH_MAX_ITEMS} thoughts per request.",
+        )
+    logger.info("User %s creating %s thoughts in one batch", current_user.username, len(thoughts_in))
+    try:
+        new_thoughts = await crud_thought.create_many(db=db, objs_in=thoughts_in, user_id=current_user.id)
+        await db.commit()
+        logger.info("Successfully created and committed %s thoughts for user %s", len(new_thoughts), current_user.id)
+        return new_thoughts
+    except Exception as e:
+        logger.error("Error creating thought batch for user %s: %s", current_user.id, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Could not create thoughts.",
+        )
+
 @router.get("", response_model=List[Thought])
 async def read_thoughts(
-    db: AsyncSession = Depends(get_db_session),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db_session), # Replica when configured
     skip: int = 0,
     limit: int = 100,
-    current_user: UserModel = Depends(deps.get_current_user) # Add dependency
+    after: Optional[str] = None, # Opaque cursor from a previous page's X-Next-Cursor header
+    current_user: AuthenticatedUser = Depends(deps.get_current_user) # Add dependency
 ):
     """
-    Retrieve thoughts for the current logged-in user.
+    Retrieve thoughts for the current logged-in user, newest first.
+
+    Pass the `X-Next-Cursor` response header back as `?after=` to fetch the
+    next page; `skip` is only honoured when no cursor is given (legacy).
+    Send `Accept: application/msgpack` for a msgpack body. Responses carry a
+    weak ETag; send it back in `If-None-Match` to get 304 when nothing changed.
     """
-    logger.info(f"User {current_user.username} reading thoughts: skip={skip}, limit={limit}")
+    logger.info("User %s reading thoughts: skip=%s, limit=%s, after=%s", current_user.username, skip, limit, after)
+    after_key = None
+    if after is not None:
+        after_key = decode_cursor(after)
+        if after_key is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor.")
     try:
+        # Version first: a write landing before the list query only makes the ETag stale (a later 200), never wrong
+        version = await crud_user.get_data_version(db, user_id=current_user.id)
+        headers = {}
+        if version is not None:
+            # JSON and msgpack bodies are different representations, so they get different ETags
+            body_format = "msgpack" if wants_msgpack(request) else "json"
+            headers = {
+                "ETag": data_etag(current_user.id, version, body_format),
+                "Cache-Control": CACHE_CONTROL,
+                "Vary": "Accept", # On the 304 too, so caches keep the formats apart
+            }
+            if etag_matches(request, headers["ETag"]):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
         # Pass user_id to CRUD get_multi method
-        thoughts_list = await crud_thought.get_multi(db, user_id=current_user.id, skip=skip, limit=limit)
-        return thoughts_list
+        thoughts_list = await crud_thought.get_multi(
+            db, user_id=current_user.id, skip=skip, limit=limit, after=after_key
+        )
+        if thoughts_list and len(thoughts_list) == limit:
+            last = thoughts_list[-1]
+            headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+        # Serialized once, bypassing response_model re-validation
+        return render_thoughts(request, thoughts_list, headers=headers)
     except Exception as e:
-        logger.error(f"Error reading thoughts for user {current_user.id}: {e}", exc_info=True)
+        logger.error("Error reading thoughts for user %s: %s", current_user.id, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Could not retrieve thoughts.",
         )
 
+@router.put("/water", response_model=List[Thought])
+async def water_thoughts(
+    *,
+    db: AsyncSession = Depends(get_db_session),
+    water_in: ThoughtWaterRequest,
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
+):
+    """
+    Water several thought-plants owned by the current user in one statement.
+    Returns the watered thoughts; ids that are not found or not owned are skipped.
+    """
+    if len(water_in.thought_ids) > settings.THOUGHT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Too many thoughts: at most {settings.THOUGHT_BATCH_MAX_ITEMS} per request.",
+        )
+    logger.info("User %s watering %s thoughts", current_user.username, len(water_in.thought_ids))
+    try:
+        watered = await crud_thought.water_many(db=db, thought_ids=water_in.thought_ids, user_id=current_user.id)
+        await db.commit()
+        logger.info("Successfully watered and committed %s thoughts for user %s", len(watered), current_user.id)
+        return watered
+    except Exception as e:
+        logger.error("Error watering thoughts for user %s: %s", current_user.id, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Could not water thoughts.",
+        )
+
 @router.put("/{thought_id}/water", response_model=Thought)
 async def water_thought(
     *,
     db: AsyncSession = Depends(get_db_session),
     thought_id: int,
-    current_user: UserModel = Depends(deps.get_current_user) # Add dependency
+    current_user: AuthenticatedUser = Depends(deps.get_current_user) # Add dependency
 ):
     """
     Water a specific thought-plant owned by the current user.
     """
-    logger.info(f"User {current_user.username} attempting to water thought ID: {thought_id}")
+    logger.info("User %s attempting to water thought ID: %s", current_user.username, thought_id)
     try:
         # Pass user_id to CRUD water_thought method for ownership check
         updated_thought = await crud_thought.water_thought(db=db, thought_id=thought_id, user_id=current_user.id)
 
         if not updated_thought:
-            logger.warning(f"Thought ID {thought_id} not found or not owned by user {current_user.id} for watering.")
+            logger.warning("Thought ID %s not found or not owned by user %s for watering.", thought_id, current_user.id)
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Thought not found or not owned by user")
 
         await db.commit()
-        logger.info(f"Successfully watered and committed thought ID: {thought_id} for user {current_user.id}")
+        logger.info("Successfully watered and committed thought ID: %s for user %s", thought_id, current_user.id)
         return updated_thought
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error watering thought {thought_id} for user {current_user.id}: {e}", exc_info=True)
+        logger.error("Error watering thought %s for user %s: %s", thought_id, current_user.id, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Could not water thought.",
-        )
\ No newline at end of file
+        )
+
+@router.delete("/{thought_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_thought(
+    *,
+    db: AsyncSession = Depends(get_db_session),
+    thought_id: int,
+    current_user: AuthenticatedUser = Depends(deps.get_current_user)
+):
+    """
+    Delete a thought owned by the current user.
+    """
+    logger.info("User %s deleting thought ID: %s", current_user.username, thought_id)
+    try:
+        deleted = await crud_thought.remove(db=db, id=thought_id, user_id=current_user.id)
+        if not deleted:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Thought not found or not owned by user")
+        await db.commit()
+        logger.info("Successfully deleted thought ID: %s for user %s", thought_id, current_user.id)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error deleting thought %s for user %s: %s", thought_id, current_user.id, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Could not delete thought.",
+        )
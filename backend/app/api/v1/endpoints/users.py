@@ -7,7 +7,7 @@ from ....schemas.user import User, UserCreate # Import only needed User schemas
 from ....crud.crud_user import user as crud_user # Import user CRUD directly
 from ....api import deps # Import the dependency getter
 from ....db.session import get_db_session
-from ....models.user import User as UserModel # Import the DB model
+from ....core.user_cache import AuthenticatedUser
 
 router = APIRouter()
 logger = logging.getLogger(__name__) # Added logger instance
@@ -21,26 +21,26 @@ async def create_user_signup(
     """
     Create new user (sign up).
     """
-    logger.info(f"Signup attempt for username: {user_in.username}")
-    # Check if user already exists
-    existing_user = await crud_user.get_by_username(db, username=user_in.username)
-    if existing_user:
-        logger.warning(f"Signup failed: Username '{user_in.username}' already exists.")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="A user with this username already exists.",
-        )
+    logger.info("Signup attempt for username: %s", user_in.username)
     try:
-        # Create user in DB transaction
+        # Create user in DB transaction; None means the username is taken
         new_user = await crud_user.create(db=db, obj_in=user_in)
+        if new_user is None:
+            logger.warning("Signup failed: Username '%s' already exists.", user_in.username)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A user with this username already exists.",
+            )
         # Commit the transaction
         await db.commit()
-        logger.info(f"Successfully created and committed user: {new_user.username} (ID: {new_user.id})")
+        logger.info("Successfully created and committed user: %s (ID: %s)", new_user.username, new_user.id)
         # Return the created user data (excluding password)
         return new_user
+    except HTTPException:
+        raise
     except Exception as e:
         # Rollback handled by get_db_session
-        logger.error(f"Error creating user '{user_in.username}': {e}", exc_info=True)
+        logger.error("Error creating user '%s': %s", user_in.username, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Could not create user due to a server error.",
@@ -49,12 +49,12 @@ async def create_user_signup(
 
 @router.get("/me", response_model=User)
 async def read_users_me(
-    current_user: UserModel = Depends(deps.get_current_user) # Use the dependency
+    current_user: AuthenticatedUser = Depends(deps.get_current_user) # Use the dependency
 ):
     """
     Get current logged-in user's details.
     """
-    logger.info(f"Fetching details for current user: {current_user.username}")
+    logger.info("Fetching details for current user: %s", current_user.username)
     # The dependency already fetched the user object
     return current_user
 
@@ -0,0 +1,70 @@
+"""
+Moves months of thoughts older than THOUGHT_ARCHIVE_AFTER_MONTHS out of the
+live `thoughts` table into `thoughts_archive`. On Postgres the month's
+partition is detached (briefly locking `thoughts`), then archived and
+dropped; the thoughts stay in the user's export.
+Also creates any missing future partitions first.
+
+Usage (from the backend directory):
+    python -m app.commands.archive_thoughts [--older-than-months N] [--dry-run]
+"""
+import argparse
+import asyncio
+import logging
+from datetime import date, datetime, timezone
+from typing import List
+
+from ..core.config import settings
+from ..db import base as _models # Registers all models so relationships resolve
+from ..db.session import async_session_maker
+from ..db.partitions import add_months, ensure_thought_partitions, month_start
+from ..crud.crud_thought_archive import thought_archive as crud_thought_archive
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def archive(older_than_months: int, dry_run: bool = False) -> List[date]:
+    if async_session_maker is None:
+        raise RuntimeError("Database session maker is not available (configuration error?).")
+    cutoff = add_months(month_start(datetime.now(timezone.utc).date()), -older_than_months)
+    async with async_session_maker() as session:
+        created = await ensure_thought_partitions(session)
+        await session.commit()
+        if created:
+            logger.info("Created %s monthly thought partitions.", created)
+        months = await crud_thought_archive.months_to_archive(session, before=cutoff)
+
+    if dry_run:
+        return months
+    for month in months:
+        async with async_session_maker() as session:
+            if await crud_thought_archive.detach_month(session, month=month):
+                await session.commit() # Releases the lock on `thoughts` before the slow part
+        # One transaction per month, so a failure keeps the months already archived;
+        # a month that was detached but not archived is picked up again by the next run
+        async with async_session_maker() as session:
+            count = await crud_thought_archive.archive_month(session, month=month)
+            await session.commit()
+        logger.info("Archived %s thoughts from %s.", count, f"{month:%Y-%m}")
+    return months
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Archive months of thoughts older than a cutoff.")
+    parser.add_argument(
+        "--older-than-months", type=int, default=settings.THOUGHT_ARCHIVE_AFTER_MONTHS,
+        help="Archive months that ended more than this many months ago.",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Only list the months that would be archived.")
+    args = parser.parse_args()
+    if args.older_than_months < 1:
+        parser.error("--older-than-months must be at least 1")
+
+    months = asyncio.run(archive(args.older_than_months, args.dry_run))
+    listed = ", ".join(f"{month:%Y-%m}" for month in months) or "none"
+    if args.dry_run:
+        logger.info("Months that would be archived: %s", listed)
+    else:
+        logger.info("Archive complete: %s months (%s).", len(months), listed)
+
+if __name__ == "__main__":
+    main()
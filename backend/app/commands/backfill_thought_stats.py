@@ -0,0 +1,37 @@
+"""
+Rebuilds the `thought_daily_stats` rollup from the `thoughts` table.
+
+Usage (from the backend directory):
+    python -m app.commands.backfill_thought_stats [--user-id ID]
+"""
+import argparse
+import asyncio
+import logging
+
+from ..db import base as _models # Registers all models so relationships resolve
+from ..db.session import async_session_maker
+from ..crud.crud_thought_stats import thought_stats as crud_thought_stats
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def backfill(user_id: int | None = None) -> int:
+    if async_session_maker is None:
+        raise RuntimeError("Database session maker is not available (configuration error?).")
+    async with async_session_maker() as session:
+        rows = await crud_thought_stats.backfill(session, user_id=user_id)
+        await session.commit()
+    return rows
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill thought_daily_stats from thoughts.")
+    parser.add_argument("--user-id", type=int, default=None, help="Only rebuild stats for this user.")
+    args = parser.parse_args()
+
+    scope = f"user {args.user_id}" if args.user_id is not None else "all users"
+    logger.info("Backfilling thought_daily_stats for %s...", scope)
+    rows = asyncio.run(backfill(args.user_id))
+    logger.info("Backfill complete: %s stats rows written.", rows)
+
+if __name__ == "__main__":
+    main()
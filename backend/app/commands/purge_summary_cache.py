@@ -0,0 +1,32 @@
+"""
+Evicts stored journal summaries older than SUMMARY_CACHE_MAX_AGE_DAYS.
+Per-user overflow is trimmed whenever a summary is stored; this catches
+users who have stopped requesting summaries.
+
+Usage (from the backend directory):
+    python -m app.commands.purge_summary_cache
+"""
+import asyncio
+import logging
+
+from ..db import base as _models # Registers all models so relationships resolve
+from ..db.session import async_session_maker
+from ..crud.crud_journal_summary import journal_summary as crud_journal_summary
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def purge() -> int:
+    if async_session_maker is None:
+        raise RuntimeError("Database session maker is not available (configuration error?).")
+    async with async_session_maker() as session:
+        deleted = await crud_journal_summary.evict_stale(session)
+        await session.commit()
+    return deleted
+
+def main() -> None:
+    deleted = asyncio.run(purge())
+    logger.info("Purged %s stale journal summaries.", deleted)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from .config import settings
+
+class AdmissionRejected(Exception):
+    """A request turned away by admission control; deps maps it to an HTTP error."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = max(int(math.ceil(retry_after)), 1) # Whole seconds for the Retry-After header
+
+class TokenBucket:
+    """`rate` tokens per second up to `burst`; take() spends one token if there is one."""
+
+    def __init__(self, rate: float, burst: float, now: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic() if now is None else now
+
+    def take(self, now: float) -> float:
+        """Spends a token and returns 0, or returns the seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def idle_full(self, now: float) -> bool:
+        """True once the bucket would have refilled completely; it can then be dropped."""
+        return self.tokens + (now - self.updated) * self.rate >= self.burst
+
+class AdmissionController:
+    """
+    Admission control for the AI endpoints, checked before any work is done.
+
+    1. Per-user token bucket: over the user's rate -> 429.
+    2. Global token bucket: over the process-wide rate -> 503.
+    3. At most `max_in_flight` requests run at once; others wait in a FIFO
+       queue of at most `max_queue`, for at most `max_queue_wait` seconds.
+       A full queue or a wait that runs out -> 503.
+
+    Rejections are immediate and carry Retry-After, so a spike of AI requests
+    cannot pile up tasks that starve the cheap endpoints. A rate of 0 turns
+    that bucket off. Everything runs on the event loop thread.
+    """
+
+    def __init__(
+        self, *, user_rate_per_minute: float, user_burst: int, global_rate_per_minute: float,
+        global_burst: int, max_in_flight: int, max_queue: int, max_queue_wait: float,
+    ):
+        self.user_rate = user_rate_per_minute / 60
+        self.user_burst = max(user_burst, 1)
+        self.global_bucket = (
+            TokenBucket(global_rate_per_minute / 60, max(global_burst, 1)) if global_rate_per_minute > 0 else None
+        )
+        self.max_in_flight = max(max_in_flight, 1)
+        self.max_queue = max(max_queue, 0)
+        self.max_queue_wait = max_queue_wait
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        # user_id -> bucket, least recently used first
+        self._user_buckets: "OrderedDict[int, TokenBucket]" = OrderedDict()
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected_user_rate = 0
+        self.rejected_global_rate = 0
+        self.rejected_queue_full = 0
+        self.rejected_queue_timeout = 0
+        self.queue_wait_seconds_total = 0.0
+        self.queue_wait_seconds_max = 0.0
+
+    def check_rate(self, user_id: int) -> None:
+        """Spends a token from the user's and the global bucket, or raises AdmissionRejected."""
+        now = time.monotonic()
+        bucket = None
+        if self.user_rate > 0:
+            bucket = self._user_buckets.pop(user_id, None) or TokenBucket(self.user_rate, self.user_burst, now)
+            self._user_buckets[user_id] = bucket
+            # Buckets that have refilled are the same as new ones; drop them from the old end
+            while len(self._user_buckets) > 1:
+                oldest_user, oldest = next(iter(self._user_buckets.items()))
+                if not oldest.idle_full(now):
+                    break
+                del self._user_buckets[oldest_user]
+            wait = bucket.take(now)
+            if wait:
+                self.rejected_user_rate += 1
+                raise AdmissionRejected(429, "Too many AI requests; please slow down.", wait)
+        if self.global_bucket is not None:
+            wait = self.global_bucket.take(now)
+            if wait:
+                if bucket is not None:
+                    bucket.tokens += 1 # Not admitted, so it does not count against the user
+                self.rejected_global_rate += 1
+                raise AdmissionRejected(503, "AI service is busy; please retry shortly.", wait)
+
+    def check_queue(self) -> None:
+        """Rejects at once if a slot would need a wait and the queue is already full."""
+        if self._slots.locked() and self.queued >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected(503, "AI service is busy; please retry shortly.", self.max_queue_wait)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Holds one of the `max_in_flight` slots, waiting in the bounded queue if needed."""
+        self.check_queue()
+        queued_at = time.perf_counter()
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.max_queue_wait)
+        except asyncio.TimeoutError:
+            self.rejected_queue_timeout += 1
+            raise AdmissionRejected(503, "AI service is busy; please retry shortly.", self.max_queue_wait)
+        finally:
+            self.queued -= 1
+        waited = time.perf_counter() - queued_at
+        self.queue_wait_seconds_total += waited
+        self.queue_wait_seconds_max = max(self.queue_wait_seconds_max, waited)
+        self.admitted += 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    @asynccontextmanager
+    async def admit(self, user_id: Optional[int]) -> AsyncIterator[None]:
+        """Rate limits, then a slot for the duration of the block."""
+        if user_id is not None:
+            self.check_rate(user_id)
+        async with self.slot():
+            yield
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected_user_rate": self.rejected_user_rate,
+            "rejected_global_rate": self.rejected_global_rate,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_queue_timeout": self.rejected_queue_timeout,
+            "queue_wait_seconds_total": round(self.queue_wait_seconds_total, 6),
+            "queue_wait_seconds_max": round(self.queue_wait_seconds_max, 6),
+            "tracked_users": len(self._user_buckets),
+        }
+
+ai_admission = AdmissionController(
+    user_rate_per_minute=settings.AI_USER_RATE_PER_MINUTE,
+    user_burst=settings.AI_USER_BURST,
+    global_rate_per_minute=settings.AI_GLOBAL_RATE_PER_MINUTE,
+    global_burst=settings.AI_GLOBAL_BURST,
+    max_in_flight=settings.AI_MAX_IN_FLIGHT,
+    max_queue=settings.AI_QUEUE_MAX,
+    max_queue_wait=settings.AI_QUEUE_MAX_WAIT_SECONDS,
+)
@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Optional
+
+from .config import settings
+from .metrics import metrics
+
+if TYPE_CHECKING:
+    from anthropic import AsyncAnthropic
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: rate limited, or the upstream is having trouble
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+def _anthropic():
+    """
+    The anthropic SDK, imported on first use. It is the slowest import in the
+    app by far, and cold starts only need it once an AI endpoint is called.
+    """
+    import anthropic
+    return anthropic
+
+class AIError(Exception):
+    """
+    A failed AI call. AIClient raises it in place of the SDK's exceptions (chained
+    as __cause__), so callers can handle errors without importing anthropic.
+    `status_code` is the upstream HTTP status, or None for connection errors.
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+    @classmethod
+    def from_sdk(cls, error: Exception) -> "AIError":
+        return cls(getattr(error, "message", str(error)), getattr(error, "status_code", None))
+
+class AIDeadlineExceeded(AIError):
+    """The call (including queueing and retries) did not finish before its deadline."""
+
+    def __init__(self, message: str):
+        super().__init__(message, status_code=504)
+
+class AIClient:
+    """
+    Shared Anthropic client for all AI endpoints.
+
+    - One AsyncAnthropic instance over a tuned httpx connection pool, built on
+      first use (the SDK itself is imported then too).
+    - A global semaphore caps in-flight LLM calls across the process.
+    - Each call has a deadline covering queueing, the request and any retries.
+    - 429/5xx and connection errors are retried with jittered exponential backoff
+      (honouring Retry-After when the upstream sends it).
+    - Queue wait and upstream latency are recorded for metrics.
+    """
+
+    def __init__(self):
+        self._client: Optional["AsyncAnthropic"] = None
+        self._semaphore = asyncio.Semaphore(max(settings.ANTHROPIC_MAX_CONCURRENCY, 1))
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.in_flight = 0
+        self.queue_wait_seconds_total = 0.0
+        self.queue_wait_seconds_max = 0.0
+        self.upstream_seconds_total = 0.0
+        self.upstream_seconds_max = 0.0
+
+    @property
+    def is_configured(self) -> bool:
+        return bool(settings.ANTHROPIC_API_KEY) and settings.ANTHROPIC_API_KEY != "YOUR_DEFAULT_ANTHROPIC_KEY"
+
+    @property
+    def client(self) -> "AsyncAnthropic":
+        if self._client is None:
+            if not self.is_configured:
+                raise RuntimeError("ANTHROPIC_API_KEY not found or is default.")
+            import httpx
+
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.ANTHROPIC_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.ANTHROPIC_MAX_CONNECTIONS,
+                    keepalive_expiry=30.0,
+                ),
+                timeout=httpx.Timeout(
+                    settings.ANTHROPIC_REQUEST_TIMEOUT, connect=settings.ANTHROPIC_CONNECT_TIMEOUT
+                ),
+            )
+            # Retries are handled here (shared backoff + metrics), not by the SDK
+            self._client = _anthropic().AsyncAnthropic(
+                api_key=settings.ANTHROPIC_API_KEY,
+                base_url=settings.ANTHROPIC_BASE_URL or None,
+                http_client=http_client,
+                max_retries=0,
+            )
+            logger.info("Shared Anthropic client configured successfully.")
+        return self._client
+
+    @asynccontextmanager
+    async def _slot(self, deadline: float) -> AsyncIterator[None]:
+        """Waits for a concurrency slot (bounded by the deadline) and records queue wait."""
+        queued_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=max(deadline - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            self.errors += 1
+            raise AIDeadlineExceeded("Timed out waiting for an AI request slot.")
+        waited = time.perf_counter() - queued_at
+        self.queue_wait_seconds_total += waited
+        self.queue_wait_seconds_max = max(self.queue_wait_seconds_max, waited)
+        metrics.observe_ai(waited, queue_wait=True)
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def _record_upstream(self, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        self.calls += 1
+        self.upstream_seconds_total += elapsed
+        self.upstream_seconds_max = max(self.upstream_seconds_max, elapsed)
+        metrics.observe_ai(elapsed)
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff; Retry-After wins when present."""
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), settings.ANTHROPIC_RETRY_MAX_DELAY)
+            except ValueError:
+                pass
+        cap = min(settings.ANTHROPIC_RETRY_MAX_DELAY, settings.ANTHROPIC_RETRY_BASE_DELAY * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        sdk = _anthropic()
+        if isinstance(error, sdk.APIConnectionError): # Includes APITimeoutError
+            return True
+        return isinstance(error, sdk.APIStatusError) and error.status_code in RETRYABLE_STATUS_CODES
+
+    async def create_message(self, *, timeout: Optional[float] = None, **kwargs: Any):
+        """
+        messages.create with the shared limits. `timeout` (seconds) is the
+        overall deadline, defaulting to ANTHROPIC_REQUEST_TIMEOUT.
+        Raises AIError (AIDeadlineExceeded when out of time).
+        """
+        client = self.client
+        sdk = _anthropic()
+        deadline = time.monotonic() + (timeout or settings.ANTHROPIC_REQUEST_TIMEOUT)
+        attempt = 0
+        while True:
+            async with self._slot(deadline):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.errors += 1
+                    raise AIDeadlineExceeded("AI request deadline exceeded.")
+                started = time.perf_counter()
+                try:
+                    message = await asyncio.wait_for(
+                        client.messages.create(timeout=remaining, **kwargs), timeout=remaining
+                    )
+                    self._record_upstream(started)
+                    return message
+                except asyncio.TimeoutError:
+                    self._record_upstream(started)
+                    self.errors += 1
+                    raise AIDeadlineExceeded("AI request deadline exceeded.")
+                except sdk.AnthropicError as e:
+                    self._record_upstream(started)
+                    error = e
+            # Back off outside the slot so waiting calls are not held up
+            delay = self._backoff_delay(attempt, error)
+            if (
+                not self._is_retryable(error)
+                or attempt >= settings.ANTHROPIC_MAX_RETRIES
+                or time.monotonic() + delay >= deadline
+            ):
+                self.errors += 1
+                raise AIError.from_sdk(error) from error
+            attempt += 1
+            self.retries += 1
+            logger.warning("Retrying AI request in %.2fs after error (attempt %s): %s", delay, attempt, error)
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def stream_message(self, *, timeout: Optional[float] = None, **kwargs: Any):
+        """
+        messages.stream with the shared concurrency limit. The slot is held
+        until the stream is closed. Streams are not retried once opened.
+        SDK errors, including those raised while reading the stream, surface as AIError.
+        """
+        client = self.client
+        sdk = _anthropic()
+        deadline = time.monotonic() + (timeout or settings.ANTHROPIC_REQUEST_TIMEOUT)
+        async with self._slot(deadline):
+            started = time.perf_counter()
+            try:
+                async with client.messages.stream(
+                    timeout=max(deadline - time.monotonic(), 0.001), **kwargs
+                ) as stream:
+                    yield stream
+            except sdk.AnthropicError as e:
+                self.errors += 1
+                raise AIError.from_sdk(e) from e
+            finally:
+                self._record_upstream(started)
+
+    def stats(self) -> dict:
+        """Counters for queue wait and upstream latency, for logs and metrics."""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "in_flight": self.in_flight,
+            "max_concurrency": settings.ANTHROPIC_MAX_CONCURRENCY,
+            "queue_wait_seconds_total": round(self.queue_wait_seconds_total, 6),
+            "queue_wait_seconds_max": round(self.queue_wait_seconds_max, 6),
+            "upstream_seconds_total": round(self.upstream_seconds_total, 6),
+            "upstream_seconds_max": round(self.upstream_seconds_max, 6),
+        }
+
+ai_client = AIClient()
@@ -16,11 +16,114 @@ class Settings(BaseSettings):
     RAW_DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./test.db") # Use a different name temporarily
     DATABASE_URL: str = "" # We will compute this
 
+    # Connection pool; POOL_SIZE + MAX_OVERFLOW is the per-process connection cap (times workers must fit the server's limit)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    # Connections older than this are replaced on checkout; keep below any idle timeout of the server or proxy
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    # Ping on every checkout (one extra round trip); off by default, dead connections are dropped on error instead
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"
+    # asyncpg prepared statements cached per connection; 0 disables (needed behind PgBouncer in transaction mode)
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+    # Log a pool stats line this often (seconds); 0 disables. The same numbers are on /api/metrics
+    DB_POOL_STATS_LOG_SECONDS: float = float(os.getenv("DB_POOL_STATS_LOG_SECONDS", "0"))
+
+    # Optional read replica for read-only routes; empty sends all reads to the primary
+    READ_REPLICA_URL: str = os.getenv("READ_REPLICA_URL", "")
+    # A user who wrote within this many seconds reads from the primary (read-your-writes)
+    READ_YOUR_WRITES_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+    # After a replica connection error, reads go to the primary for this long
+    READ_REPLICA_RETRY_SECONDS: float = float(os.getenv("READ_REPLICA_RETRY_SECONDS", "30"))
+
     # JWT Settings
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "default_super_secret_key_please_change")
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60")) # Increased default
 
+    # Per-process cache of authenticated users (token subject -> identity); 0 disables
+    AUTH_USER_CACHE_SIZE: int = int(os.getenv("AUTH_USER_CACHE_SIZE", "10000"))
+    AUTH_USER_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "60"))
+
+    # Password hashing: bcrypt cost factor (changing it rehashes on next login) and worker threads
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+
+    # Stored AI journal summaries: rows older than MAX_AGE_DAYS or beyond MAX_PER_USER are evicted
+    SUMMARY_CACHE_MAX_AGE_DAYS: int = int(os.getenv("SUMMARY_CACHE_MAX_AGE_DAYS", "30"))
+    SUMMARY_CACHE_MAX_PER_USER: int = int(os.getenv("SUMMARY_CACHE_MAX_PER_USER", "5"))
+
+    # Mindspace practice catalog (normalized mood -> recommendations); PATH enables on-disk warm start
+    MINDSPACE_CATALOG_TTL_SECONDS: float = float(os.getenv("MINDSPACE_CATALOG_TTL_SECONDS", "86400"))
+    MINDSPACE_CATALOG_MAX_SIZE: int = int(os.getenv("MINDSPACE_CATALOG_MAX_SIZE", "500"))
+    MINDSPACE_CATALOG_PATH: str = os.getenv("MINDSPACE_CATALOG_PATH", "")
+
+    # Shared Anthropic client: connection pool, global in-flight cap, deadlines (seconds) and retry backoff
+    ANTHROPIC_MAX_CONNECTIONS: int = int(os.getenv("ANTHROPIC_MAX_CONNECTIONS", "20"))
+    ANTHROPIC_MAX_CONCURRENCY: int = int(os.getenv("ANTHROPIC_MAX_CONCURRENCY", "8"))
+    ANTHROPIC_CONNECT_TIMEOUT: float = float(os.getenv("ANTHROPIC_CONNECT_TIMEOUT", "5"))
+    ANTHROPIC_REQUEST_TIMEOUT: float = float(os.getenv("ANTHROPIC_REQUEST_TIMEOUT", "60"))
+    ANTHROPIC_MAX_RETRIES: int = int(os.getenv("ANTHROPIC_MAX_RETRIES", "3"))
+    ANTHROPIC_RETRY_BASE_DELAY: float = float(os.getenv("ANTHROPIC_RETRY_BASE_DELAY", "0.5"))
+    ANTHROPIC_RETRY_MAX_DELAY: float = float(os.getenv("ANTHROPIC_RETRY_MAX_DELAY", "8"))
+    # Override the API endpoint, e.g. the local fake server used by bench/load.py; empty uses the SDK default
+    ANTHROPIC_BASE_URL: str = os.getenv("ANTHROPIC_BASE_URL", "")
+
+    # Admission control for the AI endpoints: per-user and global token buckets (requests per minute, 0 = off; burst),
+    # then at most MAX_IN_FLIGHT requests at once with up to QUEUE_MAX waiting QUEUE_MAX_WAIT_SECONDS; beyond that 429/503
+    AI_USER_RATE_PER_MINUTE: float = float(os.getenv("AI_USER_RATE_PER_MINUTE", "10"))
+    AI_USER_BURST: int = int(os.getenv("AI_USER_BURST", "5"))
+    AI_GLOBAL_RATE_PER_MINUTE: float = float(os.getenv("AI_GLOBAL_RATE_PER_MINUTE", "300"))
+    AI_GLOBAL_BURST: int = int(os.getenv("AI_GLOBAL_BURST", "30"))
+    AI_MAX_IN_FLIGHT: int = int(os.getenv("AI_MAX_IN_FLIGHT", "16"))
+    AI_QUEUE_MAX: int = int(os.getenv("AI_QUEUE_MAX", "32"))
+    AI_QUEUE_MAX_WAIT_SECONDS: float = float(os.getenv("AI_QUEUE_MAX_WAIT_SECONDS", "5"))
+
+    # Asynchronous summary jobs: worker count, optional daily precompute hour (UTC, -1 disables), retention,
+    # how long a claimed job may run before it is presumed abandoned and re-queued (keep it above the
+    # longest AI call with retries), and how many pending/running jobs one user may have (beyond that 429)
+    SUMMARY_JOB_WORKERS: int = int(os.getenv("SUMMARY_JOB_WORKERS", "2"))
+    SUMMARY_PRECOMPUTE_HOUR_UTC: int = int(os.getenv("SUMMARY_PRECOMPUTE_HOUR_UTC", "-1"))
+    SUMMARY_JOB_RETENTION_DAYS: int = int(os.getenv("SUMMARY_JOB_RETENTION_DAYS", "7"))
+    SUMMARY_JOB_LEASE_SECONDS: float = float(os.getenv("SUMMARY_JOB_LEASE_SECONDS", "900"))
+    SUMMARY_JOB_MAX_OPEN_PER_USER: int = int(os.getenv("SUMMARY_JOB_MAX_OPEN_PER_USER", "3"))
+
+    # Offline sync: max thoughts accepted by one POST /thoughts/batch
+    THOUGHT_BATCH_MAX_ITEMS: int = int(os.getenv("THOUGHT_BATCH_MAX_ITEMS", "200"))
+
+    # Bulk import: rows loaded per transaction, max rows per upload, row errors listed in the report,
+    # max size of one record (longer ones are rejected unbuffered) and of the whole upload
+    THOUGHT_IMPORT_CHUNK_ROWS: int = int(os.getenv("THOUGHT_IMPORT_CHUNK_ROWS", "1000"))
+    THOUGHT_IMPORT_MAX_ROWS: int = int(os.getenv("THOUGHT_IMPORT_MAX_ROWS", "100000"))
+    THOUGHT_IMPORT_MAX_ERRORS: int = int(os.getenv("THOUGHT_IMPORT_MAX_ERRORS", "100"))
+    THOUGHT_IMPORT_MAX_RECORD_BYTES: int = int(os.getenv("THOUGHT_IMPORT_MAX_RECORD_BYTES", "65536"))
+    THOUGHT_IMPORT_MAX_BYTES: int = int(os.getenv("THOUGHT_IMPORT_MAX_BYTES", "52428800")) # 50 MiB
+
+    # Thought history (Postgres): monthly partitions kept this many months ahead, checked every CHECK_SECONDS (0 disables);
+    # archive_thoughts moves whole months older than ARCHIVE_AFTER_MONTHS into thoughts_archive
+    THOUGHT_PARTITION_MONTHS_AHEAD: int = int(os.getenv("THOUGHT_PARTITION_MONTHS_AHEAD", "3"))
+    THOUGHT_PARTITION_CHECK_SECONDS: float = float(os.getenv("THOUGHT_PARTITION_CHECK_SECONDS", "21600"))
+    THOUGHT_ARCHIVE_AFTER_MONTHS: int = int(os.getenv("THOUGHT_ARCHIVE_AFTER_MONTHS", "24"))
+
+    # Request timing and /api/metrics; a TOKEN makes the endpoint require a bearer token, and in production
+    # the endpoint is not served at all without one.
+    # The Server-Timing header (DB/auth timings) is off by default in production; with a TOKEN,
+    # requests sending it as X-Metrics-Token still get the header
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+    SERVER_TIMING_ENABLED: bool = os.getenv(
+        "SERVER_TIMING_ENABLED", "false" if os.getenv("APP_ENV", "development").lower() == "production" else "true"
+    ).lower() == "true"
+
+    # Logging: level, "json" or "text" lines, bounded queue to the writer thread (full = records dropped) and how
+    # long it gathers a batch, cap on message length, and INFO sampling per route prefix, e.g. "/api/health=0,/api/v1/thoughts=0.1"
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json").lower()
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    LOG_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("LOG_FLUSH_INTERVAL_SECONDS", "0.05"))
+    LOG_MAX_MESSAGE_CHARS: int = int(os.getenv("LOG_MAX_MESSAGE_CHARS", "2000"))
+    LOG_SAMPLE_RATES: str = os.getenv("LOG_SAMPLE_RATES", "")
+
     # Pydantic v2+ field validator to modify the database URL
     @field_validator('DATABASE_URL', mode='before')
     @classmethod
@@ -49,10 +152,18 @@ class Settings(BaseSettings):
              logger.warning("Using SQLite database URL.")
              return raw_url
         else:
-            logger.error(f"Unsupported DATABASE_URL scheme: {raw_url[:30]}...")
+            logger.error("Unsupported DATABASE_URL scheme: %s...", raw_url[:30])
             # Return something invalid or raise error? For now, return modified but potentially wrong.
             return raw_url # Or raise ValueError("Invalid database URL scheme")
 
+    @field_validator('READ_REPLICA_URL', mode='before')
+    @classmethod
+    def assemble_replica_connection(cls, v: Optional[str]) -> str:
+        # Same scheme handling as DATABASE_URL: the replica is reached through asyncpg too
+        if v and v.startswith("postgresql://"):
+            return v.replace("postgresql://", "postgresql+asyncpg://", 1)
+        return v or ""
+
     class Config:
         env_file = '.env'
         env_file_encoding = 'utf-8'
@@ -73,4 +184,4 @@ if "sqlite" in settings.DATABASE_URL:
      logger.warning("Warning: Using SQLite database URL.")
 elif not settings.DATABASE_URL.startswith("postgresql+asyncpg://"):
      # This check might be redundant now due to the validator, but keep for safety
-     logger.warning(f"Warning: Final DATABASE_URL does not use asyncpg: {settings.DATABASE_URL[:30]}...")
\ No newline at end of file
+     logger.warning("Warning: Final DATABASE_URL does not use asyncpg: %s...", settings.DATABASE_URL[:30])
\ No newline at end of file
@@ -0,0 +1,25 @@
+from typing import Optional
+
+from fastapi import Request
+
+# Conditional GET helpers. Per-user views (thoughts, insights) are tagged with
+# the user's data version, which is bumped in the same transaction as every
+# change to their thoughts, so an unchanged version means an unchanged view.
+
+def data_etag(user_id: int, version: int, *parts: object) -> str:
+    """Weak ETag for a user's data at `version`; `parts` add other inputs (e.g. today's date)."""
+    suffix = "".join(f".{part}" for part in parts)
+    return f'W/"u{user_id}.v{version}{suffix}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match covers `etag` (weak comparison)."""
+    header: Optional[str] = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+# Clients must revalidate every time, but may reuse the body on a 304
+CACHE_CONTROL = "private, no-cache"
@@ -0,0 +1,292 @@
+import atexit
+import contextvars
+import logging
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+import orjson
+from starlette.datastructures import MutableHeaders
+
+from .config import settings
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# Incoming request ids are reused only if they look like one (no header or log injection)
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+@dataclass
+class RequestLogContext:
+    """Per-request logging state: the request id and the sampling decision, made once per request."""
+    request_id: str
+    scope: dict = field(repr=False)
+    sampled: Optional[bool] = None
+
+_request_log_context: contextvars.ContextVar[Optional[RequestLogContext]] = contextvars.ContextVar(
+    "request_log_context", default=None
+)
+
+def current_request_id() -> Optional[str]:
+    context = _request_log_context.get()
+    return context.request_id if context is not None else None
+
+def parse_sample_rates(raw: str) -> Dict[str, float]:
+    """Parses LOG_SAMPLE_RATES ("/api/health=0,/api/v1/thoughts=0.1") into {route prefix: rate}."""
+    rates = {}
+    for item in raw.split(","):
+        prefix, _, rate = item.strip().partition("=")
+        try:
+            rates[prefix.strip()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            continue
+    rates.pop("", None)
+    # Longest prefix first, so /api/v1/thoughts/export can override /api/v1/thoughts
+    return dict(sorted(rates.items(), key=lambda item: len(item[0]), reverse=True))
+
+class SuccessSampler(logging.Filter):
+    """
+    Keeps a sample of the INFO/DEBUG lines of busy routes; WARNING and above
+    always pass. The decision is made per request, so a sampled request keeps
+    all of its lines and the rest keep none.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self.dropped = 0
+
+    def rate_for(self, path: str) -> float:
+        for prefix, rate in self.rates.items():
+            if path.startswith(prefix):
+                return rate
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        context = _request_log_context.get()
+        if context is None:
+            return True # Startup, workers, CLI
+        if context.sampled is None:
+            route = context.scope.get("route")
+            if route is None:
+                return True # Not routed yet; decide on the first line logged by the endpoint
+            context.sampled = random.random() < self.rate_for(getattr(route, "path", context.scope["path"]))
+        if not context.sampled:
+            self.dropped += 1
+        return context.sampled
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request id and traceback."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return orjson.dumps(entry).decode()
+
+class TextFormatter(logging.Formatter):
+    """Plain lines for local development, with the request id when there is one."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s%(request_tag)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        request_id = getattr(record, "request_id", None)
+        record.request_tag = f" [{request_id}]" if request_id else ""
+        return super().format(record)
+
+def _truncate(text: str, limit: int) -> str:
+    if limit <= 0 or len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [truncated {len(text) - limit} chars]"
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread, which formats and writes them.
+
+    Only the cheap part runs on the calling thread (the event loop): the
+    %-message and traceback are resolved, since their arguments may change
+    later, and capped at `max_chars`. A full queue drops the record rather
+    than block the loop; drops are counted in stats().
+    """
+
+    def __init__(self, log_queue: queue.Queue, max_chars: int):
+        super().__init__(log_queue)
+        self.max_chars = max_chars
+        self.enqueued = 0
+        self.dropped_full = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Modified in place: the root handler runs after those of the record's own logger
+        record.msg = _truncate(record.getMessage(), self.max_chars)
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _truncate(_traceback_formatter.formatException(record.exc_info), self.max_chars * 4)
+            record.exc_info = None
+        record.stack_info = None
+        record.request_id = current_request_id()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped_full += 1
+
+_traceback_formatter = logging.Formatter()
+
+class BatchingQueueListener(QueueListener):
+    """
+    QueueListener that writes in batches: after the first record arrives it
+    waits `flush_interval` seconds, then formats everything queued and writes
+    it with one write and one flush. Waking once per batch instead of once per
+    record keeps the writer thread from competing with the event loop for the
+    GIL on every line.
+    """
+
+    def __init__(self, log_queue: queue.Queue, handler: logging.StreamHandler, flush_interval: float):
+        super().__init__(log_queue, handler)
+        self.flush_interval = flush_interval
+        self.batches = 0
+
+    def _monitor(self) -> None:
+        handler = self.handlers[0]
+        stopping = False
+        while not stopping:
+            batch = [self.queue.get()]
+            if self.flush_interval > 0 and batch[0] is not self._sentinel:
+                time.sleep(self.flush_interval)
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = []
+            for record in batch:
+                if record is self._sentinel:
+                    stopping = True
+                    continue
+                try:
+                    lines.append(handler.format(record))
+                except Exception:
+                    handler.handleError(record)
+            if lines:
+                with handler.lock:
+                    handler.stream.write("\n".join(lines) + "\n")
+                    handler.flush()
+                self.batches += 1
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel) # Blocking: the queue may be full at shutdown
+
+class LoggingSetup:
+    """Owns the queue, handler and listener thread installed by configure_logging()."""
+
+    def __init__(self):
+        self.handler: Optional[NonBlockingQueueHandler] = None
+        self.listener: Optional[BatchingQueueListener] = None
+        self.sampler: Optional[SuccessSampler] = None
+
+    def stop(self) -> None:
+        """Flushes queued records and stops the listener thread."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def stats(self) -> dict:
+        if self.handler is None:
+            return {}
+        return {
+            "enqueued": self.handler.enqueued,
+            "dropped_queue_full": self.handler.dropped_full,
+            "dropped_sampled": self.sampler.dropped if self.sampler is not None else 0,
+            "queue_depth": self.handler.queue.qsize(),
+            "write_batches": self.listener.batches if self.listener is not None else 0,
+        }
+
+logging_setup = LoggingSetup()
+
+def configure_logging() -> None:
+    """
+    Routes all records through a bounded queue to a listener thread that
+    formats (JSON or text) and writes them to stderr in batches, so logging
+    never does I/O on the event loop. Safe to call more than once.
+    """
+    if logging_setup.handler is not None:
+        return
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    handler = NonBlockingQueueHandler(log_queue, settings.LOG_MAX_MESSAGE_CHARS)
+    sampler = SuccessSampler(parse_sample_rates(settings.LOG_SAMPLE_RATES))
+    handler.addFilter(sampler)
+
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JSONFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+    listener = BatchingQueueListener(log_queue, output, settings.LOG_FLUSH_INTERVAL_SECONDS)
+
+    # Record fields neither format prints; skipping them is most of the per-call cost
+    # (see "Optimization" in the logging HOWTO)
+    logging._srcfile = None # Caller file/line lookup
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    logging_setup.handler = handler
+    logging_setup.sampler = sampler
+    logging_setup.listener = listener
+    listener.start()
+    atexit.register(logging_setup.stop)
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware: gives each request an id (the caller's X-Request-ID if
+    valid, else a new one), attaches it to every log line written while the
+    request is handled and returns it in the X-Request-ID response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                incoming = value.decode("latin-1")
+                break
+        request_id = incoming if incoming and _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        token = _request_log_context.set(RequestLogContext(request_id=request_id, scope=scope))
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(REQUEST_ID_HEADER, request_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            _request_log_context.reset(token)
@@ -0,0 +1,217 @@
+import contextvars
+import hmac
+import math
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+from .config import settings
+
+# Upper bounds (seconds) for latency histograms
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+
+@dataclass
+class RequestTimings:
+    """Where one request's time went; shared by every task spawned while handling it."""
+    started: float
+    db_statements: int = 0
+    db_seconds: float = 0.0
+    auth_seconds: float = 0.0
+    ai_seconds: float = 0.0
+
+    def server_timing(self) -> str:
+        total_ms = (time.perf_counter() - self.started) * 1000
+        return (
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_statements} queries", '
+            f"auth;dur={self.auth_seconds * 1000:.1f}, "
+            f"ai;dur={self.ai_seconds * 1000:.1f}, "
+            f"total;dur={total_ms:.1f}"
+        )
+
+_request_timings: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+def current_timings() -> Optional[RequestTimings]:
+    """Timings of the request being handled, or None outside a request (workers, CLI)."""
+    return _request_timings.get()
+
+class Histogram:
+    """Cumulative Prometheus-style histogram, one series per label tuple."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        # labels -> [bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, labels: Tuple[str, ...] = ()) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = series
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        total[0] += value
+
+    def render(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> List[str]:
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for labels, (counts, total) in sorted(self._series.items()):
+            base = [f'{k}="{_escape(v)}"' for k, v in zip(label_names, labels)]
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else repr(bound)
+                bucket_labels = ",".join(base + [f'le="{le}"'])
+                lines.append(f"{name}_bucket{{{bucket_labels}}} {cumulative}")
+            suffix = f'{{{",".join(base)}}}' if base else ""
+            lines.append(f"{name}_sum{suffix} {total[0]:.6f}")
+            lines.append(f"{name}_count{suffix} {cumulative}")
+        return lines
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class Metrics:
+    """
+    Process-wide request, database and AI metrics in Prometheus text format.
+
+    Everything is updated on the event loop thread, so plain counters are
+    enough; an observation is a few additions. Components with their own
+    `stats()` (caches, AI client, job queue) are registered as sources and
+    read only when /api/metrics is scraped.
+    """
+
+    def __init__(self):
+        self.requests = Histogram(LATENCY_BUCKETS)
+        self.pool_checkout = Histogram(WAIT_BUCKETS)
+        self.ai_latency = Histogram(LATENCY_BUCKETS)
+        self.ai_queue_wait = Histogram(WAIT_BUCKETS)
+        self.db_statements_total = 0
+        self.db_seconds_total = 0.0
+        self._sources: Dict[str, Callable[[], dict]] = {}
+
+    def register_stats(self, name: str, stats: Callable[[], dict]) -> None:
+        """Exposes the numeric values of `stats()` as gauges named neuronest_<name>_<key>."""
+        self._sources[name] = stats
+
+    # --- Observations ---
+    def observe_request(self, method: str, route: str, status_code: int, seconds: float) -> None:
+        self.requests.observe(seconds, (method, route, str(status_code)))
+
+    def observe_db(self, seconds: float) -> None:
+        self.db_statements_total += 1
+        self.db_seconds_total += seconds
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.db_statements += 1
+            timings.db_seconds += seconds
+
+    def observe_pool_checkout(self, seconds: float) -> None:
+        self.pool_checkout.observe(seconds)
+
+    def observe_ai(self, seconds: float, queue_wait: bool = False) -> None:
+        (self.ai_queue_wait if queue_wait else self.ai_latency).observe(seconds)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.ai_seconds += seconds
+
+    @contextmanager
+    def time_auth(self) -> Iterator[None]:
+        """Adds the block's duration to the current request's auth time."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings = _request_timings.get()
+            if timings is not None:
+                timings.auth_seconds += time.perf_counter() - started
+
+    # --- Exposition ---
+    def render(self) -> str:
+        lines: List[str] = []
+        lines += self.requests.render(
+            "neuronest_http_request_duration_seconds",
+            "HTTP request latency by route template.",
+            ("method", "route", "status"),
+        )
+        lines += [
+            "# HELP neuronest_db_statements_total SQL statements executed.",
+            "# TYPE neuronest_db_statements_total counter",
+            f"neuronest_db_statements_total {self.db_statements_total}",
+            "# HELP neuronest_db_statement_seconds_total Time spent executing SQL statements.",
+            "# TYPE neuronest_db_statement_seconds_total counter",
+            f"neuronest_db_statement_seconds_total {self.db_seconds_total:.6f}",
+        ]
+        lines += self.pool_checkout.render(
+            "neuronest_db_pool_checkout_seconds", "Time to get a connection from the pool."
+        )
+        lines += self.ai_latency.render(
+            "neuronest_ai_request_duration_seconds", "Anthropic API call latency (per attempt)."
+        )
+        lines += self.ai_queue_wait.render(
+            "neuronest_ai_queue_wait_seconds", "Time AI calls waited for a concurrency slot."
+        )
+        for source, stats in sorted(self._sources.items()):
+            for key, value in stats().items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = f"neuronest_{source}_{key}"
+                lines += [f"# TYPE {name} gauge", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+
+def _wants_server_timing(scope) -> bool:
+    """Server-Timing reveals DB and auth timings, so outside SERVER_TIMING_ENABLED it needs the metrics token."""
+    if settings.SERVER_TIMING_ENABLED:
+        return True
+    if not settings.METRICS_TOKEN:
+        return False
+    for name, value in scope["headers"]:
+        if name == b"x-metrics-token":
+            return hmac.compare_digest(value, settings.METRICS_TOKEN.encode())
+    return False
+
+class MetricsMiddleware:
+    """
+    ASGI middleware: per-request timings (DB statements and time, auth, AI)
+    in a `Server-Timing` header (see _wants_server_timing), and a latency
+    histogram per route template.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(started=time.perf_counter())
+        token = _request_timings.set(timings)
+        status_code = 500
+        server_timing = _wants_server_timing(scope)
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if server_timing:
+                    MutableHeaders(scope=message).append("Server-Timing", timings.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            # Route template (e.g. /api/v1/thoughts/{thought_id}/water) keeps label cardinality bounded
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            metrics.observe_request(scope["method"], route, status_code, time.perf_counter() - timings.started)
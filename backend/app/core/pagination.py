@@ -0,0 +1,45 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Tuple
+
+# Keyset (cursor) pagination helpers.
+# A cursor is the sort key of the last row of a page -- (created_at, id) for
+# lists, (rank, id) for search results -- wrapped in URL-safe base64 so clients
+# treat it as an opaque token.
+
+CURSOR_SEPARATOR = "|"
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Encodes the sort key of a row into an opaque cursor string."""
+    raw = f"{created_at.isoformat()}{CURSOR_SEPARATOR}{id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    """Decodes a cursor back into (created_at, id). Returns None if invalid."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        created_at_str, id_str = raw.rsplit(CURSOR_SEPARATOR, 1)
+        return datetime.fromisoformat(created_at_str), int(id_str)
+    except (ValueError, UnicodeError, binascii.Error):
+        # Malformed base64, missing separator, bad timestamp or id
+        return None
+
+def encode_rank_cursor(rank: float, id: int) -> str:
+    """Encodes the (rank, id) sort key of a search result."""
+    raw = f"{rank!r}{CURSOR_SEPARATOR}{id}" # repr round-trips the float exactly
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_rank_cursor(cursor: str) -> Optional[Tuple[float, int]]:
+    """Decodes a search cursor back into (rank, id). Returns None if invalid."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        rank_str, id_str = raw.rsplit(CURSOR_SEPARATOR, 1)
+        rank = float(rank_str)
+        if rank != rank or rank in (float("inf"), float("-inf")):
+            return None # NaN/inf never match a real rank
+        return rank, int(id_str)
+    except (ValueError, UnicodeError, binascii.Error):
+        return None
@@ -0,0 +1,198 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+
+from .config import settings
+from ..schemas.mindspace import MindspaceRecommendationResponse
+
+logger = logging.getLogger(__name__)
+
+# Free-text moods collapsed onto one catalog key, so e.g. "Anxiety", "nervous"
+# and "  worried!" share a single cached set of practices.
+MOOD_SYNONYMS: Dict[str, str] = {
+    "anxiety": "anxious",
+    "nervous": "anxious",
+    "worried": "anxious",
+    "worry": "anxious",
+    "panicky": "anxious",
+    "stress": "stressed",
+    "stressed out": "stressed",
+    "tense": "stressed",
+    "overwhelm": "overwhelmed",
+    "swamped": "overwhelmed",
+    "sadness": "sad",
+    "down": "sad",
+    "low": "sad",
+    "blue": "sad",
+    "unhappy": "sad",
+    "depressed": "sad",
+    "anger": "angry",
+    "mad": "angry",
+    "frustrated": "angry",
+    "irritated": "angry",
+    "annoyed": "angry",
+    "exhausted": "tired",
+    "sleepy": "tired",
+    "fatigued": "tired",
+    "drained": "tired",
+    "unfocused": "distracted",
+    "scattered": "distracted",
+    "alone": "lonely",
+    "relaxed": "calm",
+    "peaceful": "calm",
+    "good": "happy",
+    "great": "happy",
+    "joyful": "happy",
+}
+
+def normalize_mood(mood: str) -> str:
+    """Lower-cases, trims, strips punctuation, collapses spaces and maps synonyms."""
+    key = re.sub(r"[^\w\s-]", "", mood.lower())
+    key = re.sub(r"\s+", " ", key).strip()
+    if key.startswith("feeling "):
+        key = key[len("feeling "):]
+    return MOOD_SYNONYMS.get(key, key)
+
+class PracticeCatalog:
+    """
+    Per-process catalog of Mindspace recommendations keyed by normalized mood.
+
+    Entries live for `ttl_seconds`; at most `max_size` moods are kept (least
+    recently used evicted). Concurrent misses for the same mood share a single
+    upstream call (single-flight). If `path` is set, the catalog is loaded
+    from / saved to that JSON file so a restarted process starts warm.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int, path: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.path = path or None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        # mood -> (expires_at wall-clock, response)
+        self._entries: "OrderedDict[str, tuple[float, MindspaceRecommendationResponse]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._loaded = False
+
+    def _lookup(self, mood: str) -> Optional[MindspaceRecommendationResponse]:
+        entry = self._entries.get(mood)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self._entries[mood] # Expired
+            return None
+        self._entries.move_to_end(mood)
+        return entry[1]
+
+    def _store(self, mood: str, response: MindspaceRecommendationResponse, expires_at: Optional[float] = None) -> None:
+        self._entries[mood] = (expires_at or time.time() + self.ttl_seconds, response)
+        self._entries.move_to_end(mood)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get_or_fetch(
+        self, mood: str, fetch: Callable[[str], Awaitable[MindspaceRecommendationResponse]]
+    ) -> MindspaceRecommendationResponse:
+        """Returns cached practices for an already-normalized mood, fetching once on a miss."""
+        if not self._loaded:
+            await self.load()
+
+        cached = self._lookup(mood)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        in_flight = self._in_flight.get(mood)
+        if in_flight is not None:
+            # Someone is already asking upstream for this mood; wait for their answer
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                if in_flight.cancelled() and not asyncio.current_task().cancelling():
+                    # The leading request was cancelled (client went away), not us; retry
+                    return await self.get_or_fetch(mood, fetch)
+                raise
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[mood] = future
+        try:
+            response = await fetch(mood)
+            if self.ttl_seconds > 0 and self.max_size > 0:
+                self._store(mood, response)
+            future.set_result(response)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception() # Mark retrieved; the leader re-raises below
+            raise
+        finally:
+            self._in_flight.pop(mood, None)
+
+        await self.save()
+        return response
+
+    async def load(self) -> None:
+        """Warm start from `path` (if configured); expired entries are skipped."""
+        self._loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            raw = await asyncio.to_thread(self._read_file)
+            now = time.time()
+            for mood, entry in raw.items():
+                if entry["expires_at"] > now:
+                    self._store(mood, MindspaceRecommendationResponse(**entry["response"]), entry["expires_at"])
+            logger.info("Loaded %s Mindspace catalog entries from %s.", len(self._entries), self.path)
+        except Exception as e:
+            logger.warning("Could not load Mindspace catalog from %s: %s", self.path, e)
+
+    async def save(self) -> None:
+        """Writes the catalog to `path` (if configured)."""
+        if not self.path:
+            return
+        snapshot = {
+            mood: {"expires_at": expires_at, "response": response.model_dump()}
+            for mood, (expires_at, response) in self._entries.items()
+        }
+        try:
+            await asyncio.to_thread(self._write_file, snapshot)
+        except Exception as e:
+            logger.warning("Could not save Mindspace catalog to %s: %s", self.path, e)
+
+    def _read_file(self) -> dict:
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_file(self, snapshot: dict) -> None:
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.path) # Atomic swap so readers never see a partial file
+
+    def stats(self) -> dict:
+        """Hit/miss/coalesced counters and current size, for logs and metrics."""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": ((self.hits + self.coalesced) / lookups) if lookups else 0.0,
+        }
+
+practice_catalog = PracticeCatalog(
+    ttl_seconds=settings.MINDSPACE_CATALOG_TTL_SECONDS,
+    max_size=settings.MINDSPACE_CATALOG_MAX_SIZE,
+    path=settings.MINDSPACE_CATALOG_PATH,
+)
@@ -0,0 +1,91 @@
+import contextvars
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# User the current request is authenticated as; set by deps.get_current_user
+current_user_id: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("current_user_id", default=None)
+
+class ReadRouter:
+    """
+    Decides whether a read-only session may use the read replica.
+
+    - Read-your-writes: a user who committed on the primary within
+      `pin_seconds` reads from the primary, so they never see their own
+      write missing because of replication lag.
+    - Fallback: a connection error on the replica marks it down for
+      `retry_seconds`; reads go to the primary until then.
+
+    State is per process, like the auth cache: with several workers, keep
+    `pin_seconds` above the replica's usual lag rather than relying on it.
+    """
+
+    def __init__(self, pin_seconds: float, retry_seconds: float):
+        self.pin_seconds = pin_seconds
+        self.retry_seconds = retry_seconds
+        self.replica_sessions = 0
+        self.pinned_sessions = 0
+        self.fallback_sessions = 0
+        self.replica_errors = 0
+        self._down_until = 0.0
+        # user_id -> time of last write, oldest first
+        self._last_write: "OrderedDict[int, float]" = OrderedDict()
+
+    def mark_write(self, user_id: Optional[int]) -> None:
+        """Pins `user_id` to the primary for the next `pin_seconds`."""
+        if user_id is None or self.pin_seconds <= 0:
+            return
+        now = time.monotonic()
+        self._last_write.pop(user_id, None)
+        self._last_write[user_id] = now
+        # Drop expired pins from the old end so the map only holds recent writers
+        while self._last_write:
+            oldest_user, written = next(iter(self._last_write.items()))
+            if now - written < self.pin_seconds:
+                break
+            del self._last_write[oldest_user]
+
+    def mark_failed(self, error: BaseException) -> None:
+        """Sends reads to the primary for the next `retry_seconds`."""
+        self.replica_errors += 1
+        if not self.replica_down():
+            logger.warning(
+                "Read replica unavailable (%s); using the primary for %.0fs.",
+                type(error).__name__, self.retry_seconds,
+            )
+        self._down_until = time.monotonic() + self.retry_seconds
+
+    def replica_down(self) -> bool:
+        return time.monotonic() < self._down_until
+
+    def use_replica(self, user_id: Optional[int]) -> bool:
+        """Routing decision for one read session; counted for stats()."""
+        if self.replica_down():
+            self.fallback_sessions += 1
+            return False
+        written = self._last_write.get(user_id) if user_id is not None else None
+        if written is not None and time.monotonic() - written < self.pin_seconds:
+            self.pinned_sessions += 1
+            return False
+        self.replica_sessions += 1
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "replica_sessions": self.replica_sessions,
+            "pinned_sessions": self.pinned_sessions,
+            "fallback_sessions": self.fallback_sessions,
+            "replica_errors": self.replica_errors,
+            "replica_up": 0 if self.replica_down() else 1,
+            "pinned_users": len(self._last_write),
+        }
+
+read_router = ReadRouter(
+    pin_seconds=settings.READ_YOUR_WRITES_SECONDS,
+    retry_seconds=settings.READ_REPLICA_RETRY_SECONDS,
+)
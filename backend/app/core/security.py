@@ -1,13 +1,31 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Union, Optional
-
-from jose import jwt, JWTError
-from passlib.context import CryptContext
+from functools import lru_cache
+from typing import Any, Union, Optional, Tuple
 
 from .config import settings
 
-# Password Hashing Context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# jose (via cryptography) and passlib are imported on first use rather than at
+# startup: together they are a noticeable share of a cold start that only has
+# to answer /api/health.
+
+@lru_cache(maxsize=None)
+def _pwd_context():
+    """Password hashing context, built on first use."""
+    from passlib.context import CryptContext
+
+    # Hashes with a different cost than BCRYPT_ROUNDS report needs_update, so they are rehashed on login
+    return CryptContext(
+        schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+    )
+
+# Dedicated pool for bcrypt work. bcrypt releases the GIL, so hashing runs in
+# parallel without blocking the event loop; max_workers bounds CPU use and
+# further calls queue.
+_password_executor = ThreadPoolExecutor(
+    max_workers=max(settings.PASSWORD_HASH_WORKERS, 1), thread_name_prefix="bcrypt"
+)
 
 ALGORITHM = settings.JWT_ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
@@ -22,6 +40,8 @@ def create_access_token(
         expire = datetime.now(timezone.utc) + timedelta(
             minutes=ACCESS_TOKEN_EXPIRE_MINUTES
         )
+    from jose import jwt
+
     to_encode = {"exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(
         to_encode, settings.JWT_SECRET_KEY, algorithm=ALGORITHM
@@ -30,14 +50,38 @@ def create_access_token(
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifies a plain password against a hashed password."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Hashes a plain password."""
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
+
+async def _run_in_password_executor(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, func, *args)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the bcrypt thread pool; use from async handlers."""
+    return await _run_in_password_executor(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the bcrypt thread pool; use from async handlers."""
+    return await _run_in_password_executor(get_password_hash, password)
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verifies a password and, if the stored hash uses outdated settings
+    (e.g. a different bcrypt cost), also returns a fresh hash to store.
+    Returns (is_valid, new_hash_or_None).
+    """
+    return await _run_in_password_executor(_pwd_context().verify_and_update, plain_password, hashed_password)
 
 def decode_token(token: str) -> Optional[str]:
     """Decodes JWT token to get the subject (username/id). Returns None if invalid."""
+    from jose import jwt, JWTError
+
     try:
         payload = jwt.decode(
             token, settings.JWT_SECRET_KEY, algorithms=[ALGORITHM]
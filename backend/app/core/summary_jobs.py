@@ -0,0 +1,211 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, List, Optional, Set
+
+from fastapi import HTTPException
+
+from .config import settings
+from ..crud.crud_summary_job import summary_job as crud_summary_job
+from ..crud.crud_thought import thought as crud_thought
+from ..db.session import async_session_maker
+from ..schemas.journal import JournalSummaryResponse
+
+logger = logging.getLogger(__name__)
+
+# generate(db, user_id=..., period=...) -> JournalSummaryResponse; raises HTTPException on failure
+SummaryGenerator = Callable[..., Awaitable[JournalSummaryResponse]]
+
+PRECOMPUTE_PERIOD = "past week"
+
+class SummaryJobQueue:
+    """
+    In-process asyncio worker pool for journal summary jobs.
+
+    Jobs are rows in `summary_jobs`; the queue only carries ids. Workers claim
+    a job atomically (pending -> running) so several processes can share the
+    table without doing the same job twice. A claim is a lease: jobs still
+    running after `lease_seconds` are presumed abandoned (their process died)
+    and re-queued, on start and periodically; younger ones may be running in
+    another process and are left alone. On shutdown this process's claims
+    are handed back to pending. If SUMMARY_PRECOMPUTE_HOUR_UTC is set,
+    a scheduler queues a weekly summary for each recently active user once a
+    day, so the interactive request usually hits the stored summary.
+    """
+
+    def __init__(self, workers: int, precompute_hour_utc: int, retention_days: int, lease_seconds: float):
+        self.workers = max(workers, 1)
+        self.precompute_hour_utc = precompute_hour_utc
+        self.retention_days = retention_days
+        self.lease_seconds = lease_seconds
+        self.generate: Optional[SummaryGenerator] = None
+        self.processed = 0
+        self.failed = 0
+        self.requeued = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._claimed: Set[str] = set() # Jobs this process is running
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self, generate: SummaryGenerator) -> None:
+        """Starts the workers (and scheduler) and queues pending and abandoned jobs."""
+        if self.is_running:
+            return
+        self.generate = generate
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+        if 0 <= self.precompute_hour_utc <= 23:
+            self._tasks.append(asyncio.create_task(self._scheduler()))
+
+        if async_session_maker is not None:
+            self._tasks.append(asyncio.create_task(self._reaper()))
+            try:
+                async with async_session_maker() as db:
+                    await self._requeue_abandoned(db)
+                    pending_ids = await crud_summary_job.get_pending_ids(db)
+                for job_id in pending_ids:
+                    self.enqueue(job_id)
+                if pending_ids:
+                    logger.info("Queued %s unfinished summary jobs.", len(pending_ids))
+            except Exception as e:
+                logger.error("Could not re-queue unfinished summary jobs: %s", e, exc_info=True)
+        logger.info("Summary job queue started with %s workers.", self.workers)
+
+    async def stop(self) -> None:
+        """
+        Cancels workers and hands the jobs they were running back to pending,
+        so the next start runs them again instead of waiting out the lease.
+        """
+        claimed = list(self._claimed)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+        if claimed and async_session_maker is not None:
+            try:
+                async with async_session_maker() as db:
+                    released = await crud_summary_job.release(db, ids=claimed)
+                    await db.commit()
+                if released:
+                    logger.info("Released %s interrupted summary jobs back to pending.", len(released))
+            except Exception as e:
+                logger.error("Could not release interrupted summary jobs: %s", e, exc_info=True)
+
+    def enqueue(self, job_id: str) -> None:
+        if self._queue is None:
+            # Not started (e.g. CLI use); the job stays pending until a worker process starts
+            logger.warning("Summary job queue not running; job %s left pending.", job_id)
+            return
+        self._queue.put_nowait(job_id)
+
+    async def _worker(self, n: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._process(job_id)
+            except Exception as e:
+                logger.error("Summary worker %s crashed on job %s: %s", n, job_id, e, exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job_id: str) -> None:
+        async with async_session_maker() as db:
+            job = await crud_summary_job.claim(db, id=job_id)
+            await db.commit()
+            if job is None:
+                return # Already claimed elsewhere
+            logger.info("Running summary job %s for user %s.", job_id, job.user_id)
+
+            self._claimed.add(job_id)
+            try:
+                result, error = None, None
+                try:
+                    result = await self.generate(db, user_id=job.user_id, period=job.period)
+                except HTTPException as e:
+                    error = str(e.detail)
+                except Exception as e:
+                    logger.error("Summary job %s failed: %s", job_id, e, exc_info=True)
+                    error = f"An unexpected error occurred: {type(e).__name__}"
+
+                await crud_summary_job.finish(db, id=job_id, result=result, error=error)
+                await db.commit()
+            finally:
+                self._claimed.discard(job_id)
+        if error is None:
+            self.processed += 1
+            logger.info("Summary job %s succeeded.", job_id)
+        else:
+            self.failed += 1
+            logger.warning("Summary job %s failed: %s", job_id, error)
+
+    async def _requeue_abandoned(self, db) -> List[str]:
+        """Moves jobs whose lease expired back to pending; returns their ids."""
+        job_ids = await crud_summary_job.reset_interrupted(db, lease_seconds=self.lease_seconds)
+        await db.commit()
+        if job_ids:
+            self.requeued += len(job_ids)
+            logger.warning("Re-queued %s abandoned summary jobs.", len(job_ids))
+        return job_ids
+
+    async def _reaper(self) -> None:
+        # Also catches jobs of an instance that crashed and did not come back
+        while True:
+            await asyncio.sleep(max(self.lease_seconds / 2, 1))
+            try:
+                async with async_session_maker() as db:
+                    job_ids = await self._requeue_abandoned(db)
+                for job_id in job_ids:
+                    self.enqueue(job_id)
+            except Exception as e:
+                logger.error("Could not re-queue abandoned summary jobs: %s", e, exc_info=True)
+
+    async def _scheduler(self) -> None:
+        while True:
+            now = datetime.now(timezone.utc)
+            next_run = now.replace(hour=self.precompute_hour_utc, minute=0, second=0, microsecond=0)
+            if next_run <= now:
+                next_run += timedelta(days=1)
+            await asyncio.sleep((next_run - now).total_seconds())
+            try:
+                await self.precompute_weekly()
+            except Exception as e:
+                logger.error("Weekly summary precompute failed: %s", e, exc_info=True)
+
+    async def precompute_weekly(self) -> int:
+        """Queues a weekly summary job for every user active in the last 7 days. Returns jobs queued."""
+        queued: List[str] = []
+        async with async_session_maker() as db:
+            since = datetime.now(timezone.utc) - timedelta(days=7)
+            user_ids = await crud_thought.get_active_user_ids(db, since=since)
+            for user_id in user_ids:
+                if await crud_summary_job.get_open(db, user_id=user_id, period=PRECOMPUTE_PERIOD):
+                    continue
+                job = await crud_summary_job.create(db, user_id=user_id, period=PRECOMPUTE_PERIOD)
+                queued.append(job.id)
+            purged = await crud_summary_job.purge_finished(db, older_than_days=self.retention_days)
+            await db.commit()
+        for job_id in queued:
+            self.enqueue(job_id)
+        logger.info("Queued %s weekly summary precompute jobs; purged %s old jobs.", len(queued), purged)
+        return len(queued)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "processed": self.processed,
+            "failed": self.failed,
+            "requeued": self.requeued,
+        }
+
+summary_job_queue = SummaryJobQueue(
+    workers=settings.SUMMARY_JOB_WORKERS,
+    precompute_hour_utc=settings.SUMMARY_PRECOMPUTE_HOUR_UTC,
+    retention_days=settings.SUMMARY_JOB_RETENTION_DAYS,
+    lease_seconds=settings.SUMMARY_JOB_LEASE_SECONDS,
+)
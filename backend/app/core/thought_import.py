@@ -0,0 +1,150 @@
+import csv
+import json
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Tuple, Union
+
+# Streaming parsers for POST /thoughts/import.
+# The request body arrives in arbitrary byte chunks; these yield one record
+# per line (NDJSON) or per CSV record without holding the whole upload.
+# Memory is bounded by the record size cap, not by the upload.
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+# (row number, parsed record) or (row number, error message)
+ParsedRow = Tuple[int, Union[Dict[str, object], str]]
+
+class ImportTooLarge(Exception):
+    """The upload went over its total size limit; rows read before it still count."""
+
+class OversizedLine(NamedTuple):
+    """A line longer than the record cap, discarded as it arrived; only its quotes are counted (for CSV)."""
+    quotes: int
+
+async def _iter_lines(
+    chunks: AsyncIterator[bytes], *, max_line_bytes: int, max_body_bytes: int
+) -> AsyncIterator[Union[str, OversizedLine]]:
+    """
+    Yields complete lines (with their newline), decoded as UTF-8. Lines are
+    split as bytes, which is safe in UTF-8: b"\n" never occurs inside a
+    multi-byte character. A line over `max_line_bytes` is dropped as it
+    arrives and yielded as an OversizedLine; going over `max_body_bytes`
+    raises ImportTooLarge.
+    """
+    pending = b""
+    skipped_quotes: Optional[int] = None # Set while discarding an oversized line
+    received = 0
+    encoding = "utf-8-sig" # Drops a leading BOM from the first line only
+
+    def decode(line: bytes) -> str:
+        nonlocal encoding
+        text = line.decode(encoding, errors="replace")
+        encoding = "utf-8"
+        return text
+
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > max_body_bytes:
+            raise ImportTooLarge(f"Upload exceeds {max_body_bytes} bytes; remaining rows ignored.")
+        pending += chunk
+        # Split on "\n" only: JSON strings may legally contain other line separators
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if skipped_quotes is not None:
+                yield OversizedLine(skipped_quotes + line.count(b'"'))
+                skipped_quotes = None
+                encoding = "utf-8"
+            elif len(line) > max_line_bytes:
+                yield OversizedLine(line.count(b'"'))
+                encoding = "utf-8"
+            else:
+                yield decode(line + b"\n")
+        if skipped_quotes is not None or len(pending) > max_line_bytes:
+            skipped_quotes = (skipped_quotes or 0) + pending.count(b'"')
+            pending = b""
+    if skipped_quotes is not None:
+        yield OversizedLine(skipped_quotes)
+    elif pending:
+        yield decode(pending)
+
+async def iter_ndjson(
+    chunks: AsyncIterator[bytes], *, max_record_bytes: int, max_body_bytes: int
+) -> AsyncIterator[ParsedRow]:
+    """One JSON object per line; blank lines are skipped."""
+    row = 0
+    async for line in _iter_lines(chunks, max_line_bytes=max_record_bytes, max_body_bytes=max_body_bytes):
+        if isinstance(line, OversizedLine):
+            row += 1
+            yield row, f"Record exceeds {max_record_bytes} bytes."
+            continue
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield row, "Expected a JSON object."
+            continue
+        yield row, record
+
+async def iter_csv(
+    chunks: AsyncIterator[bytes], *, max_record_bytes: int, max_body_bytes: int
+) -> AsyncIterator[ParsedRow]:
+    """
+    CSV with a header row (`content` required; `mood`, `created_at` optional).
+    Quoted fields may span lines: a record is complete once its quotes balance.
+    A record over `max_record_bytes` is rejected (and not buffered) up to
+    that point. Empty cells are treated as missing.
+    """
+    header: Optional[List[str]] = None
+    record_lines: List[str] = []
+    record_bytes = 0
+    oversized = False
+    quotes = 0 # In the record so far; counted per line, so the buffer is never rescanned
+    row = 0
+    async for line in _iter_lines(chunks, max_line_bytes=max_record_bytes, max_body_bytes=max_body_bytes):
+        if isinstance(line, OversizedLine):
+            quotes += line.quotes
+            oversized = True
+        else:
+            quotes += line.count('"')
+            if not oversized:
+                record_bytes += len(line.encode("utf-8"))
+                oversized = record_bytes > max_record_bytes
+            if oversized:
+                record_lines.clear()
+            else:
+                record_lines.append(line)
+        if quotes % 2:
+            continue # Inside a quoted field; keep reading
+        text = "".join(record_lines)
+        was_oversized = oversized
+        record_lines, record_bytes, oversized, quotes = [], 0, False, 0
+        if was_oversized:
+            if header is None:
+                raise ValueError(f"CSV header exceeds {max_record_bytes} bytes.")
+            row += 1
+            yield row, f"Record exceeds {max_record_bytes} bytes."
+            continue
+        if not text.strip():
+            continue
+        try:
+            values = next(csv.reader([text]))
+        except csv.Error as e:
+            row += 1
+            yield row, f"Invalid CSV: {e}"
+            continue
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            if "content" not in header:
+                raise ValueError("CSV header must include a 'content' column.")
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, f"Expected {len(header)} columns, got {len(values)}."
+            continue
+        yield row, {name: value for name, value in zip(header, values) if value != ""}
+    if oversized or "".join(record_lines).strip():
+        row += 1
+        yield row, "Invalid CSV: unterminated quoted field."
@@ -0,0 +1,87 @@
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from .config import settings
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """
+    Lightweight identity of the authenticated user, returned by
+    deps.get_current_user (from the cache when possible) in place of the
+    ORM User. Carries the fields endpoints actually use, so it can be cached
+    across requests without holding on to a session-bound ORM instance.
+    """
+    id: int
+    username: str
+    created_at: datetime
+
+class UserCache:
+    """
+    Bounded per-process TTL/LRU cache from token subject (username) to
+    AuthenticatedUser. Entries expire after `ttl_seconds`, which also bounds
+    staleness across worker processes; local creates/deletes invalidate
+    explicitly.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple[float, AuthenticatedUser]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, username: str) -> Optional[AuthenticatedUser]:
+        """Returns the cached identity, or None on a miss/expiry."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(username)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[username] # Expired
+            self.misses += 1
+            return None
+
+    def set(self, username: str, user: AuthenticatedUser) -> None:
+        """Stores an identity, evicting the least recently used entry if full."""
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return # Cache disabled
+        with self._lock:
+            self._entries[username] = (time.monotonic() + self.ttl_seconds, user)
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, username: str) -> None:
+        """Drops a single entry (e.g. after the user is created or deleted)."""
+        with self._lock:
+            self._entries.pop(username, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size, for logs and metrics."""
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
+
+user_cache = UserCache(
+    max_size=settings.AUTH_USER_CACHE_SIZE,
+    ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS,
+)
@@ -1,8 +1,9 @@
 from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
 
-from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy import select, update as sqlalchemy_update, delete as sqlalchemy_delete
+from sqlalchemy import select, insert as sqlalchemy_insert, update as sqlalchemy_update, delete as sqlalchemy_delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db.base_class import Base
@@ -11,6 +12,12 @@ ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+def dialect_insert(db: AsyncSession, model: Type[Base]):
+    """INSERT for the session's dialect, supporting ON CONFLICT (Postgres or SQLite)."""
+    if db.bind.dialect.name == "postgresql":
+        return pg_insert(model)
+    return sqlite_insert(model)
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         """
@@ -37,16 +44,13 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return result.scalars().all()
 
     async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
-        """Create a new record."""
-        # Use model_dump for Pydantic v2 compatibility if needed, else jsonable_encoder works
-        # obj_in_data = obj_in.model_dump()
-        obj_in_data = jsonable_encoder(obj_in)
-        db_obj = self.model(**obj_in_data)  # type: ignore [call-arg]
-        db.add(db_obj)
-        await db.flush() # Use flush to get the ID/defaults assigned before commit
-        await db.refresh(db_obj)
+        """Create a new record (one INSERT ... RETURNING; server defaults come back with it)."""
+        obj_in_data = obj_in.model_dump()
+        result = await db.execute(
+            sqlalchemy_insert(self.model).values(**obj_in_data).returning(self.model)
+        )
         # COMMIT IS HANDLED BY THE CALLING ENDPOINT
-        return db_obj
+        return result.scalars().one()
 
     async def update(
         self,
@@ -55,28 +59,33 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db_obj: ModelType,
         obj_in: Union[UpdateSchemaType, Dict[str, Any]]
     ) -> ModelType:
-        """Update an existing record."""
-        obj_data = jsonable_encoder(db_obj)
+        """Update an existing record (one UPDATE ... RETURNING)."""
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             # Use model_dump with exclude_unset=True for partial updates
             update_data = obj_in.model_dump(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
-        db.add(db_obj) # Add the instance to the session to mark it as dirty
-        await db.flush() # Flush changes to DB transaction
-        await db.refresh(db_obj) # Refresh instance state from DB if needed
+        columns = self.model.__table__.columns.keys()
+        values = {field: value for field, value in update_data.items() if field in columns}
+        if not values:
+            return db_obj
+        result = await db.execute(
+            sqlalchemy_update(self.model)
+            .where(self.model.id == db_obj.id)
+            .values(**values)
+            .returning(self.model)
+            .execution_options(synchronize_session=False, populate_existing=True) # RETURNING refreshes db_obj
+        )
         # COMMIT IS HANDLED BY THE CALLING ENDPOINT
-        return db_obj
+        return result.scalars().one()
 
     async def remove(self, db: AsyncSession, *, id: int) -> Optional[ModelType]:
-        """Delete a record by ID."""
-        result = await db.execute(select(self.model).filter(self.model.id == id))
-        obj = result.scalars().first()
-        if obj:
-            await db.delete(obj)
-            await db.flush() # Flush the delete operation
+        """Delete a record by ID (one DELETE ... RETURNING). Returns the deleted row, if any."""
+        result = await db.execute(
+            sqlalchemy_delete(self.model)
+            .where(self.model.id == id)
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        )
         # COMMIT IS HANDLED BY THE CALLING ENDPOINT
-        return obj
\ No newline at end of file
+        return result.scalars().first()
@@ -0,0 +1,117 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .base import dialect_insert
+from ..core.config import settings
+from ..models.thought import Thought
+from ..models.journal_summary import JournalSummaryCache
+from ..schemas.journal import JournalSummaryResponse
+
+def compute_content_hash(thoughts: Iterable[Thought], prompt_version: str) -> str:
+    """
+    SHA-256 over the prompt version and the ordered (id, date, mood, content)
+    of the thoughts sent to the model.
+    """
+    digest = hashlib.sha256(prompt_version.encode("utf-8"))
+    for t in thoughts:
+        digest.update(b"\x1e") # Record separator between thoughts
+        digest.update(f"{t.id}\x1f{t.created_at.strftime('%Y-%m-%d')}\x1f{t.mood.value}\x1f".encode("utf-8"))
+        digest.update(t.content.encode("utf-8"))
+    return digest.hexdigest()
+
+class CRUDJournalSummary:
+    """Lookup/store/eviction for cached journal summaries, with hit-rate counters."""
+
+    def __init__(self, model=JournalSummaryCache):
+        self.model = model
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    async def get_cached(
+        self, db: AsyncSession, *, user_id: int, period: str, content_hash: str
+    ) -> Optional[JournalSummaryResponse]:
+        """Returns the stored summary for this exact key, or None."""
+        result = await db.execute(
+            select(self.model.response_json).where(
+                self.model.user_id == user_id,
+                self.model.period == period,
+                self.model.content_hash == content_hash,
+            )
+        )
+        response_json = result.scalar_one_or_none()
+        if response_json is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return JournalSummaryResponse.model_validate_json(response_json)
+
+    async def store(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        period: str,
+        content_hash: str,
+        summary: JournalSummaryResponse,
+    ) -> None:
+        """Stores (or replaces) a summary, then evicts the user's stale rows."""
+        stmt = dialect_insert(db, self.model).values(
+            user_id=user_id,
+            period=period,
+            content_hash=content_hash,
+            response_json=summary.model_dump_json(),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.user_id, self.model.period, self.model.content_hash],
+            set_={"response_json": stmt.excluded.response_json},
+        )
+        await db.execute(stmt)
+        self.stores += 1
+        await self.evict_stale(db, user_id=user_id)
+        # COMMIT IS HANDLED BY THE CALLING ENDPOINT
+
+    async def evict_stale(self, db: AsyncSession, *, user_id: Optional[int] = None) -> int:
+        """
+        Deletes rows older than SUMMARY_CACHE_MAX_AGE_DAYS and, for a given
+        user, all but the SUMMARY_CACHE_MAX_PER_USER most recent rows.
+        Returns the number of rows deleted.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.SUMMARY_CACHE_MAX_AGE_DAYS)
+        expired = delete(self.model).where(self.model.created_at < cutoff)
+        if user_id is not None:
+            expired = expired.where(self.model.user_id == user_id)
+        deleted = (await db.execute(expired)).rowcount or 0
+
+        if user_id is not None:
+            keep = (
+                select(self.model.id)
+                .where(self.model.user_id == user_id)
+                .order_by(self.model.created_at.desc(), self.model.id.desc())
+                .limit(settings.SUMMARY_CACHE_MAX_PER_USER)
+            )
+            overflow = delete(self.model).where(
+                self.model.user_id == user_id, self.model.id.not_in(keep.scalar_subquery())
+            )
+            deleted += (await db.execute(overflow)).rowcount or 0
+
+        self.evictions += deleted
+        return deleted
+
+    def stats(self) -> dict:
+        """Hit/miss/store/eviction counters for this process."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
+
+journal_summary = CRUDJournalSummary(JournalSummaryCache)
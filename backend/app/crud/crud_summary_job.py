@@ -0,0 +1,149 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import select, update, delete, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.summary_job import SummaryJob
+from ..schemas.journal import JournalSummaryResponse
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+class CRUDSummaryJob:
+    """Persistence for asynchronous journal summary jobs."""
+
+    def __init__(self, model=SummaryJob):
+        self.model = model
+
+    async def create(self, db: AsyncSession, *, user_id: int, period: str) -> SummaryJob:
+        """Creates a pending job."""
+        db_obj = self.model(id=uuid.uuid4().hex, user_id=user_id, period=period, status=JOB_PENDING)
+        db.add(db_obj)
+        await db.flush()
+        await db.refresh(db_obj)
+        # COMMIT IS HANDLED BY THE CALLER
+        return db_obj
+
+    async def get(self, db: AsyncSession, id: str, *, user_id: int) -> Optional[SummaryJob]:
+        """Get a job by ID, ensuring it belongs to the user."""
+        result = await db.execute(
+            select(self.model).where(self.model.id == id, self.model.user_id == user_id)
+        )
+        return result.scalars().first()
+
+    async def get_open(self, db: AsyncSession, *, user_id: int, period: str) -> Optional[SummaryJob]:
+        """The user's pending or running job for this period, if any (used to dedupe)."""
+        result = await db.execute(
+            select(self.model)
+            .where(
+                self.model.user_id == user_id,
+                self.model.period == period,
+                self.model.status.in_([JOB_PENDING, JOB_RUNNING]),
+            )
+            .order_by(self.model.created_at.desc())
+            .limit(1)
+        )
+        return result.scalars().first()
+
+    async def count_open(self, db: AsyncSession, *, user_id: int) -> int:
+        """Number of the user's pending or running jobs, across all periods."""
+        result = await db.execute(
+            select(func.count())
+            .select_from(self.model)
+            .where(self.model.user_id == user_id, self.model.status.in_([JOB_PENDING, JOB_RUNNING]))
+        )
+        return result.scalar_one()
+
+    async def claim(self, db: AsyncSession, *, id: str) -> Optional[SummaryJob]:
+        """
+        Atomically moves a pending job to running. Returns None if another
+        worker (or process) already claimed it.
+        """
+        result = await db.execute(
+            update(self.model)
+            .where(self.model.id == id, self.model.status == JOB_PENDING)
+            .values(status=JOB_RUNNING, claimed_at=datetime.now(timezone.utc))
+            .returning(self.model)
+        )
+        return result.scalars().first()
+
+    async def finish(
+        self,
+        db: AsyncSession,
+        *,
+        id: str,
+        result: Optional[JournalSummaryResponse] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Marks a job succeeded (with its result) or failed (with an error)."""
+        await db.execute(
+            update(self.model)
+            .where(self.model.id == id)
+            .values(
+                status=JOB_SUCCEEDED if error is None else JOB_FAILED,
+                result_json=result.model_dump_json() if result is not None else None,
+                error=error,
+                finished_at=datetime.now(timezone.utc),
+            )
+        )
+        # COMMIT IS HANDLED BY THE CALLER
+
+    async def reset_interrupted(self, db: AsyncSession, *, lease_seconds: float) -> List[str]:
+        """
+        Moves running jobs claimed more than `lease_seconds` ago back to
+        pending and returns their ids. Their worker is presumed gone (a
+        restart or a crashed instance); younger claims may still be running
+        in another process and are left alone.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=lease_seconds)
+        result = await db.execute(
+            update(self.model)
+            .where(
+                self.model.status == JOB_RUNNING,
+                or_(self.model.claimed_at.is_(None), self.model.claimed_at < cutoff),
+            )
+            .values(status=JOB_PENDING, claimed_at=None)
+            .returning(self.model.id)
+        )
+        # COMMIT IS HANDLED BY THE CALLER
+        return list(result.scalars().all())
+
+    async def release(self, db: AsyncSession, *, ids: List[str]) -> List[str]:
+        """
+        Moves the given jobs back to pending if they are still running (their
+        worker is shutting down) and returns the ids released.
+        """
+        if not ids:
+            return []
+        result = await db.execute(
+            update(self.model)
+            .where(self.model.id.in_(ids), self.model.status == JOB_RUNNING)
+            .values(status=JOB_PENDING, claimed_at=None)
+            .returning(self.model.id)
+        )
+        # COMMIT IS HANDLED BY THE CALLER
+        return list(result.scalars().all())
+
+    async def get_pending_ids(self, db: AsyncSession) -> List[str]:
+        """Ids of all pending jobs, oldest first."""
+        result = await db.execute(
+            select(self.model.id).where(self.model.status == JOB_PENDING).order_by(self.model.created_at)
+        )
+        return list(result.scalars().all())
+
+    async def purge_finished(self, db: AsyncSession, *, older_than_days: int) -> int:
+        """Deletes finished jobs older than the given age. Returns rows deleted."""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+        result = await db.execute(
+            delete(self.model).where(
+                self.model.status.in_([JOB_SUCCEEDED, JOB_FAILED]),
+                self.model.created_at < cutoff,
+            )
+        )
+        return result.rowcount or 0
+
+summary_job = CRUDSummaryJob(SummaryJob)
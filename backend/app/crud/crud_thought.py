@@ -1,24 +1,136 @@
-from sqlalchemy import select, update, and_ # Added 'and_'
+from sqlalchemy import select, insert, update, delete, and_, case, tuple_, func, literal_column, table, column # Added 'and_'
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timezone
+import re
+from collections import Counter
+from typing import AsyncIterator, Optional, Sequence, Tuple
 
 from .base import CRUDBase
-from ..models.thought import Thought, MoodEnum
-from ..schemas.thought import ThoughtCreate, ThoughtUpdate
+from .crud_thought_stats import thought_stats, utc_day
+from .crud_user import user as crud_user
+from ..models.thought import Thought, MoodEnum, SEARCH_VECTOR_COLUMN, THOUGHTS_FTS_TABLE
+from ..schemas.thought import ThoughtCreate, ThoughtBatchItem, ThoughtUpdate
 
 class CRUDThought(CRUDBase[Thought, ThoughtCreate, ThoughtUpdate]):
 
+    def _created_at_key(self, db: AsyncSession, value=None):
+        """
+        Sort/compare expression for created_at in keyset queries.
+        SQLite stores server-default timestamps as text without fractional
+        seconds, so both sides are normalised there; Postgres uses the column
+        as-is so the composite index is used.
+        """
+        expr = self.model.created_at if value is None else value
+        if db.bind.dialect.name == "sqlite":
+            return func.strftime("%Y-%m-%d %H:%M:%f", expr)
+        return expr
+
     # --- Override create to include user_id ---
     async def create(self, db: AsyncSession, *, obj_in: ThoughtCreate, user_id: int) -> Thought:
         """Create a new thought associated with a user."""
         obj_in_data = obj_in.model_dump()
-        db_obj = self.model(**obj_in_data, user_id=user_id) # Add user_id
-        db.add(db_obj)
-        await db.flush()
-        await db.refresh(db_obj)
+        result = await db.execute(
+            insert(self.model).values(**obj_in_data, user_id=user_id).returning(self.model) # Add user_id
+        )
+        db_obj = result.scalars().one()
+        # Keep the daily mood rollup in step, inside the same transaction
+        await thought_stats.increment(
+            db, user_id=user_id, day=utc_day(db_obj.created_at), mood=db_obj.mood
+        )
+        await crud_user.bump_data_version(db, user_id=user_id) # Invalidates ETags
         # COMMIT IS HANDLED BY THE CALLING ENDPOINT
         return db_obj
 
+    @staticmethod
+    def _client_created_at(value: Optional[datetime], now: datetime) -> Optional[datetime]:
+        """Client-supplied timestamp as UTC; naive means UTC, future times are clamped to now."""
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return min(value.astimezone(timezone.utc), now)
+
+    async def create_many(
+        self, db: AsyncSession, *, objs_in: Sequence[ThoughtBatchItem], user_id: int
+    ) -> list[Thought]:
+        """
+        Create several thoughts for a user with one multi-row INSERT ... RETURNING
+        (offline sync). Client timestamps are kept, except that future ones are
+        clamped to now; items without one get the database's now().
+        Returns the thoughts in the order they were given.
+        """
+        if not objs_in:
+            return []
+        now = datetime.now(timezone.utc)
+        rows = []
+        for obj_in in objs_in:
+            created_at = self._client_created_at(obj_in.created_at, now)
+            rows.append({
+                "content": obj_in.content,
+                "mood": obj_in.mood,
+                "user_id": user_id,
+                # Every row needs the same columns in a multi-row VALUES list
+                "created_at": created_at if created_at is not None else func.now(),
+                "last_watered_at": created_at if created_at is not None else func.now(),
+            })
+        result = await db.execute(insert(self.model).values(rows).returning(self.model))
+        # Ids are assigned in VALUES order
+        created = sorted(result.scalars().all(), key=lambda t: t.id)
+
+        # One upsert for the daily mood rollup, inside the same transaction
+        counts = Counter((utc_day(t.created_at), t.mood) for t in created)
+        await thought_stats.increment_many(db, user_id=user_id, counts=dict(counts))
+        await crud_user.bump_data_version(db, user_id=user_id) # Invalidates ETags
+        # COMMIT IS HANDLED BY THE CALLING ENDPOINT
+        return created
+
+    async def import_rows(
+        self, db: AsyncSession, *, objs_in: Sequence[ThoughtBatchItem], user_id: int
+    ) -> int:
+        """
+        Bulk-load validated thoughts without reading them back (imports).
+        Postgres uses COPY on the asyncpg connection; other databases a single
+        multi-row INSERT. Returns the number of thoughts written.
+        """
+        if not objs_in:
+            return 0
+        now = datetime.now(timezone.utc)
+        rows = [
+            (obj_in.content, obj_in.mood, self._client_created_at(obj_in.created_at, now) or now)
+            for obj_in in objs_in
+        ]
+        # The rollup upsert goes first: it opens the transaction the COPY then joins
+        counts = Counter((utc_day(created_at), mood) for _, mood, created_at in rows)
+        await thought_stats.increment_many(db, user_id=user_id, counts=dict(counts))
+        await crud_user.bump_data_version(db, user_id=user_id) # Invalidates ETags
+
+        if db.bind.dialect.name == "postgresql":
+            connection = await db.connection()
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                self.model.__tablename__,
+                columns=["content", "mood", "growth_stage", "created_at", "last_watered_at", "user_id"],
+                records=[
+                    (content, mood.name, 0, created_at, created_at, user_id)
+                    for content, mood, created_at in rows
+                ],
+            )
+        else:
+            await db.execute(insert(self.model).values([
+                {
+                    "content": content,
+                    "mood": mood,
+                    "growth_stage": 0,
+                    "created_at": created_at,
+                    "last_watered_at": created_at,
+                    "user_id": user_id,
+                }
+                for content, mood, created_at in rows
+            ]))
+        # COMMIT IS HANDLED BY THE CALLER
+        return len(rows)
+
     # --- Override get to check ownership (optional but good practice) ---
     async def get(self, db: AsyncSession, id: int, *, user_id: int) -> Thought | None:
         """Get a thought by ID, ensuring it belongs to the user."""
@@ -29,43 +141,142 @@ class CRUDThought(CRUDBase[Thought, ThoughtCreate, ThoughtUpdate]):
 
     # --- Override get_multi to filter by user_id ---
     async def get_multi(
-        self, db: AsyncSession, *, user_id: int, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple[datetime, int]] = None,
     ) -> list[Thought]:
-        """Get multiple thoughts for a specific user."""
-        result = await db.execute(
+        """
+        Get multiple thoughts for a specific user, newest first.
+
+        If `after` (the (created_at, id) of the last row already seen) is given,
+        keyset pagination is used and `skip` is ignored. Offset paging is kept
+        only as a legacy fallback.
+        """
+        created_at_key = self._created_at_key(db)
+        stmt = (
             select(self.model)
             .filter(self.model.user_id == user_id) # Filter by user
-            .order_by(self.model.created_at.desc()) # Order by creation date
-            .offset(skip)
-            .limit(limit)
+            .order_by(created_at_key.desc(), self.model.id.desc()) # id breaks created_at ties
         )
+        if after is not None:
+            after_created_at, after_id = after
+            stmt = stmt.filter(
+                tuple_(created_at_key, self.model.id)
+                < tuple_(self._created_at_key(db, after_created_at), after_id)
+            )
+        elif skip:
+            stmt = stmt.offset(skip)
+        result = await db.execute(stmt.limit(limit))
         return list(result.scalars().all())
 
-    # --- Modify water_thought to check ownership ---
+    async def search(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        query: str,
+        limit: int = 20,
+        after: Optional[Tuple[float, int]] = None,
+    ) -> list[Tuple[Thought, float]]:
+        """
+        Full-text search over the user's thoughts, best match first.
+        Returns (thought, rank) pairs; pass the last pair's (rank, id) as
+        `after` for the next page. Postgres uses the GIN-indexed tsvector
+        column, SQLite the FTS5 table.
+        """
+        if db.bind.dialect.name == "postgresql":
+            ts_query = func.websearch_to_tsquery(literal_column("'english'"), query)
+            search_vector = literal_column(f"thoughts.{SEARCH_VECTOR_COLUMN}", type_=TSVECTOR)
+            rank = func.ts_rank(search_vector, ts_query)
+            stmt = select(self.model, rank.label("rank")).where(search_vector.op("@@")(ts_query))
+        else:
+            # Quote each word so user input can't form FTS5 syntax; words are ANDed
+            terms = re.findall(r"\w+", query)
+            if not terms:
+                return []
+            fts = table(THOUGHTS_FTS_TABLE, column("rowid"))
+            fts_ref = literal_column(THOUGHTS_FTS_TABLE)
+            rank = -func.bm25(fts_ref) # bm25 is lower-is-better; negate so both dialects sort desc
+            stmt = (
+                select(self.model, rank.label("rank"))
+                .join(fts, fts.c.rowid == self.model.id)
+                .where(fts_ref.op("MATCH")(" ".join(f'"{term}"' for term in terms)))
+            )
+
+        stmt = stmt.where(self.model.user_id == user_id).order_by(rank.desc(), self.model.id.desc())
+        if after is not None:
+            stmt = stmt.where(tuple_(rank, self.model.id) < tuple_(*after))
+        result = await db.execute(stmt.limit(limit))
+        return [(row[0], row[1]) for row in result.all()]
+
+    async def stream_all(
+        self, db: AsyncSession, *, user_id: int, batch_size: int = 500
+    ) -> AsyncIterator[Thought]:
+        """
+        Yields all of the user's thoughts, oldest first, through a server-side
+        cursor fetching `batch_size` rows at a time (for exports).
+        """
+        stmt = (
+            select(self.model)
+            .filter(self.model.user_id == user_id)
+            .order_by(self.model.created_at, self.model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await db.stream_scalars(stmt)
+        async for db_obj in result:
+            yield db_obj
+
+    # --- Watering: one atomic UPDATE, ownership checked in the WHERE clause ---
     async def water_thought(self, db: AsyncSession, *, thought_id: int, user_id: int) -> Thought | None:
-        """Increments growth stage, checking ownership first."""
-        # Fetch the thought ensuring it belongs to the user
-        thought = await self.get(db=db, id=thought_id, user_id=user_id) # Use overridden get
-        if not thought:
-            return None # Not found or doesn't belong to user
+        """Increments growth stage (capped at 3). Returns None if not found or not owned."""
+        watered = await self.water_many(db, thought_ids=[thought_id], user_id=user_id)
+        return watered[0] if watered else None
 
-        new_growth_stage = min(thought.growth_stage + 1, 3)
+    async def water_many(self, db: AsyncSession, *, thought_ids: Sequence[int], user_id: int) -> list[Thought]:
+        """
+        Waters several of the user's thoughts in a single UPDATE ... RETURNING.
+        Ids that don't exist or belong to someone else are skipped.
+        """
+        if not thought_ids:
+            return []
         stmt = (
             update(self.model)
-            .where(self.model.id == thought_id) # No need for user_id check here again, already verified
+            .where(self.model.id.in_(set(thought_ids)), self.model.user_id == user_id)
             .values(
-                growth_stage=new_growth_stage,
+                # LEAST(growth_stage + 1, 3), written portably
+                growth_stage=case((self.model.growth_stage < 3, self.model.growth_stage + 1), else_=3),
                 last_watered_at=datetime.now(timezone.utc)
-             )
+            )
             .returning(self.model)
+            .execution_options(synchronize_session=False, populate_existing=True) # RETURNING has the new values
         )
         result = await db.execute(stmt)
-        updated_thought = result.scalars().first()
-        if updated_thought:
-             await db.flush()
-             await db.refresh(updated_thought)
+        watered = sorted(result.scalars().all(), key=lambda t: t.id)
+        if watered:
+            await crud_user.bump_data_version(db, user_id=user_id) # Invalidates ETags
+        # COMMIT IS HANDLED BY THE CALLING ENDPOINT
+        return watered
+
+    async def remove(self, db: AsyncSession, *, id: int, user_id: int) -> Thought | None:
+        """Delete one of the user's thoughts, keeping the rollup and data version in step."""
+        result = await db.execute(
+            delete(self.model)
+            .where(self.model.id == id, self.model.user_id == user_id)
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        )
+        db_obj = result.scalars().first()
+        if db_obj is not None:
+            await thought_stats.increment(
+                db, user_id=user_id, day=utc_day(db_obj.created_at), mood=db_obj.mood, by=-1
+            )
+            await crud_user.bump_data_version(db, user_id=user_id) # Invalidates ETags
         # COMMIT IS HANDLED BY THE CALLING ENDPOINT
-        return updated_thought
+        return db_obj
 
     # --- Modify get_thoughts_for_period to filter by user_id ---
     async def get_thoughts_for_period(
@@ -87,4 +298,12 @@ class CRUDThought(CRUDBase[Thought, ThoughtCreate, ThoughtUpdate]):
         result = await db.execute(stmt)
         return list(result.scalars().all())
 
+    async def get_active_user_ids(self, db: AsyncSession, *, since: datetime) -> list[int]:
+        """Ids of users who created a thought since the given time."""
+        result = await db.execute(
+            select(self.model.user_id).where(self.model.created_at >= since).distinct()
+        )
+        return list(result.scalars().all())
+
+
 thought = CRUDThought(Thought)
\ No newline at end of file
@@ -0,0 +1,219 @@
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, datetime, time, timezone
+from typing import AsyncIterator, List
+
+from ..db import partitions
+from ..models.thought_archive import ThoughtArchive
+from ..models.thought import THOUGHTS_DEFAULT_PARTITION
+
+# How long detach_month() waits for its lock on `thoughts` before failing
+DETACH_LOCK_TIMEOUT = "5s"
+
+# Archived thoughts keep the fields (and order) of the NDJSON export
+ARCHIVE_FIELDS = ("id", "user_id", "content", "mood", "growth_stage", "created_at", "last_watered_at")
+
+def _postgres_isoformat(column: str) -> str:
+    """SQL for datetime.isoformat() of a UTC timestamptz: microseconds only when non-zero, then +00:00."""
+    utc = f"({column} AT TIME ZONE 'UTC')"
+    return (
+        f"to_char({utc}, 'YYYY-MM-DD\"T\"HH24:MI:SS') "
+        f"|| CASE WHEN extract(microseconds FROM {utc})::bigint % 1000000 <> 0 THEN to_char({utc}, '.US') ELSE '' END "
+        "|| '+00:00'"
+    )
+
+def _sqlite_isoformat(column: str) -> str:
+    """SQL for datetime.isoformat() of SQLite's naive text timestamps ("2024-01-05 10:00:00.000000")."""
+    return f"replace(replace({column}, ' ', 'T'), '.000000', '')"
+
+# Same fields and timestamp format as the live rows in the NDJSON export
+POSTGRES_RECORD = (
+    "jsonb_build_object('id', id, 'user_id', user_id, 'content', content, 'mood', mood::text, "
+    "'growth_stage', growth_stage, "
+    f"'created_at', {_postgres_isoformat('created_at')}, "
+    f"'last_watered_at', {_postgres_isoformat('last_watered_at')})"
+)
+SQLITE_RECORD = (
+    "json_object('id', id, 'user_id', user_id, 'content', content, 'mood', mood, 'growth_stage', growth_stage, "
+    f"'created_at', {_sqlite_isoformat('created_at')}, 'last_watered_at', {_sqlite_isoformat('last_watered_at')})"
+)
+
+class CRUDThoughtArchive:
+    """
+    Moves whole months of thoughts into `thoughts_archive` (one row per user
+    and month) and reads them back for exports.
+
+    On a partitioned Postgres table a month is archived in two transactions:
+    detach_month() detaches its partition and is committed straight away,
+    then archive_month() aggregates the now standalone table into the archive
+    and drops it, so no rows are deleted one by one from the live table.
+    A partition left detached by an interrupted run is archived by the next
+    one. Elsewhere (SQLite, rows in the default partition) the month's rows
+    are copied and deleted by date range. Either way the daily mood rollup is
+    decremented and the owners' data versions are bumped with the archiving.
+    """
+
+    def __init__(self, model=ThoughtArchive):
+        self.model = model
+
+    async def months_to_archive(self, db: AsyncSession, *, before: date) -> List[date]:
+        """
+        Months (first days) that still have live thoughts created before
+        `before`, plus any detached but unarchived partitions, oldest first.
+        """
+        if await partitions.is_partitioned(db):
+            months = {month for month in await partitions.list_thought_partitions(db) if month < before}
+            # Their rows are in neither place until archived, whatever the cutoff
+            months.update(await partitions.list_detached_thought_partitions(db))
+            source = THOUGHTS_DEFAULT_PARTITION
+        else:
+            months = set()
+            source = "thoughts"
+        start_of_month = (
+            "date_trunc('month', created_at AT TIME ZONE 'UTC')::date"
+            if db.bind.dialect.name == "postgresql" else "date(created_at, 'start of month')"
+        )
+        result = await db.execute(
+            text(f"SELECT DISTINCT {start_of_month} FROM {source} WHERE created_at < :before"),
+            self._bound_params(db, before=before),
+        )
+        for value in result.scalars():
+            months.add(value if isinstance(value, date) else date.fromisoformat(value))
+        return sorted(months)
+
+    async def detach_month(self, db: AsyncSession, *, month: date) -> bool:
+        """
+        Detaches the month's partition from `thoughts`, if it has one. The
+        caller must commit right away: DETACH holds an ACCESS EXCLUSIVE lock on
+        `thoughts` until then. (DETACH ... CONCURRENTLY is not allowed while
+        the table has a default partition.) Returns whether one was detached.
+        """
+        month = partitions.month_start(month)
+        if not await partitions.is_partitioned(db) or month not in await partitions.list_thought_partitions(db):
+            return False
+        # Give up rather than queue behind a long query, which would block every request behind us
+        await db.execute(text(f"SET LOCAL lock_timeout = '{DETACH_LOCK_TIMEOUT}'"))
+        await db.execute(text(f'ALTER TABLE thoughts DETACH PARTITION "{partitions.partition_name(month)}"'))
+        # COMMIT IS HANDLED BY THE CALLER
+        return True
+
+    async def archive_month(self, db: AsyncSession, *, month: date) -> int:
+        """
+        Archives the month's detached partition (see detach_month()) and any
+        of its thoughts still in the live table, i.e. the default partition on
+        Postgres. Returns the number of thoughts archived.
+        """
+        month = partitions.month_start(month)
+        next_month = partitions.add_months(month, 1)
+        in_range = "created_at >= :start AND created_at < :end"
+        range_params = self._bound_params(db, start=month, end=next_month)
+        if not await partitions.is_partitioned(db):
+            count = await self._archive_rows(db, "thoughts", in_range, range_params, month)
+            await db.execute(text(f"DELETE FROM thoughts WHERE {in_range}"), range_params)
+            # COMMIT IS HANDLED BY THE CALLER
+            return count
+
+        count = await self._archive_rows(db, THOUGHTS_DEFAULT_PARTITION, in_range, range_params, month)
+        await db.execute(text(f"DELETE FROM {THOUGHTS_DEFAULT_PARTITION} WHERE {in_range}"), range_params)
+        if month in await partitions.list_detached_thought_partitions(db):
+            detached = f'"{partitions.partition_name(month)}"'
+            count += await self._archive_rows(db, detached, "TRUE", {}, month)
+            await db.execute(text(f"DROP TABLE {detached}"))
+        # COMMIT IS HANDLED BY THE CALLER
+        return count
+
+    async def _archive_rows(self, db: AsyncSession, source: str, where: str, params: dict, month: date) -> int:
+        """Copies the selected rows into the archive and takes them out of the stats; the caller removes them."""
+        count = (await db.execute(text(f"SELECT count(*) FROM {source} WHERE {where}"), params)).scalar()
+        if count:
+            await db.execute(
+                text(self._archive_sql(db, source, where)), {**params, **self._date_params(db, month=month)}
+            )
+            await self._decrement_stats(db, source, where, params, month, partitions.add_months(month, 1))
+            await db.execute(
+                text(
+                    "UPDATE users SET data_version = data_version + 1 "
+                    f"WHERE id IN (SELECT DISTINCT user_id FROM {source} WHERE {where})"
+                ),
+                params,
+            ) # Archived thoughts leave the lists, so cached ETags must change
+        return count
+
+    @staticmethod
+    def _bound_params(db: AsyncSession, **bounds: date) -> dict:
+        """Month bounds as UTC midnights; SQLite compares its text timestamps with ISO dates."""
+        if db.bind.dialect.name == "postgresql":
+            return {key: datetime.combine(value, time.min, tzinfo=timezone.utc) for key, value in bounds.items()}
+        return {key: value.isoformat() for key, value in bounds.items()}
+
+    @staticmethod
+    def _date_params(db: AsyncSession, **values: date) -> dict:
+        """Dates for Date columns; SQLite stores them as ISO text."""
+        if db.bind.dialect.name == "postgresql":
+            return values
+        return {key: value.isoformat() for key, value in values.items()}
+
+    @staticmethod
+    def _archive_sql(db: AsyncSession, source: str, where: str) -> str:
+        """One archive row per user; a month archived in two goes (partition, default partition) is merged."""
+        if db.bind.dialect.name == "postgresql":
+            return (
+                "INSERT INTO thoughts_archive (user_id, month, thought_count, thoughts) "
+                f"SELECT user_id, CAST(:month AS date), count(*), jsonb_agg({POSTGRES_RECORD} ORDER BY created_at, id) "
+                f"FROM {source} WHERE {where} GROUP BY user_id "
+                "ON CONFLICT (user_id, month) DO UPDATE SET "
+                "thought_count = thoughts_archive.thought_count + excluded.thought_count, "
+                "thoughts = thoughts_archive.thoughts || excluded.thoughts, archived_at = now()"
+            )
+        return (
+            "INSERT INTO thoughts_archive (user_id, month, thought_count, thoughts, archived_at) "
+            "SELECT user_id, :month, count(*), json_group_array(json(record)), CURRENT_TIMESTAMP "
+            f"FROM (SELECT user_id, {SQLITE_RECORD} AS record FROM {source} WHERE {where} ORDER BY created_at, id) "
+            "GROUP BY user_id "
+            "ON CONFLICT (user_id, month) DO UPDATE SET "
+            "thought_count = thoughts_archive.thought_count + excluded.thought_count, "
+            "thoughts = (SELECT json_group_array(json(value)) FROM ("
+            "SELECT value FROM json_each(thoughts_archive.thoughts) "
+            "UNION ALL SELECT value FROM json_each(excluded.thoughts))), "
+            "archived_at = CURRENT_TIMESTAMP"
+        )
+
+    async def _decrement_stats(
+        self, db: AsyncSession, source: str, where: str, params: dict, month: date, next_month: date
+    ) -> None:
+        """Takes the archived thoughts out of thought_daily_stats, as deleting them would."""
+        if db.bind.dialect.name == "postgresql":
+            day = "(created_at AT TIME ZONE 'UTC')::date"
+        else:
+            day = "date(created_at)"
+        await db.execute(
+            text(
+                "UPDATE thought_daily_stats SET count = thought_daily_stats.count - archived.n "
+                f"FROM (SELECT user_id, {day} AS day, mood, count(*) AS n FROM {source} WHERE {where} "
+                f"GROUP BY user_id, {day}, mood) AS archived "
+                "WHERE thought_daily_stats.user_id = archived.user_id "
+                "AND thought_daily_stats.day = archived.day AND thought_daily_stats.mood = archived.mood"
+            ),
+            params,
+        )
+        await db.execute(
+            text("DELETE FROM thought_daily_stats WHERE count <= 0 AND day >= :first_day AND day < :next_month"),
+            self._date_params(db, first_day=month, next_month=next_month),
+        )
+
+    async def stream_archived(self, db: AsyncSession, *, user_id: int) -> AsyncIterator[dict]:
+        """Yields the user's archived thoughts as export records, oldest first."""
+        stmt = (
+            select(self.model.thoughts)
+            .where(self.model.user_id == user_id)
+            .order_by(self.model.month)
+            .execution_options(yield_per=12) # A year of months per fetch
+        )
+        result = await db.stream_scalars(stmt)
+        async for records in result:
+            # Merged months are two runs, each in order
+            for record in sorted(records, key=lambda r: (r["created_at"], r["id"])):
+                yield record
+
+
+thought_archive = CRUDThoughtArchive()
@@ -0,0 +1,89 @@
+from sqlalchemy import select, delete, insert, func, cast, Date, literal_column
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, datetime, timezone
+
+from .base import dialect_insert
+from ..models.thought import Thought, MoodEnum
+from ..models.thought_daily_stat import ThoughtDailyStat
+
+def utc_day(value: datetime) -> date:
+    """Calendar day (UTC) a timestamp falls on. Naive values are assumed UTC (SQLite)."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+class CRUDThoughtStats:
+    """Maintenance and queries for the `thought_daily_stats` rollup table."""
+
+    def __init__(self, model=ThoughtDailyStat):
+        self.model = model
+
+    def _day_expr(self, db: AsyncSession, column):
+        """SQL expression for the UTC calendar day of a timestamp column."""
+        if db.bind.dialect.name == "postgresql":
+            # Literal (not a bind param) so the SELECT and GROUP BY expressions match
+            return cast(func.timezone(literal_column("'UTC'"), column), Date)
+        return func.date(column)
+
+    async def increment(
+        self, db: AsyncSession, *, user_id: int, day: date, mood: MoodEnum, by: int = 1
+    ) -> None:
+        """Adds `by` to the (user, day, mood) counter, creating the row if needed."""
+        await self.increment_many(db, user_id=user_id, counts={(day, mood): by})
+
+    async def increment_many(
+        self, db: AsyncSession, *, user_id: int, counts: dict[tuple[date, MoodEnum], int]
+    ) -> None:
+        """Adds several (day, mood) -> n deltas for one user in a single upsert."""
+        if not counts:
+            return
+        stmt = dialect_insert(db, self.model).values([
+            {"user_id": user_id, "day": day, "mood": mood, "count": n}
+            for (day, mood), n in counts.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.user_id, self.model.day, self.model.mood],
+            set_={"count": self.model.count + stmt.excluded.count},
+        )
+        await db.execute(stmt)
+        # COMMIT IS HANDLED BY THE CALLING ENDPOINT
+
+    async def get_counts_by_day(
+        self, db: AsyncSession, *, user_id: int, start_day: date, end_day: date
+    ) -> list[tuple[date, MoodEnum, int]]:
+        """Returns (day, mood, count) rows for start_day <= day <= end_day."""
+        result = await db.execute(
+            select(self.model.day, self.model.mood, self.model.count)
+            .where(
+                self.model.user_id == user_id,
+                self.model.day >= start_day,
+                self.model.day <= end_day,
+            )
+        )
+        return [(row.day, row.mood, row.count) for row in result]
+
+    async def backfill(self, db: AsyncSession, *, user_id: int | None = None) -> int:
+        """
+        Rebuilds the rollup from the thoughts table (for all users, or one).
+        Returns the number of stats rows written.
+        """
+        clear = delete(self.model)
+        if user_id is not None:
+            clear = clear.where(self.model.user_id == user_id)
+        await db.execute(clear)
+
+        day = self._day_expr(db, Thought.created_at)
+        source = (
+            select(Thought.user_id, day.label("day"), Thought.mood, func.count().label("count"))
+            .group_by(Thought.user_id, day, Thought.mood)
+        )
+        if user_id is not None:
+            source = source.where(Thought.user_id == user_id)
+        result = await db.execute(
+            insert(self.model).from_select(["user_id", "day", "mood", "count"], source)
+        )
+        await db.flush()
+        # COMMIT IS HANDLED BY THE CALLER
+        return result.rowcount
+
+thought_stats = CRUDThoughtStats(ThoughtDailyStat)
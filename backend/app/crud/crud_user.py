@@ -1,11 +1,12 @@
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .base import CRUDBase
+from .base import CRUDBase, dialect_insert
 from ..models.user import User
 # Corrected Import: Remove UserUpdate as it's not defined/used yet
 from ..schemas.user import UserCreate
-from ..core.security import get_password_hash
+from ..core.security import get_password_hash_async
+from ..core.user_cache import user_cache
 
 # Define the UpdateSchemaType generically if not using a specific one
 from pydantic import BaseModel as PydanticBaseModel
@@ -19,19 +20,52 @@ class CRUDUser(CRUDBase[User, UserCreate, BaseUpdateSchema]): # Use placeholder
         result = await db.execute(select(self.model).filter(self.model.username == username))
         return result.scalars().first()
 
-    async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
-        """Create a new user, hashing the password."""
-        hashed_password = get_password_hash(obj_in.password)
+    async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User | None:
+        """
+        Create a new user, hashing the password. Returns None if the username
+        is already taken (INSERT ... ON CONFLICT DO NOTHING, no prior SELECT).
+        """
+        hashed_password = await get_password_hash_async(obj_in.password) # Off the event loop
         # Create a dictionary excluding the plain password
         # Use model_dump for Pydantic v2
         db_obj_data = obj_in.model_dump(exclude={"password"})
-        db_obj = self.model(**db_obj_data, hashed_password=hashed_password)
-        db.add(db_obj)
-        await db.flush()
-        await db.refresh(db_obj)
+        stmt = (
+            dialect_insert(db, self.model)
+            .values(**db_obj_data, hashed_password=hashed_password)
+            .on_conflict_do_nothing(index_elements=[self.model.username])
+            .returning(self.model)
+        )
+        result = await db.execute(stmt)
+        db_obj = result.scalars().first()
+        if db_obj is not None:
+            # Drop any stale identity cached under this username
+            user_cache.invalidate(db_obj.username)
         # COMMIT IS HANDLED BY THE CALLING ENDPOINT
         return db_obj
 
+    async def get_data_version(self, db: AsyncSession, *, user_id: int) -> int | None:
+        """Current data version of a user (primary-key lookup), or None if the user is gone."""
+        result = await db.execute(select(self.model.data_version).where(self.model.id == user_id))
+        return result.scalar_one_or_none()
+
+    async def bump_data_version(self, db: AsyncSession, *, user_id: int) -> None:
+        """Marks the user's thoughts as changed; call in the same transaction as the change."""
+        await db.execute(
+            update(self.model)
+            .where(self.model.id == user_id)
+            .values(data_version=self.model.data_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        # COMMIT IS HANDLED BY THE CALLING ENDPOINT
+
+    async def remove(self, db: AsyncSession, *, id: int) -> User | None:
+        """Delete a user by ID and evict them from the auth cache."""
+        obj = await super().remove(db, id=id)
+        if obj:
+            user_cache.invalidate(obj.username)
+        # COMMIT IS HANDLED BY THE CALLING ENDPOINT
+        return obj
+
     # Add update method later if needed, handling password hashing if password changes
     # async def update(self, db: AsyncSession, *, db_obj: User, obj_in: UserUpdate) -> User:
     #     # ... implementation ...
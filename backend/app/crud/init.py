@@ -1,2 +1,6 @@
 from .crud_thought import thought
-from .crud_user import user # ADDED user crud
\ No newline at end of file
+from .crud_user import user # ADDED user crud
+from .crud_thought_stats import thought_stats
+from .crud_journal_summary import journal_summary
+from .crud_summary_job import summary_job
+from .crud_thought_archive import thought_archive
\ No newline at end of file
@@ -1,4 +1,8 @@
 from .base_class import Base
 # Import all models here to ensure they are registered with Base's metadata
 from ..models.user import User # ADDED User model import
-from ..models.thought import Thought
\ No newline at end of file
+from ..models.thought import Thought
+from ..models.thought_daily_stat import ThoughtDailyStat
+from ..models.journal_summary import JournalSummaryCache
+from ..models.summary_job import SummaryJob
+from ..models.thought_archive import ThoughtArchive
\ No newline at end of file
@@ -1,3 +1,3 @@
 # Makes 'db' a package
 from .base import Base
-from .session import engine, async_session_maker, get_db_session
\ No newline at end of file
+from .session import engine, async_session_maker, read_session_maker, get_db_session, get_read_db_session
\ No newline at end of file
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import re
+from datetime import date, datetime, timezone
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..models.thought import THOUGHT_PARTITION_PREFIX, THOUGHTS_DEFAULT_PARTITION
+from .session import async_session_maker
+
+logger = logging.getLogger(__name__)
+
+# thoughts_p202401 -> January 2024
+_PARTITION_NAME = re.compile(rf"^{THOUGHT_PARTITION_PREFIX}(\d{{4}})(\d{{2}})$")
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month `months` after (or before, if negative) `month`."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    return f"{THOUGHT_PARTITION_PREFIX}{month:%Y%m}"
+
+def _partition_months(names) -> List[date]:
+    months = []
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+async def is_partitioned(db: AsyncSession) -> bool:
+    """True on Postgres once migration e3b9c5d2f471 has partitioned `thoughts`."""
+    if db.bind.dialect.name != "postgresql":
+        return False
+    result = await db.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": THOUGHTS_DEFAULT_PARTITION})
+    return bool(result.scalar())
+
+async def list_thought_partitions(db: AsyncSession) -> List[date]:
+    """Months that have a monthly partition attached to `thoughts`, oldest first."""
+    result = await db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'thoughts'::regclass"
+    ))
+    return _partition_months(result.scalars())
+
+async def list_detached_thought_partitions(db: AsyncSession) -> List[date]:
+    """
+    Months whose partition was detached from `thoughts` but not archived yet
+    (an archive run stopped between its two steps), oldest first.
+    """
+    result = await db.execute(
+        text(
+            "SELECT relname FROM pg_class WHERE relkind = 'r' AND NOT relispartition "
+            "AND relnamespace = to_regnamespace(current_schema()) AND relname LIKE :pattern"
+        ),
+        {"pattern": f"{THOUGHT_PARTITION_PREFIX}%"},
+    )
+    return _partition_months(result.scalars())
+
+async def ensure_thought_partitions(db: AsyncSession, months_ahead: int | None = None) -> int:
+    """
+    Creates any missing monthly partitions from the current month (UTC) to
+    `months_ahead` months ahead. Returns how many were created; 0 when the
+    table is not partitioned (SQLite, or before the migration).
+    """
+    if not await is_partitioned(db):
+        return 0
+    if months_ahead is None:
+        months_ahead = settings.THOUGHT_PARTITION_MONTHS_AHEAD
+    this_month = month_start(datetime.now(timezone.utc).date())
+    result = await db.execute(
+        text("SELECT ensure_thought_partitions(:first_month, :last_month)"),
+        {"first_month": this_month, "last_month": add_months(this_month, max(months_ahead, 0))},
+    )
+    # COMMIT IS HANDLED BY THE CALLER
+    return result.scalar() or 0
+
+async def maintain_thought_partitions(interval: float) -> None:
+    """Ensures future partitions now and then every `interval` seconds until cancelled."""
+    while True:
+        try:
+            async with async_session_maker() as db:
+                created = await ensure_thought_partitions(db)
+                await db.commit()
+            if created:
+                logger.info("Created %s monthly thought partitions.", created)
+        except Exception as e:
+            # Inserts still succeed (default partition); retried on the next round
+            logger.error("Could not create thought partitions: %s", e, exc_info=True)
+        await asyncio.sleep(interval)
@@ -1,6 +1,14 @@
+from sqlalchemy import event, exc
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from ..core.config import settings
+from ..core.metrics import metrics
+from ..core.read_routing import current_user_id, read_router
+import asyncio
 import logging
+import time
+from contextlib import asynccontextmanager
 from typing import AsyncGenerator # Import AsyncGenerator
 from fastapi import HTTPException # Import HTTPException for error handling
 
@@ -10,55 +18,250 @@ logger = logging.getLogger(__name__)
 db_url_log = settings.DATABASE_URL
 if '@' in db_url_log:
     db_url_log = db_url_log.split('@')[0] + '@...' # Hide credentials part
-logger.info(f"Attempting to configure database connection: {db_url_log}")
+logger.info("Attempting to configure database connection: %s", db_url_log)
 
-try:
-    # Create the SQLAlchemy engine for asynchronous operation
-    engine = create_async_engine(
-        settings.DATABASE_URL,
-        pool_pre_ping=True, # Checks connections before handing them out
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long each checkout waited for a connection,
+    and counts checkouts that had to wait (no idle connection, no overflow
+    room left) or timed out. See pool_stats().
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        self.checkouts += 1
+        if self.checkedin() == 0 and self._max_overflow > -1 and self.overflow() >= self._max_overflow:
+            self.waits += 1
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            metrics.observe_pool_checkout(time.perf_counter() - started)
+
+# Connections found dead by a failed statement (see _handle_error)
+_disconnects = 0
+
+def _handle_error(context):
+    # Instead of pinging on every checkout, a dead connection shows up as a
+    # disconnect error on first use; SQLAlchemy then invalidates the pool, so
+    # the remaining stale connections are replaced on their next checkout.
+    global _disconnects
+    if context.is_disconnect:
+        _disconnects += 1
+        logger.warning("Database connection lost (%s); pool invalidated.", type(context.original_exception).__name__)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started", None)
+    if started is not None:
+        metrics.observe_db(time.perf_counter() - started)
+
+def _replica_handle_error(context):
+    # A connection dropped mid-session takes the replica out of rotation; failures
+    # to connect are handled (and retried on the primary) by ReadRoutingAsyncSession
+    if context.is_disconnect and context.connection is not None:
+        read_router.mark_failed(context.original_exception)
+
+def _engine_options(url: str) -> dict:
+    """Pool and driver options shared by the primary and replica engines."""
+    connect_args = {}
+    if url.startswith("postgresql+asyncpg://"):
+        # SQLAlchemy's prepared statement cache and asyncpg's own, per connection
+        connect_args = {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+    return dict(
+        poolclass=InstrumentedPool, # Records checkout wait, waits and timeouts
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS, # Replaces old connections before the server or a proxy drops them
+        pool_pre_ping=settings.DB_POOL_PRE_PING, # Off by default; see _handle_error
+        connect_args=connect_args,
         echo=False # Set to True for debugging SQL queries, False for production/performance
     )
 
+class PrimarySession(Session):
+    """Session class for the primary; commits pin the current user to it (see ReadRouter)."""
+
+class ReadRoutingSession(Session):
+    """
+    Session class for read-only sessions. The first statement picks the
+    replica or the primary for the current user (see ReadRouter); the rest of
+    the session sticks to that engine.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        bind = self.info.get("read_bind")
+        if bind is None:
+            target = replica_engine if read_router.use_replica(current_user_id.get()) else engine
+            bind = self.info["read_bind"] = target.sync_engine
+        return bind
+
+# Raised when a connection cannot be opened: DBAPI errors, and socket errors
+# (refused, unreachable, timed out) that asyncpg raises as they are
+REPLICA_CONNECT_ERRORS = (exc.DBAPIError, OSError)
+
+class ReadRoutingAsyncSession(AsyncSession):
+    """
+    AsyncSession for read-only sessions. Its connection is opened before the
+    first statement; if that fails on the replica, the replica is marked down
+    and the session moves to the primary, so the request is still served.
+    """
+
+    async def _open_read_connection(self) -> None:
+        if self.in_transaction():
+            return # Connected already; later errors are not retried
+        try:
+            await self.connection()
+        except REPLICA_CONNECT_ERRORS as error:
+            info = self.sync_session.info
+            if replica_engine is None or info.get("read_bind") is not replica_engine.sync_engine:
+                raise
+            read_router.mark_failed(error)
+            await self.rollback()
+            info["read_bind"] = engine.sync_engine
+            await self.connection()
+
+    async def execute(self, *args, **kwargs):
+        await self._open_read_connection()
+        return await super().execute(*args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        await self._open_read_connection()
+        return await super().scalar(*args, **kwargs)
+
+    async def scalars(self, *args, **kwargs):
+        await self._open_read_connection()
+        return await super().scalars(*args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        await self._open_read_connection()
+        return await super().get(*args, **kwargs)
+
+    async def stream(self, *args, **kwargs):
+        await self._open_read_connection()
+        return await super().stream(*args, **kwargs)
+
+    async def stream_scalars(self, *args, **kwargs):
+        await self._open_read_connection()
+        return await super().stream_scalars(*args, **kwargs)
+
+def _pin_writer(session):
+    read_router.mark_write(current_user_id.get())
+
+replica_engine = None
+try:
+    # Create the SQLAlchemy engine for asynchronous operation
+    engine = create_async_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
+
+    if settings.METRICS_ENABLED:
+        # Statement count and DB time, per request and process-wide
+        event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
     # Create an asynchronous session factory
     async_session_maker = async_sessionmaker(
         bind=engine,
         class_=AsyncSession,
+        sync_session_class=PrimarySession,
         expire_on_commit=False # Important for FastAPI background tasks potentially
     )
+    # Read-only sessions; the same as the primary's unless a replica is configured
+    read_session_maker = async_session_maker
+
+    if settings.READ_REPLICA_URL:
+        replica_engine = create_async_engine(settings.READ_REPLICA_URL, **_engine_options(settings.READ_REPLICA_URL))
+        event.listen(replica_engine.sync_engine, "handle_error", _handle_error)
+        event.listen(replica_engine.sync_engine, "handle_error", _replica_handle_error)
+        if settings.METRICS_ENABLED:
+            event.listen(replica_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(replica_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(PrimarySession, "after_commit", _pin_writer)
+        read_session_maker = async_sessionmaker(
+            bind=engine, # Only for db.bind.dialect checks; ReadRoutingSession.get_bind picks the engine
+            class_=ReadRoutingAsyncSession,
+            sync_session_class=ReadRoutingSession,
+            expire_on_commit=False
+        )
+        logger.info("Read replica configured for read-only sessions.")
     logger.info("Database engine and session maker configured successfully.")
 
 except Exception as e:
-    logger.critical(f"CRITICAL: Failed to configure database engine/session: {e}", exc_info=True)
+    logger.critical("CRITICAL: Failed to configure database engine/session: %s", e, exc_info=True)
     # Set to None so dependency injection fails clearly if DB isn't configured
     engine = None
+    replica_engine = None
     async_session_maker = None
+    read_session_maker = None
     # Optional: raise RuntimeError here to prevent app startup without DB
 
 
-# Dependency function to get a database session
-# Corrected Type Hint: Use AsyncGenerator yielding AsyncSession
-async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
-    if async_session_maker is None:
+def pool_stats(target=None) -> dict:
+    """Connection pool occupancy and counters, for /api/metrics and the periodic log line."""
+    target = target if target is not None else engine
+    pool = target.pool if target is not None else None
+    if not isinstance(pool, InstrumentedPool):
+        return {}
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0), # Connections open beyond size
+        "max_overflow": pool._max_overflow,
+        "checkouts": pool.checkouts,
+        "waits": pool.waits,
+        "timeouts": pool.timeouts,
+        "disconnects": _disconnects,
+    }
+
+def replica_pool_stats() -> dict:
+    """pool_stats() for the read replica's pool; empty without a replica."""
+    return pool_stats(replica_engine) if replica_engine is not None else {}
+
+async def log_pool_stats(interval: float) -> None:
+    """Logs pool_stats() every `interval` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        logger.info("DB pool: %s", " ".join(f"{key}={value}" for key, value in pool_stats().items()))
+
+
+@asynccontextmanager
+async def _managed_session(session_maker) -> AsyncGenerator[AsyncSession, None]:
+    """Session for one request: rolled back on error, with DB errors mapped to a 500."""
+    if session_maker is None:
          logger.error("Database session maker is not available (configuration error?).")
          # Raising an error here is better than letting it fail later silently
          raise HTTPException(status_code=503, detail="Database service is not configured or unavailable.")
 
     session: AsyncSession | None = None # Initialize session variable
     try:
-        async with async_session_maker() as session:
-            logger.debug(f"DB Session {id(session)} created.")
+        async with session_maker() as session:
+            logger.debug("DB Session %s created.", id(session))
             yield session
             # Commit is now handled explicitly in the endpoint logic
-            logger.debug(f"DB Session {id(session)} yielded.")
+            logger.debug("DB Session %s yielded.", id(session))
     except Exception as e:
-        logger.error(f"Database session error during yield/operation: {e}", exc_info=True)
+        logger.error("Database session error during yield/operation: %s", e, exc_info=True)
         if session: # Check if session was successfully created before rollback attempt
             try:
                 await session.rollback()
-                logger.info(f"DB Session {id(session)} rolled back due to error.")
+                logger.info("DB Session %s rolled back due to error.", id(session))
             except Exception as rb_exc:
-                logger.error(f"Error during session rollback: {rb_exc}", exc_info=True)
+                logger.error("Error during session rollback: %s", rb_exc, exc_info=True)
         # Re-raise the original exception or a specific HTTPException
         if isinstance(e, HTTPException):
              raise
@@ -69,6 +272,22 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
         # The 'async with' context manager handles closing the session.
         # No explicit close needed here.
         if session:
-            logger.debug(f"DB Session {id(session)} finished.")
+            logger.debug("DB Session %s finished.", id(session))
         else:
-            logger.warning("DB Session was not successfully initialized in get_db_session.")
\ No newline at end of file
+            logger.warning("DB Session was not successfully initialized in get_db_session.")
+
+# Dependency function to get a database session
+# Corrected Type Hint: Use AsyncGenerator yielding AsyncSession
+async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
+    async with _managed_session(async_session_maker) as session:
+        yield session
+
+async def get_read_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for read-only routes: the read replica when one is configured,
+    healthy and the user has not written recently; the primary otherwise.
+    The engine is picked at the first statement, after authentication.
+    Never commit on it.
+    """
+    async with _managed_session(read_session_maker) as session:
+        yield session
@@ -1,32 +1,66 @@
-﻿from fastapi import FastAPI
+﻿from contextlib import asynccontextmanager
+import asyncio
+import hmac
+from fastapi import FastAPI, HTTPException, Request, status
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 import os
 
 from .core.config import settings
+from .core.logging_setup import configure_logging, logging_setup, RequestContextMiddleware
 # Import all endpoint routers
 from .api.v1.endpoints import journal, thoughts, insights, auth, users, mindspace # ADDED mindspace
-# from .db.session import engine # Optional
+from .core.summary_jobs import summary_job_queue
+from .core.metrics import metrics, MetricsMiddleware
+from .core.user_cache import user_cache
+from .core.practice_catalog import practice_catalog
+from .core.ai_client import ai_client
+from .crud.crud_journal_summary import journal_summary as crud_journal_summary
+from .core.read_routing import read_router
+from .core.admission import ai_admission
+from .db.session import engine, pool_stats, replica_pool_stats, log_pool_stats
+from .db.partitions import maintain_thought_partitions
 
-logging.basicConfig(level=logging.INFO)
+configure_logging() # JSON lines written by a background thread; see LOG_* settings
 logger = logging.getLogger(__name__)
 IS_PRODUCTION = os.getenv("APP_ENV", "development").lower() == "production"
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background summary workers (and optional weekly precompute scheduler)
+    await summary_job_queue.start(generate=journal.generate_summary)
+    pool_logger = None
+    if settings.DB_POOL_STATS_LOG_SECONDS > 0:
+        pool_logger = asyncio.create_task(log_pool_stats(settings.DB_POOL_STATS_LOG_SECONDS))
+    # Monthly thought partitions ahead of time (Postgres only; see app.db.partitions)
+    partition_keeper = None
+    if settings.THOUGHT_PARTITION_CHECK_SECONDS > 0 and engine is not None and engine.dialect.name == "postgresql":
+        partition_keeper = asyncio.create_task(maintain_thought_partitions(settings.THOUGHT_PARTITION_CHECK_SECONDS))
+    yield
+    if pool_logger is not None:
+        pool_logger.cancel()
+    if partition_keeper is not None:
+        partition_keeper.cancel()
+    await summary_job_queue.stop()
+
 app = FastAPI(
     title="NeuroNest API",
     description="Backend API for the NeuroNest mental wellness application.",
     version="0.3.1", # Incremented version
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse, # orjson instead of the stdlib json encoder
 )
 
 # CORS Middleware Configuration
 origins = []
 if settings.FRONTEND_ORIGIN:
     origins.append(settings.FRONTEND_ORIGIN)
-    logger.info(f"Allowing CORS origin (from config): {settings.FRONTEND_ORIGIN}")
+    logger.info("Allowing CORS origin (from config): %s", settings.FRONTEND_ORIGIN)
 local_origin = "http://localhost:3000"
 if local_origin not in origins:
     origins.append(local_origin)
-    logger.info(f"Allowing CORS origin (for local dev): {local_origin}")
+    logger.info("Allowing CORS origin (for local dev): %s", local_origin)
 
 app.add_middleware(
     CORSMiddleware,
@@ -34,8 +68,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing", "ETag", "X-Request-ID"], # Let the browser read the pagination cursor, timings, ETag and request id
 )
 
+# Request timings (Server-Timing header) and per-route latency; added after CORS so it wraps CORS too
+app.add_middleware(MetricsMiddleware)
+# Request id on every log line and in the X-Request-ID response header; outermost, so it covers everything else
+app.add_middleware(RequestContextMiddleware)
+
+# Component counters exposed on /api/metrics
+metrics.register_stats("auth_user_cache", user_cache.stats)
+metrics.register_stats("summary_cache", crud_journal_summary.stats)
+metrics.register_stats("mindspace_catalog", practice_catalog.stats)
+metrics.register_stats("ai_client", ai_client.stats)
+metrics.register_stats("summary_jobs", summary_job_queue.stats)
+metrics.register_stats("db_pool", pool_stats)
+metrics.register_stats("db_replica_pool", replica_pool_stats)
+metrics.register_stats("db_read_routing", read_router.stats)
+metrics.register_stats("ai_admission", ai_admission.stats)
+metrics.register_stats("logging", logging_setup.stats)
+
 # --- Include API Routers ---
 api_prefix = "/api/v1"
 app.include_router(auth.router, prefix=f"{api_prefix}/auth", tags=["Authentication"])
@@ -51,11 +103,26 @@ async def health_check():
     logger.debug("Health check endpoint called.")
     return {"status": "ok"}
 
+@app.get("/api/metrics", tags=["Health"], include_in_schema=False)
+async def read_metrics(request: Request):
+    """
+    Prometheus text exposition of request, DB, pool and AI metrics.
+    Requires `Authorization: Bearer <METRICS_TOKEN>` when a token is set;
+    in production without a token it is not served (404).
+    """
+    if not settings.METRICS_ENABLED or (IS_PRODUCTION and not settings.METRICS_TOKEN):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if settings.METRICS_TOKEN:
+        supplied = request.headers.get("authorization", "").encode()
+        if not hmac.compare_digest(supplied, f"Bearer {settings.METRICS_TOKEN}".encode()):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token.")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/", tags=["Root"], include_in_schema=False)
 async def read_root():
     logger.debug("Root endpoint called.")
     return {"message": f"Welcome to the NeuroNest API v{app.version}"}
 
-logger.info(f"FastAPI application {app.title} v{app.version} initialized.")
-logger.info(f"Running in '{os.getenv('APP_ENV', 'development')}' mode.")
-logger.info(f"Allowed CORS origins: {origins}")
\ No newline at end of file
+logger.info("FastAPI application %s v%s initialized.", app.title, app.version)
+logger.info("Running in '%s' mode.", os.getenv('APP_ENV', 'development'))
+logger.info("Allowed CORS origins: %s", origins)
\ No newline at end of file
@@ -1,2 +1,6 @@
 # Makes 'models' a package
-from .thought import Thought
\ No newline at end of file
+from .thought import Thought
+from .thought_daily_stat import ThoughtDailyStat
+from .journal_summary import JournalSummaryCache
+from .summary_job import SummaryJob
+from .thought_archive import ThoughtArchive
\ No newline at end of file
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from ..db.base_class import Base
+
+class JournalSummaryCache(Base):
+    """
+    Stored AI journal summaries, keyed by a hash of exactly what was sent to
+    the model (ordered thought ids/contents + prompt version). Any change to
+    the user's thoughts in the period produces a new key.
+    """
+    __tablename__ = "journal_summaries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    period = Column(String, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    response_json = Column(Text, nullable=False) # Serialized JournalSummaryResponse
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "period", "content_hash", name="uq_journal_summaries_user_id_period_content_hash"),
+    )
+
+    def __repr__(self):
+        return f"<JournalSummaryCache(id={self.id}, user_id={self.user_id}, period='{self.period}', hash='{self.content_hash[:12]}')>"
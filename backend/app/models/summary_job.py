@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
+from sqlalchemy.sql import func
+from ..db.base_class import Base
+
+class SummaryJob(Base):
+    """
+    A queued/running/finished journal summary generation.
+    Persisted so pending work survives restarts; ids are random so they are
+    not guessable across users.
+    """
+    __tablename__ = "summary_jobs"
+
+    id = Column(String(32), primary_key=True) # uuid4 hex
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    period = Column(String, nullable=False)
+    status = Column(String(16), nullable=False, default="pending") # pending | running | succeeded | failed
+    result_json = Column(Text, nullable=True) # Serialized JournalSummaryResponse
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    claimed_at = Column(DateTime(timezone=True), nullable=True) # Set when a worker claims it; see SUMMARY_JOB_LEASE_SECONDS
+
+    __table_args__ = (
+        Index("ix_summary_jobs_user_id_status", user_id, status),
+        Index("ix_summary_jobs_status", status),
+    )
+
+    def __repr__(self):
+        return f"<SummaryJob(id='{self.id}', user_id={self.user_id}, status='{self.status}')>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Enum as SQLAlchemyEnum, ForeignKey # Added ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, Enum as SQLAlchemyEnum, ForeignKey, Index, DDL, event # Added ForeignKey
 from sqlalchemy.orm import relationship # Added relationship
 from sqlalchemy.sql import func
 from ..db.base_class import Base
@@ -25,5 +25,47 @@ class Thought(Base):
     # Relationship back to User (many-to-one)
     owner = relationship("User", back_populates="thoughts")
 
+    # Composite index matching the list ordering, so keyset pages are a single index range scan
+    __table_args__ = (
+        Index("ix_thoughts_user_id_created_at_id", user_id, created_at.desc(), id.desc()),
+    )
+
     def __repr__(self):
-        return f"<Thought(id={self.id}, user_id={self.user_id}, content='{self.content[:20]}...')>"
\ No newline at end of file
+        return f"<Thought(id={self.id}, user_id={self.user_id}, content='{self.content[:20]}...')>"
+
+# --- Full-text search over content (see CRUDThought.search) ---
+# Postgres: a generated tsvector column with a GIN index. It is deliberately not
+# mapped, so ordinary thought queries never load it.
+# SQLite: an external-content FTS5 table kept in step by triggers.
+# Created by migration 5b7d3e1f9a24, and here for databases built with create_all.
+SEARCH_VECTOR_COLUMN = "search_vector"
+THOUGHTS_FTS_TABLE = "thoughts_fts"
+SEARCH_SCHEMA_OBJECTS = {SEARCH_VECTOR_COLUMN, "ix_thoughts_search_vector", THOUGHTS_FTS_TABLE}
+
+POSTGRES_SEARCH_DDL = [
+    f"ALTER TABLE thoughts ADD COLUMN {SEARCH_VECTOR_COLUMN} tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('english', content)) STORED",
+    f"CREATE INDEX ix_thoughts_search_vector ON thoughts USING gin ({SEARCH_VECTOR_COLUMN})",
+]
+SQLITE_SEARCH_DDL = [
+    f"CREATE VIRTUAL TABLE {THOUGHTS_FTS_TABLE} USING fts5("
+    "content, content='thoughts', content_rowid='id', tokenize='porter unicode61')",
+    f"CREATE TRIGGER thoughts_fts_ai AFTER INSERT ON thoughts BEGIN "
+    f"INSERT INTO {THOUGHTS_FTS_TABLE}(rowid, content) VALUES (new.id, new.content); END",
+    f"CREATE TRIGGER thoughts_fts_ad AFTER DELETE ON thoughts BEGIN "
+    f"INSERT INTO {THOUGHTS_FTS_TABLE}({THOUGHTS_FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content); END",
+    f"CREATE TRIGGER thoughts_fts_au AFTER UPDATE OF content ON thoughts BEGIN "
+    f"INSERT INTO {THOUGHTS_FTS_TABLE}({THOUGHTS_FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content); "
+    f"INSERT INTO {THOUGHTS_FTS_TABLE}(rowid, content) VALUES (new.id, new.content); END",
+]
+
+# --- Monthly range partitions (Postgres, migration e3b9c5d2f471) ---
+# thoughts_pYYYYMM per UTC month plus a default partition for anything outside
+# them (e.g. old imports). Managed in SQL, so not mapped; see app.db.partitions.
+THOUGHT_PARTITION_PREFIX = "thoughts_p"
+THOUGHTS_DEFAULT_PARTITION = "thoughts_default"
+
+for _statement in POSTGRES_SEARCH_DDL:
+    event.listen(Thought.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(Thought.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, JSON
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from ..db.base_class import Base
+
+class ThoughtArchive(Base):
+    """
+    Archived thoughts, one row per user and month (UTC). `thoughts` holds the
+    month's thoughts as a JSON array in the export format; on Postgres the
+    column is jsonb, compressed by TOAST (lz4 where the server supports it).
+    Written by `python -m app.commands.archive_thoughts`, read by the export.
+    """
+    __tablename__ = "thoughts_archive"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    month = Column(Date, primary_key=True) # First day of the month
+    thought_count = Column(Integer, nullable=False)
+    thoughts = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<ThoughtArchive(user_id={self.user_id}, month={self.month}, thought_count={self.thought_count})>"
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, Date, Enum as SQLAlchemyEnum, ForeignKey
+from ..db.base_class import Base
+from .thought import MoodEnum
+
+class ThoughtDailyStat(Base):
+    """
+    Per-user, per-day (UTC), per-mood thought counts.
+    Maintained in the same transaction as thought creation so insights can
+    aggregate over at most `period_days` rows instead of loading thoughts.
+    """
+    __tablename__ = "thought_daily_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    mood = Column(SQLAlchemyEnum(MoodEnum), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ThoughtDailyStat(user_id={self.user_id}, day={self.day}, mood={self.mood}, count={self.count})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..db.base_class import Base
@@ -10,6 +10,8 @@ class User(Base):
     username = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Bumped whenever the user's thoughts change; drives ETags on thoughts/insights
+    data_version = Column(BigInteger, nullable=False, default=0, server_default="0")
 
     # Relationship to Thoughts (one-to-many)
     thoughts = relationship("Thought", back_populates="owner", cascade="all, delete-orphan")
@@ -1,5 +1,5 @@
-from .thought import Thought, ThoughtCreate, ThoughtUpdate, ThoughtInDB
-from .journal import JournalSummaryRequest, JournalSummaryResponse
+from .thought import Thought, ThoughtCreate, ThoughtBatchItem, ThoughtWaterRequest, ThoughtImportError, ThoughtImportReport, ThoughtUpdate, ThoughtInDB
+from .journal import JournalSummaryRequest, JournalSummaryResponse, SummaryJobResponse
 from .user import User, UserCreate, UserInDB
 from .token import Token, TokenData
 # ADDED Mindspace schemas
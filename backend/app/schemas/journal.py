@@ -1,6 +1,7 @@
 # Keep the existing journal schemas, no changes needed here for now
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
+from datetime import datetime
 
 class JournalSummaryRequest(BaseModel):
     period: str = "past week" # Could add start_date, end_date later
@@ -9,4 +10,13 @@ class JournalSummaryResponse(BaseModel):
     summary: str
     insight: str
     recommendation: str
-    highlights: List[Dict] # List of {date: str, entry: str, comment: str}
\ No newline at end of file
+    highlights: List[Dict] # List of {date: str, entry: str, comment: str}
+
+# Status of an asynchronous summary job (POST /summary/jobs, GET /summary/jobs/{id})
+class SummaryJobResponse(BaseModel):
+    job_id: str
+    status: str # pending | running | succeeded | failed
+    result: Optional[JournalSummaryResponse] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
\ No newline at end of file
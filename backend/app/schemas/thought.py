@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ConfigDict
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from ..models.thought import MoodEnum # Import the Enum
 
 # Base properties shared by all thought-related schemas
@@ -12,6 +12,28 @@ class ThoughtBase(BaseModel):
 class ThoughtCreate(ThoughtBase):
     pass # content and mood are required
 
+# One queued thought in an offline-sync batch (also one imported row)
+class ThoughtBatchItem(ThoughtCreate):
+    created_at: Optional[datetime] = None # When the client wrote it; server time if omitted
+
+# A row of an import that could not be loaded
+class ThoughtImportError(BaseModel):
+    row: int # 1-based data row (CSV header not counted)
+    error: str
+
+# Result of POST /thoughts/import
+class ThoughtImportReport(BaseModel):
+    format: str
+    imported: int
+    failed: int
+    errors: List[ThoughtImportError] # First THOUGHT_IMPORT_MAX_ERRORS only
+    seconds: float
+    rows_per_second: float
+
+# Ids of the user's thoughts to water in one request ("water all")
+class ThoughtWaterRequest(BaseModel):
+    thought_ids: List[int]
+
 # Properties allowed when updating a thought via API (optional fields)
 # Note: We decided growth stage is updated via watering, not direct update
 class ThoughtUpdate(ThoughtBase):
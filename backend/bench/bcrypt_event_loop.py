@@ -0,0 +1,77 @@
+"""
+Micro-benchmark: event-loop latency while concurrent logins verify passwords.
+
+Compares calling bcrypt inline (security.verify_password) with the thread-pool
+variant (security.verify_password_async). A probe task sleeps for a short
+interval in a loop; how late it wakes up is the latency every other request on
+the worker would see.
+
+Usage (from the backend directory):
+    python -m bench.bcrypt_event_loop [--logins 20] [--rounds 12]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+PROBE_INTERVAL = 0.005 # seconds
+
+async def _probe(lags: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - start - PROBE_INTERVAL)
+
+async def _run(mode: str, logins: int, password: str, hashed: str) -> dict:
+    from app.core import security
+
+    async def login_inline():
+        security.verify_password(password, hashed)
+
+    async def login_offloaded():
+        await security.verify_password_async(password, hashed)
+
+    login = login_inline if mode == "inline" else login_offloaded
+    lags: list = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(lags, stop))
+    await asyncio.sleep(PROBE_INTERVAL * 2) # Let the probe settle
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe
+    lags_ms = sorted(l * 1000 for l in lags) or [0.0]
+    return {
+        "mode": mode,
+        "logins": logins,
+        "wall_seconds": round(elapsed, 3),
+        "loop_lag_ms_p50": round(statistics.median(lags_ms), 2),
+        "loop_lag_ms_p99": round(lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))], 2),
+        "loop_lag_ms_max": round(lags_ms[-1], 2),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--logins", type=int, default=20, help="Concurrent logins per run.")
+    parser.add_argument("--rounds", type=int, default=None, help="Override BCRYPT_ROUNDS.")
+    args = parser.parse_args()
+    if args.rounds is not None:
+        os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+
+    from app.core import security
+    password = "correct horse battery staple"
+    hashed = security.get_password_hash(password)
+
+    results = [asyncio.run(_run(mode, args.logins, password, hashed)) for mode in ("inline", "offloaded")]
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Local stand-in for the Anthropic Messages API, for load tests.
+
+Answers POST /v1/messages (plain and `stream: true`) after a configurable
+latency with canned JSON shaped like what the journal and Mindspace prompts
+ask for, and can fail a fraction of calls with 529 to exercise retries.
+Point the backend at it with ANTHROPIC_BASE_URL=http://127.0.0.1:<port>.
+
+Usage (from the backend directory):
+    python -m bench.fake_anthropic [--port 8099] [--latency 0.8] [--jitter 0.2] [--error-rate 0]
+"""
+import argparse
+import asyncio
+import json
+import random
+import uuid
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+JOURNAL_REPLY = {
+    "summary": "You wrote regularly this week, mostly about work and time outdoors.",
+    "insight": "Entries written after walks are noticeably more positive.",
+    "recommendation": "Keep the short evening walk; it seems to reset stressful days.",
+    "highlights": [
+        {"date": "2024-01-02", "entry": "Walked to the park with friends", "comment": "A calm, social moment."}
+    ],
+}
+MINDSPACE_REPLY = {
+    "recommendations": [
+        {"id": "box_breathing", "title": "Box Breathing", "duration_minutes": 4,
+         "description": "Inhale, hold, exhale and hold for four counts each to settle the nervous system."},
+        {"id": "body_scan", "title": "Body Scan", "duration_minutes": 8,
+         "description": "Move attention slowly from head to toe, noticing and releasing tension."},
+    ]
+}
+STREAM_CHUNK_CHARS = 40
+
+class FakeAnthropic:
+    def __init__(self, latency: float, jitter: float, error_rate: float):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+
+    def _delay(self) -> float:
+        return max(self.latency + random.uniform(-self.jitter, self.jitter), 0.0)
+
+    @staticmethod
+    def _reply_text(body: dict) -> str:
+        prompt = " ".join(
+            message["content"] if isinstance(message.get("content"), str) else json.dumps(message.get("content"))
+            for message in body.get("messages", [])
+        )
+        return json.dumps(MINDSPACE_REPLY if "practices" in prompt.lower() else JOURNAL_REPLY)
+
+    async def messages(self, request: Request):
+        body = await request.json()
+        self.requests += 1
+        if self.error_rate and random.random() < self.error_rate:
+            self.errors += 1
+            await asyncio.sleep(self._delay() / 4)
+            return JSONResponse(
+                {"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded (fake)"}},
+                status_code=529,
+            )
+        text = self._reply_text(body)
+        model = body.get("model", "fake-model")
+        message_id = f"msg_{uuid.uuid4().hex[:24]}"
+        usage = {"input_tokens": 100, "output_tokens": len(text) // 4}
+        if body.get("stream"):
+            return StreamingResponse(self._stream(message_id, model, text, usage), media_type="text/event-stream")
+        await asyncio.sleep(self._delay())
+        return JSONResponse({
+            "id": message_id,
+            "type": "message",
+            "role": "assistant",
+            "model": model,
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": usage,
+        })
+
+    async def _stream(self, message_id: str, model: str, text: str, usage: dict):
+        def event(name: str, data: dict) -> bytes:
+            return f"event: {name}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+
+        chunks = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)]
+        # Spread the latency over time-to-first-token and the deltas
+        delay = self._delay()
+        await asyncio.sleep(delay / 2)
+        yield event("message_start", {"type": "message_start", "message": {
+            "id": message_id, "type": "message", "role": "assistant", "model": model, "content": [],
+            "stop_reason": None, "stop_sequence": None, "usage": {"input_tokens": usage["input_tokens"], "output_tokens": 1},
+        }})
+        yield event("content_block_start", {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}})
+        for chunk in chunks:
+            await asyncio.sleep(delay / 2 / max(len(chunks), 1))
+            yield event("content_block_delta", {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": chunk}})
+        yield event("content_block_stop", {"type": "content_block_stop", "index": 0})
+        yield event("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                      "usage": {"output_tokens": usage["output_tokens"]}})
+        yield event("message_stop", {"type": "message_stop"})
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "errors": self.errors}
+
+def create_app(latency: float = 0.8, jitter: float = 0.2, error_rate: float = 0.0) -> Starlette:
+    fake = FakeAnthropic(latency, jitter, error_rate)
+    app = Starlette(routes=[Route("/v1/messages", fake.messages, methods=["POST"])])
+    app.state.fake = fake
+    return app
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.8, help="Mean seconds per call.")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Uniform +/- seconds around the mean.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls answered with 529.")
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(create_app(args.latency, args.jitter, args.error_rate), host="127.0.0.1", port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
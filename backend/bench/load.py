@@ -0,0 +1,243 @@
+"""
+End-to-end load test: throughput and p50/p95/p99 latency per route, as JSON.
+
+By default it seeds a throwaway SQLite database (see bench.seed), starts the
+fake Anthropic server (bench.fake_anthropic) and the app under uvicorn as
+subprocesses, then runs --concurrency virtual users for --duration seconds.
+Each virtual user signs up a fresh account once, logs in as one of the seeded
+users and loops over list, create, water, search, insights and delete, with
+a journal summary and Mindspace request every --ai-every iterations.
+
+Pass --target to load an app that is already running (seed it with
+bench.seed against the same database and point its ANTHROPIC_BASE_URL at a
+fake server first). Save the output per commit and compare runs with the
+same arguments.
+
+Usage (from the backend directory):
+    python -m bench.load [--concurrency 20] [--duration 30] [--users 50] [--thoughts 200]
+                         [--ai-every 10] [--ai-latency 0.8] [--database-url URL] [--target URL]
+                         [--output FILE]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench.seed import BENCH_PASSWORD, seed, username # noqa: E402
+
+BACKEND_DIR = os.path.realpath(os.path.join(os.path.dirname(__file__), '..'))
+API = "/api/v1"
+MOODS = ("positive", "neutral", "negative")
+MINDSPACE_MOODS = ("anxious", "stressed", "calm", "sad", "happy", "tired")
+SEARCH_TERMS = ("walked park", "coffee", "deadline", "family dinner", "quiet evening")
+
+class Recorder:
+    """Latencies and errors per route template."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.statuses: Dict[str, Dict[int, int]] = {}
+
+    def record(self, route: str, seconds: float, status_code: int, ok: bool) -> None:
+        self.latencies.setdefault(route, []).append(seconds)
+        statuses = self.statuses.setdefault(route, {})
+        statuses[status_code] = statuses.get(status_code, 0) + 1
+        if not ok:
+            self.errors[route] = self.errors.get(route, 0) + 1
+
+    def report(self, elapsed: float) -> dict:
+        routes = {}
+        for route, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            routes[route] = {
+                "count": len(values),
+                "errors": self.errors.get(route, 0),
+                "rps": round(len(values) / elapsed, 2),
+                "p50_ms": round(_percentile(values, 50) * 1000, 1),
+                "p95_ms": round(_percentile(values, 95) * 1000, 1),
+                "p99_ms": round(_percentile(values, 99) * 1000, 1),
+                "max_ms": round(values[-1] * 1000, 1),
+                "statuses": {str(code): n for code, n in sorted(self.statuses[route].items())},
+            }
+        total = sum(r["count"] for r in routes.values())
+        return {
+            "requests": total,
+            "errors": sum(r["errors"] for r in routes.values()),
+            "seconds": round(elapsed, 2),
+            "rps": round(total / elapsed, 2),
+            "routes": routes,
+        }
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+async def _call(client, recorder: Recorder, route: str, method: str, url: str, expect=(200,), **kwargs):
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except Exception:
+        recorder.record(route, time.perf_counter() - started, 0, ok=False)
+        return None
+    recorder.record(route, time.perf_counter() - started, response.status_code, ok=response.status_code in expect)
+    return response
+
+async def virtual_user(client, recorder: Recorder, *, index: int, seeded_users: int, deadline: float, ai_every: int) -> None:
+    rng = random.Random(index)
+    await _call(client, recorder, "POST /users", "POST", f"{API}/users", expect=(201,),
+                json={"username": f"load_{uuid.uuid4().hex[:12]}", "password": BENCH_PASSWORD})
+    response = await _call(client, recorder, "POST /auth/token", "POST", f"{API}/auth/token",
+                           data={"username": username(index % seeded_users), "password": BENCH_PASSWORD})
+    if response is None or response.status_code != 200:
+        return
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    iteration = 0
+    while time.perf_counter() < deadline:
+        iteration += 1
+        await _call(client, recorder, "GET /thoughts", "GET", f"{API}/thoughts?limit=20", headers=headers)
+        created = await _call(client, recorder, "POST /thoughts", "POST", f"{API}/thoughts", expect=(201,),
+                              headers=headers, json={"content": f"Load test thought {iteration}", "mood": rng.choice(MOODS)})
+        thought_id = created.json()["id"] if created is not None and created.status_code == 201 else None
+        if thought_id is not None:
+            await _call(client, recorder, "PUT /thoughts/{thought_id}/water", "PUT",
+                        f"{API}/thoughts/{thought_id}/water", headers=headers)
+        await _call(client, recorder, "GET /thoughts/search", "GET", f"{API}/thoughts/search",
+                    headers=headers, params={"q": rng.choice(SEARCH_TERMS), "limit": 20})
+        await _call(client, recorder, "GET /insights", "GET", f"{API}/insights", headers=headers)
+        if ai_every and iteration % ai_every == 0:
+            await _call(client, recorder, "POST /journal/summary", "POST", f"{API}/journal/summary",
+                        headers=headers, json={"period": "past week"})
+            await _call(client, recorder, "POST /mindspace/recommendations", "POST", f"{API}/mindspace/recommendations",
+                        headers=headers, json={"mood": rng.choice(MINDSPACE_MOODS)})
+        if thought_id is not None:
+            # Keeps each seeded user's thought count steady across the run
+            await _call(client, recorder, "DELETE /thoughts/{thought_id}", "DELETE",
+                        f"{API}/thoughts/{thought_id}", expect=(204,), headers=headers)
+
+async def run_load(target: str, *, concurrency: int, duration: float, seeded_users: int, ai_every: int) -> dict:
+    import httpx
+
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=target, limits=limits, timeout=120) as client:
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(
+            virtual_user(client, recorder, index=i, seeded_users=seeded_users, deadline=deadline, ai_every=ai_every)
+            for i in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+    return recorder.report(elapsed)
+
+def _wait_until_up(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Process serving {url} exited with code {process.returncode}")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Timed out waiting for {url}")
+
+@contextmanager
+def local_stack(args):
+    """Fake Anthropic server and the app under uvicorn, stopped on exit."""
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    app_url = f"http://127.0.0.1:{args.port}"
+    env = {
+        **os.environ,
+        "ANTHROPIC_API_KEY": "bench-key",
+        "ANTHROPIC_BASE_URL": fake_url,
+    }
+    processes = []
+    try:
+        fake = subprocess.Popen(
+            [sys.executable, "-m", "bench.fake_anthropic", "--port", str(args.fake_port),
+             "--latency", str(args.ai_latency), "--error-rate", str(args.ai_error_rate)],
+            cwd=BACKEND_DIR, env=env,
+        )
+        processes.append(fake)
+        _wait_until_up(f"{fake_url}/", fake)
+        app = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(args.port),
+             "--log-level", "warning", "--no-access-log"],
+            cwd=BACKEND_DIR, env=env,
+        )
+        processes.append(app)
+        _wait_until_up(f"{app_url}/api/health", app)
+        yield app_url
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, default=20, help="Virtual users.")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run.")
+    parser.add_argument("--users", type=int, default=50, help="Seeded users.")
+    parser.add_argument("--thoughts", type=int, default=200, help="Seeded thoughts per user.")
+    parser.add_argument("--ai-every", type=int, default=10, help="AI requests every N iterations (0 disables).")
+    parser.add_argument("--ai-latency", type=float, default=0.8, help="Fake Anthropic latency in seconds.")
+    parser.add_argument("--ai-error-rate", type=float, default=0.0, help="Fraction of fake Anthropic calls failing with 529.")
+    parser.add_argument("--database-url", help="Defaults to a throwaway SQLite file.")
+    parser.add_argument("--target", help="Base URL of an already running, already seeded app.")
+    parser.add_argument("--port", type=int, default=8098, help="Port for the app started here.")
+    parser.add_argument("--fake-port", type=int, default=8099, help="Port for the fake Anthropic server.")
+    parser.add_argument("--output", help="Also write the JSON report to this file.")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    elif not args.target:
+        db_dir = tempfile.mkdtemp(prefix="neuronest-load-")
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(db_dir, 'load.db')}"
+
+    report = {"config": {
+        "concurrency": args.concurrency, "duration": args.duration, "users": args.users,
+        "thoughts": args.thoughts, "ai_every": args.ai_every, "ai_latency": args.ai_latency,
+        "ai_error_rate": args.ai_error_rate, "target": args.target or "local",
+    }}
+    if args.target:
+        report["load"] = asyncio.run(run_load(
+            args.target, concurrency=args.concurrency, duration=args.duration,
+            seeded_users=args.users, ai_every=args.ai_every,
+        ))
+    else:
+        report["seed"] = asyncio.run(seed(args.users, args.thoughts, days=60, seed_value=1))
+        with local_stack(args) as url:
+            report["load"] = asyncio.run(run_load(
+                url, concurrency=args.concurrency, duration=args.duration,
+                seeded_users=args.users, ai_every=args.ai_every,
+            ))
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+if __name__ == "__main__":
+    main()
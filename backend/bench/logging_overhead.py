@@ -0,0 +1,189 @@
+"""
+Logging overhead: time spent on the request path (the event loop thread) by logging.
+
+Two measurements, both writing to a throwaway file instead of stderr. The
+file can be made slow (--sink-latency-ms per write) to stand in for a log
+pipe that drains slowly, which is when synchronous logging stalls the loop.
+
+- per call: one typical INFO line, eager f-string vs lazy %-args, with the
+  level disabled, through a synchronous StreamHandler (the old basicConfig
+  setup) and through the queue handler (JSON written by the listener thread);
+  wall time and CPU time of the calling thread;
+- per request: GET /api/v1/thoughts in-process with logging off (WARNING),
+  synchronous text logging and the queue handler, optionally sampled;
+  configurations are interleaved over --rounds and the median is reported.
+
+The difference to "off" is the logging cost per request.
+
+Usage (from the backend directory):
+    python -m bench.logging_overhead [--calls 100000] [--requests 500] [--rounds 5] [--sink-latency-ms 0.2]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(prefix='neuronest-log-'), 'bench.db')}"
+)
+
+class _SlowSink:
+    """File wrapper whose writes take at least `latency` seconds, like a full pipe."""
+
+    def __init__(self, target, latency: float):
+        self.target = target
+        self.latency = latency
+
+    def write(self, text: str) -> int:
+        if self.latency > 0:
+            time.sleep(self.latency)
+        return self.target.write(text)
+
+    def flush(self) -> None:
+        self.target.flush()
+
+class _User:
+    """Stand-in with the attributes the endpoints interpolate."""
+    id = 42
+    username = "bench_user_42"
+
+def _per_call(calls: int, sink) -> dict:
+    import queue
+    from app.core.logging_setup import (
+        BatchingQueueListener, JSONFormatter, NonBlockingQueueHandler, RequestLogContext, _request_log_context,
+    )
+
+    logger = logging.getLogger("bench.logging_overhead")
+    logger.propagate = False
+    user, limit, after = _User(), 50, None
+
+    def eager():
+        for _ in range(calls):
+            logger.info(f"User {user.username} reading thoughts: skip={0}, limit={limit}, after={after}")
+
+    def lazy():
+        for _ in range(calls):
+            logger.info("User %s reading thoughts: skip=%s, limit=%s, after=%s", user.username, 0, limit, after)
+
+    results = {}
+
+    def timed(name: str, fn) -> None:
+        started, started_cpu = time.perf_counter(), time.thread_time()
+        fn()
+        results[f"{name}_us"] = (time.perf_counter() - started) / calls * 1e6
+        results[f"{name}_thread_cpu_us"] = (time.thread_time() - started_cpu) / calls * 1e6
+
+    logger.setLevel(logging.WARNING)
+    timed("fstring_level_disabled", eager)
+    timed("lazy_level_disabled", lazy)
+
+    logger.setLevel(logging.INFO)
+    sync_handler = logging.StreamHandler(sink)
+    sync_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    logger.addHandler(sync_handler)
+    timed("fstring_sync_stream", eager)
+    logger.removeHandler(sync_handler)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=calls + 1)
+    queue_handler = NonBlockingQueueHandler(log_queue, max_chars=2000)
+    output = logging.StreamHandler(sink)
+    output.setFormatter(JSONFormatter())
+    listener = BatchingQueueListener(log_queue, output, flush_interval=0.05)
+    logger.addHandler(queue_handler)
+    listener.start()
+    token = _request_log_context.set(RequestLogContext(request_id="bench", scope={"path": "/api/v1/thoughts"}))
+    try:
+        timed("lazy_queue_json", lazy)
+    finally:
+        _request_log_context.reset(token)
+        listener.stop() # Drains the queue; not counted, it runs off the request path
+        logger.removeHandler(queue_handler)
+    return {key: round(value, 3) for key, value in results.items()}
+
+async def _per_request(requests: int, rounds: int, sink) -> dict:
+    import httpx
+    from app.main import app
+    from app.core.logging_setup import logging_setup, parse_sample_rates
+    from app.db.session import engine
+    from app.db.base import Base
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    root = logging.getLogger()
+    queue_handler = logging_setup.handler
+    logging_setup.listener.handlers[0].setStream(sink)
+    sync_handler = logging.StreamHandler(sink)
+    sync_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+
+    def use(handler, level):
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(level)
+
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        user = {"username": "log_bench", "password": "bench-password"}
+        await client.post("/api/v1/users", json=user)
+        token = (await client.post("/api/v1/auth/token", data=user)).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        await client.post("/api/v1/thoughts", json={"content": "Logging benchmark", "mood": "neutral"}, headers=headers)
+
+        configs = {
+            "off": (queue_handler, logging.WARNING, {}),
+            "sync_stream": (sync_handler, logging.INFO, {}),
+            "queue_json": (queue_handler, logging.INFO, {}),
+            "queue_json_sampled_10pct": (queue_handler, logging.INFO, parse_sample_rates("/api/v1/thoughts=0.1")),
+        }
+        timings = {name: [] for name in configs}
+        try:
+            for _ in range(rounds): # Interleaved, so drift affects every configuration alike
+                for name, (handler, level, rates) in configs.items():
+                    use(handler, level)
+                    logging_setup.sampler.rates = rates
+                    enqueued = queue_handler.enqueued
+                    started = time.perf_counter()
+                    for _ in range(requests):
+                        response = await client.get("/api/v1/thoughts?limit=10", headers=headers)
+                        if response.status_code != 200:
+                            raise RuntimeError(f"{name}: unexpected status {response.status_code}")
+                    timings[name].append((time.perf_counter() - started) / requests * 1e6)
+                    if handler is queue_handler:
+                        results[f"{name}_lines_per_request"] = round((queue_handler.enqueued - enqueued) / requests, 2)
+        finally:
+            logging_setup.sampler.rates = {}
+            use(queue_handler, logging.INFO)
+            logging_setup.stop() # Flush before the sink is closed
+    for name, values in timings.items():
+        results[f"{name}_us"] = round(statistics.median(values), 1)
+    for name in ("sync_stream", "queue_json", "queue_json_sampled_10pct"):
+        results[f"{name}_overhead_us"] = round(results[f"{name}_us"] - results["off_us"], 1)
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per configuration and round.")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--sink-latency-ms", type=float, default=0.2, help="Delay per write to the log file.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryFile("w") as target:
+        sink = _SlowSink(target, args.sink_latency_ms / 1000)
+        report = {
+            "sink_latency_ms": args.sink_latency_ms,
+            "per_call": _per_call(args.calls, sink),
+            "per_request": asyncio.run(_per_request(args.requests, args.rounds, sink)),
+        }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Round-trip budget check: counts SQL statements each endpoint sends to the
+database and fails (exit 1) if any exceeds its budget.
+
+Runs the app in-process against a throwaway SQLite database (needs httpx and
+aiosqlite). The auth cache is warmed first, so budgets are per request on the
+hot path. Lower a budget when you remove a round trip; raise it only with a
+reason.
+
+Usage (from the backend directory):
+    python -m bench.round_trips [--verbose]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Statements allowed per request (auth cache warm)
+BUDGETS = {
+    "signup": 1,            # INSERT ... ON CONFLICT DO NOTHING RETURNING
+    "signup_duplicate": 1,
+    "login": 1,             # user SELECT
+    "create_thought": 3,    # INSERT RETURNING + daily stats upsert + data version bump
+    "create_batch": 3,      # multi-row INSERT RETURNING + one stats upsert + version bump
+    "list_thoughts": 2,     # data version (ETag) + page
+    "list_not_modified": 1, # data version only, then 304
+    "water_thought": 2,     # UPDATE ... RETURNING + version bump
+    "water_many": 2,
+    "insights": 2,          # data version + daily stats rollup
+    "insights_not_modified": 1,
+    "delete_thought": 3,    # DELETE RETURNING + stats decrement + version bump
+    "users_me": 0,          # served from the auth cache
+}
+
+@contextmanager
+def count_statements(engine, statements: list):
+    """Appends every statement executed on `engine` to `statements`."""
+    from sqlalchemy import event
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+async def _run(verbose: bool) -> list:
+    import httpx
+    from app.main import app
+    from app.db.session import engine
+    from app.db.base import Base
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    results = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+
+        async def measure(name: str, method: str, url: str, expect: int, **kwargs):
+            statements: list = []
+            with count_statements(engine, statements):
+                response = await client.request(method, url, **kwargs)
+            if response.status_code != expect:
+                raise RuntimeError(f"{name}: expected {expect}, got {response.status_code}: {response.text}")
+            results.append({
+                "endpoint": name,
+                "statements": len(statements),
+                "budget": BUDGETS[name],
+                **({"sql": statements} if verbose else {}),
+            })
+            return response
+
+        user = {"username": "bench", "password": "bench-password"}
+        await measure("signup", "POST", "/api/v1/users", 201, json=user)
+        await measure("signup_duplicate", "POST", "/api/v1/users", 400, json=user)
+        token = (await measure("login", "POST", "/api/v1/auth/token", 200, data=user)).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        await client.get("/api/v1/users/me", headers=headers) # Warm the auth cache
+
+        await measure("create_thought", "POST", "/api/v1/thoughts", 201, headers=headers,
+                      json={"content": "first", "mood": "positive"})
+        await measure("create_batch", "POST", "/api/v1/thoughts/batch", 201, headers=headers,
+                      json=[{"content": f"queued {i}", "mood": "neutral"} for i in range(20)])
+        etag = (await measure("list_thoughts", "GET", "/api/v1/thoughts?limit=10", 200, headers=headers)).headers["etag"]
+        await measure("list_not_modified", "GET", "/api/v1/thoughts?limit=10", 304,
+                      headers={**headers, "If-None-Match": etag})
+        await measure("water_thought", "PUT", "/api/v1/thoughts/1/water", 200, headers=headers)
+        await measure("water_many", "PUT", "/api/v1/thoughts/water", 200, headers=headers,
+                      json={"thought_ids": list(range(1, 11))})
+        etag = (await measure("insights", "GET", "/api/v1/insights", 200, headers=headers)).headers["etag"]
+        await measure("insights_not_modified", "GET", "/api/v1/insights", 304,
+                      headers={**headers, "If-None-Match": etag})
+        await measure("delete_thought", "DELETE", "/api/v1/thoughts/2", 204, headers=headers)
+        await measure("users_me", "GET", "/api/v1/users/me", 200, headers=headers)
+
+    await engine.dispose()
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--verbose", action="store_true", help="Include the SQL of each statement.")
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix="neuronest-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(db_dir, 'round_trips.db')}"
+
+    results = asyncio.run(_run(args.verbose))
+    print(json.dumps(results, indent=2))
+    over = [r for r in results if r["statements"] > r["budget"]]
+    for r in over:
+        print(f"OVER BUDGET: {r['endpoint']} ran {r['statements']} statements (budget {r['budget']})", file=sys.stderr)
+    sys.exit(1 if over else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Seeds N users x M thoughts for load tests.
+
+Users are bench_user_0 .. bench_user_{N-1}, all with the password
+"bench-password" (hashed once). Thoughts get random moods and timestamps
+spread over the last --days days; the daily stats rollup is rebuilt at the
+end. Running it again replaces the bench users' thoughts. Tables are created
+if missing, so an empty SQLite file works; on Postgres run the migrations
+first to get the search objects as well.
+
+Usage (from the backend directory):
+    python -m bench.seed [--database-url URL] [--users 50] [--thoughts 200] [--days 60]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+BENCH_PASSWORD = "bench-password"
+USER_PREFIX = "bench_user_"
+INSERT_BATCH_ROWS = 1000
+WORDS = (
+    "walked slept worked called friends park coffee tired calm anxious grateful deadline "
+    "rain sunshine family dinner meeting gym reading music stressed happy quiet evening"
+).split()
+
+def username(i: int) -> str:
+    return f"{USER_PREFIX}{i}"
+
+def _content(rng: random.Random) -> str:
+    return " ".join(rng.choices(WORDS, k=rng.randint(4, 16))).capitalize() + "."
+
+async def seed(users: int, thoughts: int, days: int, seed_value: int) -> dict:
+    from sqlalchemy import insert, select, delete
+    from app.core.security import get_password_hash
+    from app.crud.crud_thought_stats import thought_stats
+    from app.crud.crud_user import user as crud_user
+    from app.db.base import Base
+    from app.db.session import engine, async_session_maker
+    from app.models.thought import Thought, MoodEnum
+    from app.models.user import User
+
+    rng = random.Random(seed_value)
+    moods = list(MoodEnum)
+    started = time.perf_counter()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with async_session_maker() as db:
+        names = [username(i) for i in range(users)]
+        # Re-seeding keeps existing bench users and replaces their thoughts
+        existing = dict((await db.execute(
+            select(User.username, User.id).where(User.username.in_(names))
+        )).all())
+        if existing:
+            await db.execute(delete(Thought).where(Thought.user_id.in_(existing.values())))
+        missing = [name for name in names if name not in existing]
+        if missing:
+            hashed = get_password_hash(BENCH_PASSWORD)
+            await db.execute(insert(User).values([{"username": name, "hashed_password": hashed} for name in missing]))
+        user_ids = (await db.execute(select(User.id).where(User.username.in_(names)))).scalars().all()
+
+        now = datetime.now(timezone.utc)
+        span = timedelta(days=days).total_seconds()
+        rows = []
+        for user_id in user_ids:
+            for _ in range(thoughts):
+                created_at = now - timedelta(seconds=rng.uniform(0, span))
+                rows.append({
+                    "user_id": user_id,
+                    "content": _content(rng),
+                    "mood": rng.choice(moods),
+                    "growth_stage": rng.randint(0, 3),
+                    "created_at": created_at,
+                    "last_watered_at": created_at,
+                })
+            if len(rows) >= INSERT_BATCH_ROWS:
+                await db.execute(insert(Thought), rows)
+                rows = []
+        if rows:
+            await db.execute(insert(Thought), rows)
+
+        for user_id in user_ids:
+            await thought_stats.backfill(db, user_id=user_id)
+            await crud_user.bump_data_version(db, user_id=user_id)
+        await db.commit()
+
+    await engine.dispose()
+    return {
+        "users": users,
+        "thoughts_per_user": thoughts,
+        "thoughts": users * thoughts,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", help="Defaults to DATABASE_URL from the environment.")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--thoughts", type=int, default=200, help="Thoughts per user.")
+    parser.add_argument("--days", type=int, default=60, help="Spread thoughts over this many past days.")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed, for repeatable data.")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    print(json.dumps(asyncio.run(seed(args.users, args.thoughts, args.days, args.seed)), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Micro-benchmark: cost of serializing a page of thoughts, per 1000 thoughts.
+
+Compares FastAPI's default response_model path (validate ORM objects, convert
+to JSON-compatible Python, stdlib json.dumps) with the fast path used by the
+list endpoints (row dicts encoded by orjson or msgpack).
+
+Usage (from the backend directory):
+    python -m bench.serialization [--thoughts 1000] [--repeat 50]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+def _make_thoughts(n: int) -> list:
+    from app.db import base as _models # Registers all mappers
+    from app.models.thought import Thought as ThoughtModel, MoodEnum
+
+    moods = list(MoodEnum)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        ThoughtModel(
+            id=i,
+            user_id=1,
+            content=f"Thought number {i}: a short journal entry about the day, the weather and how it felt.",
+            mood=moods[i % len(moods)],
+            growth_stage=i % 4,
+            created_at=start + timedelta(minutes=i),
+            last_watered_at=start + timedelta(minutes=i, seconds=30),
+        )
+        for i in range(n)
+    ]
+
+def _time(fn, repeat: int) -> float:
+    fn() # Warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--thoughts", type=int, default=1000, help="Thoughts per page.")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed runs per strategy.")
+    args = parser.parse_args()
+
+    from pydantic import TypeAdapter
+    from app.schemas.thought import Thought
+    from app.core.serialization import encode_rows, thought_rows
+
+    thoughts = _make_thoughts(args.thoughts)
+    adapter = TypeAdapter(List[Thought])
+
+    def fastapi_default() -> bytes:
+        validated = adapter.validate_python(thoughts, from_attributes=True)
+        return json.dumps(adapter.dump_python(validated, mode="json")).encode("utf-8")
+
+    def type_adapter_dump_json() -> bytes:
+        return adapter.dump_json(adapter.validate_python(thoughts, from_attributes=True))
+
+    def rows_orjson() -> bytes:
+        return encode_rows(thought_rows(thoughts), msgpack_format=False)
+
+    def rows_msgpack() -> bytes:
+        return encode_rows(thought_rows(thoughts), msgpack_format=True)
+
+    assert json.loads(fastapi_default()) == json.loads(rows_orjson()), "fast path output differs"
+
+    scale = 1000 / args.thoughts
+    results = []
+    for name, fn in [
+        ("fastapi_default", fastapi_default),
+        ("type_adapter_dump_json", type_adapter_dump_json),
+        ("rows_orjson", rows_orjson),
+        ("rows_msgpack", rows_msgpack),
+    ]:
+        seconds = _time(fn, args.repeat)
+        results.append({
+            "strategy": name,
+            "ms_per_1000": round(seconds * scale * 1000, 3),
+            "bytes_per_1000": round(len(fn()) * scale),
+        })
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Cold-start check: import time of app.main and time to the first /api/health.
+
+Each run is a fresh interpreter. Import time comes from `python -X importtime`
+(median over --runs); the slowest modules by self time are listed so a
+regression points at its cause. Fails (exit 1) if the median import time is
+over budget or a module that should load lazily was imported at startup.
+Time to first health check starts uvicorn and polls until it answers.
+
+Usage (from the backend directory):
+    python -m bench.startup [--runs 5] [--budget-ms 1500] [--top 15] [--skip-serve]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.realpath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Median `import app.main` budget; generous so slow CI machines pass, a lazy
+# import turning eager again still shows up in LAZY_MODULES below
+IMPORT_BUDGET_MS = 1500
+# Only needed once an AI call, login or token check happens
+LAZY_MODULES = ("anthropic", "jose", "passlib")
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+def _env(db_dir: str) -> dict:
+    env = {**os.environ, "DATABASE_URL": f"sqlite+aiosqlite:///{os.path.join(db_dir, 'startup.db')}"}
+    env.pop("PYTHONDONTWRITEBYTECODE", None) # Measure with bytecode caches, as in production
+    return env
+
+def import_profile(env: dict) -> dict:
+    """One `import app.main` under -X importtime: total, per-module self times, modules loaded."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    self_us = {}
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        own, cumulative, _, name = match.groups()
+        self_us[name] = int(own)
+        if name == "app.main":
+            total_us = int(cumulative)
+    return {"total_us": total_us, "self_us": self_us}
+
+def first_health(env: dict, port: int, timeout: float = 60.0) -> float:
+    """Seconds from spawning uvicorn to the first successful /api/health."""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("Timed out waiting for /api/health")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS, help="Median import time budget.")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules (self time) to list.")
+    parser.add_argument("--port", type=int, default=8097)
+    parser.add_argument("--skip-serve", action="store_true", help="Only measure imports.")
+    args = parser.parse_args()
+
+    env = _env(tempfile.mkdtemp(prefix="neuronest-startup-"))
+    import_profile(env) # Warm-up: writes bytecode caches
+    profiles = [import_profile(env) for _ in range(args.runs)]
+
+    import_ms = statistics.median(p["total_us"] for p in profiles) / 1000
+    loaded = set().union(*(p["self_us"] for p in profiles))
+    eager = sorted(name for name in LAZY_MODULES if name in loaded)
+    slowest = sorted(
+        loaded, key=lambda name: statistics.median(p["self_us"].get(name, 0) for p in profiles), reverse=True
+    )[:args.top]
+
+    report = {
+        "runs": args.runs,
+        "import_ms": round(import_ms, 1),
+        "budget_ms": args.budget_ms,
+        "modules_loaded": len(loaded),
+        "eagerly_imported": eager,
+        "slowest_self_ms": {
+            name: round(statistics.median(p["self_us"].get(name, 0) for p in profiles) / 1000, 1)
+            for name in slowest
+        },
+    }
+    if not args.skip_serve:
+        health = [first_health(env, args.port) for _ in range(args.runs)]
+        report["first_health_ms"] = round(statistics.median(health) * 1000, 1)
+
+    print(json.dumps(report, indent=2))
+    failed = False
+    if import_ms > args.budget_ms:
+        print(f"OVER BUDGET: import app.main took {import_ms:.0f} ms (budget {args.budget_ms:.0f} ms)", file=sys.stderr)
+        failed = True
+    for name in eager:
+        print(f"EAGER IMPORT: {name} is imported at startup; import it on first use", file=sys.stderr)
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()